@@ -1,15 +1,35 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 import sqlite3
 import json
 import os
+import threading
+from array import array
+from datetime import date, timedelta
+
+# 스키마는 공용 패키지(welfare_db)의 마이그레이션 모듈이 관리
+from welfare_db.migrations import migrate
+from welfare_db.policy_schema import APPLY_ALWAYS, age_range_list
+from welfare_db.policy_snapshot import PolicySnapshot, data_generation, snapshot_generation, snapshot_path, write_snapshot
+from chat_session import ChatSessionStore
+from config import Config
+from intent import describe, parse_intent
+from llm_cache import LLMResponseCache
+from llm_gateway import LLMBusyError, LLMError, get_gateway
+from single_flight import SingleFlight
 
 app = Flask(__name__)
 CORS(app)  # React에서 API 호출할 수 있도록 CORS 설정
 
 # ------------------ 🔹 DB 절대 경로 설정 ------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "welfare_policies.db")  # 같은 폴더 안에 DB가 있어야 함
+if not Config.DATABASE_URL.startswith('sqlite:///'):
+    raise ValueError(f"DATABASE_URL은 sqlite:///<경로> 형식이어야 합니다: {Config.DATABASE_URL}")
+# 기본은 같은 폴더의 welfare_policies.db (상대 경로는 이 폴더 기준)
+DB_PATH = os.path.join(BASE_DIR, Config.DATABASE_URL[len('sqlite:///'):])
+SNAPSHOT_PATH = snapshot_path(DB_PATH)  # 임포트가 만드는 열 단위 스냅샷 (있으면 목록/검색을 여기서 처리)
+# 같은 DB 검색/같은 질문의 LLM 생성이 동시에 몰리면 한 번만 계산하고 결과를 나눠 줌
+flight = SingleFlight(Config.SINGLE_FLIGHT_DIR)
 # --------------------------------------------------------
 
 def get_db_connection():
@@ -18,6 +38,90 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row  # 딕셔너리 형태로 결과 반환
     return conn
 
+def ensure_schema():
+    """서버 시작 시 한 번: 예전 스키마 DB면 통합 스키마로 업그레이드"""
+    if not os.path.exists(DB_PATH):
+        return
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        migrate(conn)
+        if snapshot_generation(SNAPSHOT_PATH) != data_generation(conn):
+            write_snapshot(conn, SNAPSHOT_PATH)
+            print(f"✅ 정책 스냅샷 생성: {SNAPSHOT_PATH}")
+    finally:
+        conn.close()
+
+_generation_local = threading.local()  # 스레드별 세대 번호 조회용 연결
+
+def db_generation():
+    """DB의 데이터 세대 번호 (임포터가 정책을 바꿀 때마다 올라감, DB가 없으면 None)"""
+    conn = getattr(_generation_local, 'conn', None)
+    if conn is None:
+        if not os.path.exists(DB_PATH):
+            return None
+        conn = _generation_local.conn = sqlite3.connect(DB_PATH)
+    return data_generation(conn)
+
+_snapshot = None
+_rebuild_lock = threading.Lock()
+_failed_generation = None  # 스냅샷을 못 만든 세대 (같은 세대는 다시 시도하지 않고 DB로 조회)
+
+def _rebuild_snapshot(generation):
+    """백그라운드에서 스냅샷 다시 만들기 (끝나면 다음 요청부터 새 스냅샷 사용)"""
+    global _failed_generation
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            write_snapshot(conn, SNAPSHOT_PATH)
+            print(f"✅ 정책 스냅샷 다시 생성: {SNAPSHOT_PATH}")
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"⚠️ 스냅샷 다시 생성 실패, DB로 조회합니다: {e}")
+        _failed_generation = generation
+    finally:
+        _rebuild_lock.release()
+
+def get_snapshot():
+    """DB와 세대 번호가 같은 스냅샷 (다르면 None → SQLite로 조회하고, 스냅샷은 백그라운드에서 다시 만듦)"""
+    global _snapshot
+    generation = db_generation()
+    if generation is None:
+        return None
+    if _snapshot is not None and _snapshot.generation == generation:
+        return _snapshot
+    if snapshot_generation(SNAPSHOT_PATH) == generation:
+        try:
+            _snapshot = PolicySnapshot(SNAPSHOT_PATH)
+            return _snapshot
+        except Exception as e:
+            print(f"⚠️ 스냅샷 열기 실패, DB로 조회합니다: {e}")
+            return None
+    if generation != _failed_generation and _rebuild_lock.acquire(blocking=False):
+        threading.Thread(target=_rebuild_snapshot, args=(generation,), daemon=True).start()
+    return None
+
+def snapshot_keyword(keyword):
+    """스냅샷 바이트 검색이 SQL LIKE와 같은 결과를 내는 키워드인지 (영문 대소문자 무시/와일드카드는 DB로)"""
+    return not any(c in '%_' or (c.isascii() and c.isalpha()) for c in keyword)
+
+ensure_schema()
+
+# 정책 조회 공통 SELECT (카테고리는 policy_categories(policy_id) 인덱스로 정책마다 조회)
+POLICY_SELECT = '''
+    SELECT p.id, p.title, p.url, p.region, p.age_min, p.age_max, p.application_period,
+           p.apply_start, p.apply_end, p.apply_status, p.conditions, p.benefits,
+           (SELECT GROUP_CONCAT(c.category) FROM policy_categories c WHERE c.policy_id = p.id) AS categories
+    FROM welfare_policies p
+'''
+
+def row_to_policy(row):
+    """DB 행 → API 응답 (age_range는 예전 형식의 나이 리스트로도 제공)"""
+    policy = dict(row)
+    policy['age_range'] = age_range_list(policy['age_min'], policy['age_max'])
+    policy['categories'] = policy['categories'].split(',') if policy['categories'] else []
+    return policy
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """서버 상태 확인"""
@@ -27,25 +131,18 @@ def health_check():
 def get_all_policies():
     """모든 정책 조회"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, title, url, region, age_range, application_period, conditions, benefits
-            FROM welfare_policies
-            ORDER BY region, title
-        ''')
-        
-        policies = []
-        for row in cursor.fetchall():
-            policy = dict(row)
-            if policy['age_range']:
-                policy['age_range'] = json.loads(policy['age_range'])
-            else:
-                policy['age_range'] = []
-            policies.append(policy)
-        
-        conn.close()
+        snapshot = get_snapshot()
+        if snapshot:
+            policies = snapshot.policies(snapshot.filter())
+        else:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute(POLICY_SELECT + ' ORDER BY p.region, p.title')
+            
+            policies = [row_to_policy(row) for row in cursor.fetchall()]
+            
+            conn.close()
         return jsonify({
             "success": True,
             "count": len(policies),
@@ -62,26 +159,20 @@ def get_all_policies():
 def get_policies_by_region(region):
     """지역별 정책 조회"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, title, url, region, age_range, application_period, conditions, benefits
-            FROM welfare_policies
-            WHERE region = ?
-            ORDER BY title
-        ''', (region,))
-        
-        policies = []
-        for row in cursor.fetchall():
-            policy = dict(row)
-            if policy['age_range']:
-                policy['age_range'] = json.loads(policy['age_range'])
-            else:
-                policy['age_range'] = []
-            policies.append(policy)
-        
-        conn.close()
+        snapshot = get_snapshot()
+        if snapshot:
+            # 스냅샷은 (지역, 제목) 순서라 지역 행 범위를 그대로 읽음
+            policies = snapshot.policies(snapshot.filter(region=region))
+        else:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            # idx_region_title 범위 스캔 (정렬 없이 제목순)
+            cursor.execute(POLICY_SELECT + ' WHERE p.region = ? ORDER BY p.title', (region,))
+            
+            policies = [row_to_policy(row) for row in cursor.fetchall()]
+            
+            conn.close()
         return jsonify({
             "success": True,
             "region": region,
@@ -101,49 +192,22 @@ def search_policies():
     keyword = request.args.get('keyword', '')
     region = request.args.get('region', '')
     age = request.args.get('age', '')
+    category = request.args.get('category', '')
+    
+    if age and not age.isdigit():
+        return jsonify({
+            "success": False,
+            "error": "age는 숫자여야 합니다."
+        }), 400
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = '''
-            SELECT id, title, url, region, age_range, application_period, conditions, benefits
-            FROM welfare_policies
-            WHERE 1=1
-        '''
-        params = []
-        
-        if keyword:
-            query += ''' AND (title LIKE ? OR benefits LIKE ? OR conditions LIKE ?)'''
-            params.extend([f'%{keyword}%', f'%{keyword}%', f'%{keyword}%'])
-        
-        if region:
-            query += ''' AND region = ?'''
-            params.append(region)
-        
-        if age:
-            query += ''' AND age_range LIKE ?'''
-            params.append(f'%{age}%')
-        
-        query += ''' ORDER BY region, title'''
-        
-        cursor.execute(query, params)
-        
-        policies = []
-        for row in cursor.fetchall():
-            policy = dict(row)
-            if policy['age_range']:
-                policy['age_range'] = json.loads(policy['age_range'])
-            else:
-                policy['age_range'] = []
-            policies.append(policy)
-        
-        conn.close()
+        policies = find_policies(keyword, region, int(age) if age else None, category)
         return jsonify({
             "success": True,
             "keyword": keyword,
             "region": region,
             "age": age,
+            "category": category,
             "count": len(policies),
             "policies": policies
         })
@@ -154,6 +218,166 @@ def search_policies():
             "error": str(e)
         }), 500
 
+def find_policies(keyword='', region='', age=None, category='', age_to=None):
+    """키워드/지역/나이/카테고리 조건 검색 (스냅샷이 있으면 스냅샷, 아니면 DB)
+    age_to를 주면 [age, age_to] 나이대와 범위가 겹치는 정책"""
+    snapshot = get_snapshot()
+    if snapshot and snapshot_keyword(keyword):
+        rows = snapshot.filter(region=region or None, age=age, category=category or None, keyword=keyword or None,
+                               age_to=age_to)
+        return snapshot.policies(rows)
+    
+    # DB 조회는 같은 조건이 동시에 들어오면 한 번만 (스냅샷 조회는 합치는 비용이 더 커서 그대로)
+    policies, _ = flight.do(('policies', keyword, region, age, category, age_to),
+                            lambda: query_policies(keyword, region, age, category, age_to))
+    return policies
+
+def query_policies(keyword, region, age, category, age_to):
+    """find_policies의 SQLite 조회"""
+    query = POLICY_SELECT + ' WHERE 1=1'
+    params = []
+    
+    if keyword:
+        query += ''' AND (p.title LIKE ? OR p.benefits LIKE ? OR p.conditions LIKE ?)'''
+        params.extend([f'%{keyword}%', f'%{keyword}%', f'%{keyword}%'])
+    
+    if region:
+        query += ''' AND p.region = ?'''
+        params.append(region)
+    
+    if age is not None:
+        # idx_age_region 범위 스캔 (나이 정보 없는 정책은 제외, policy_schema.age_overlaps와 같은 규칙)
+        query += ''' AND p.age_min <= ? AND p.age_max >= ?'''
+        params.extend([age if age_to is None else age_to, age])
+    
+    if category:
+        query += ''' AND p.id IN (SELECT policy_id FROM policy_categories WHERE category = ?)'''
+        params.append(category)
+    
+    query += ''' ORDER BY p.region, p.title'''
+    
+    conn = get_db_connection()
+    try:
+        return [row_to_policy(row) for row in conn.execute(query, params).fetchall()]
+    finally:
+        conn.close()
+
+def parse_date_args():
+    """date(YYYY-MM-DD, 기본 오늘)/days 파라미터 → (기준일, 일수), 잘못되면 ValueError"""
+    value = request.args.get('date', '')
+    base = date.fromisoformat(value) if value else date.today()
+    days = request.args.get('days', '')
+    if days and not days.isdigit():
+        raise ValueError("days는 0 이상의 숫자여야 합니다.")
+    return base, int(days) if days else None
+
+def query_period_policies(where, params, order, region):
+    """신청기간 조건으로 정책 조회 (지역은 선택)"""
+    query = POLICY_SELECT + ' WHERE ' + where
+    if region:
+        query += ' AND p.region = ?'
+        params = list(params) + [region]
+    conn = get_db_connection()
+    try:
+        return [row_to_policy(row) for row in conn.execute(query + ' ORDER BY ' + order, params).fetchall()]
+    finally:
+        conn.close()
+
+@app.route('/api/policies/open', methods=['GET'])
+def get_open_policies():
+    """지금(또는 date 기준) 신청 가능한 정책 (include_always=0이면 상시 접수 제외)"""
+    region = request.args.get('region', '')
+    try:
+        base, _ = parse_date_args()
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"잘못된 날짜/일수입니다: {e}"}), 400
+
+    try:
+        today = base.isoformat()
+        # idx_apply_end 범위 스캔 (apply_start 조건은 인덱스 안에서 확인), 마감 빠른 순
+        policies = query_period_policies("p.apply_end >= ? AND p.apply_start <= ?",
+                                         [today, today], 'p.apply_end, p.title', region)
+        if request.args.get('include_always', '1') != '0':
+            # idx_apply_status로 상시 접수 정책
+            policies += query_period_policies("p.apply_status = ?", [APPLY_ALWAYS], 'p.title', region)
+        return jsonify({
+            "success": True,
+            "date": today,
+            "region": region,
+            "count": len(policies),
+            "policies": policies
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/policies/upcoming', methods=['GET'])
+def get_upcoming_policies():
+    """아직 신청 시작 전인 정책 (days를 주면 그 안에 시작하는 것만)"""
+    region = request.args.get('region', '')
+    try:
+        base, days = parse_date_args()
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"잘못된 날짜/일수입니다: {e}"}), 400
+
+    try:
+        # idx_apply_start 범위 스캔, 시작 빠른 순
+        where = "p.apply_start > ?"
+        params = [base.isoformat()]
+        if days is not None:
+            where += " AND p.apply_start <= ?"
+            params.append((base + timedelta(days=days)).isoformat())
+        policies = query_period_policies(where, params, 'p.apply_start, p.title', region)
+        return jsonify({
+            "success": True,
+            "date": base.isoformat(),
+            "days": days,
+            "region": region,
+            "count": len(policies),
+            "policies": policies
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/policies/closing', methods=['GET'])
+def get_closing_policies():
+    """days일 안에 마감되는 신청 가능 정책 (기본 7일)"""
+    region = request.args.get('region', '')
+    try:
+        base, days = parse_date_args()
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"잘못된 날짜/일수입니다: {e}"}), 400
+    days = 7 if days is None else days
+
+    try:
+        today = base.isoformat()
+        # idx_apply_end 범위 스캔 (BETWEEN), 마감 빠른 순
+        policies = query_period_policies(
+            "p.apply_end BETWEEN ? AND ? AND p.apply_start <= ?",
+            [today, (base + timedelta(days=days)).isoformat(), today], 'p.apply_end, p.title', region
+        )
+        return jsonify({
+            "success": True,
+            "date": today,
+            "days": days,
+            "region": region,
+            "count": len(policies),
+            "policies": policies
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
 @app.route('/api/regions', methods=['GET'])
 def get_regions():
     """사용 가능한 지역 목록 조회"""
@@ -189,11 +413,15 @@ def get_stats():
         cursor.execute('SELECT region, COUNT(*) as count FROM welfare_policies GROUP BY region')
         region_stats = [dict(row) for row in cursor.fetchall()]
         
+        cursor.execute('SELECT category, COUNT(*) as count FROM policy_categories GROUP BY category')
+        category_stats = [dict(row) for row in cursor.fetchall()]
+        
         conn.close()
         return jsonify({
             "success": True,
             "total_policies": total,
-            "region_stats": region_stats
+            "region_stats": region_stats,
+            "category_stats": category_stats
         })
     
     except Exception as e:
@@ -202,15 +430,374 @@ def get_stats():
             "error": str(e)
         }), 500
 
+# 챗봇 질문 → LLM 프롬프트 (예전 App.js sendMessageToAI와 같은 지시문)
+CHAT_PROMPT = '''사용자 질문: "{message}"
+
+위 질문을 분석해서 다음 중 어떤 정보가 필요한지 파악하고, 간단하고 친근한 톤으로 응답해주세요:
+1. 지역 정보 (서울, 경기, 인천)
+2. 나이 정보
+3. 관심 있는 지원금/정책 키워드
+
+만약 모든 정보가 있다면 "정보를 찾아드릴게요!"라고 응답하고, 부족한 정보가 있다면 무엇이 더 필요한지 물어보세요.'''
+
+# 비슷한 질문이 많아서 같은 답은 Watson을 다시 부르지 않고 캐시에서 (프로세스마다 하나)
+chat_cache = LLMResponseCache(Config.LLM_CACHE_SIZE, Config.LLM_CACHE_TTL, Config.LLM_CACHE_SIMILARITY)
+
+# 챗봇 응답에 같이 보내는 정책 수 (전체 개수는 count로)
+CHAT_POLICY_LIMIT = 10
+
+# 대화마다 후보 정책 배열을 들고 있다가 후속 질문에서는 그 안에서만 좁힘 (프로세스마다 하나)
+chat_sessions = ChatSessionStore(Config.CHAT_SESSION_MAX, Config.CHAT_SESSION_MAX_BYTES, Config.CHAT_SESSION_TTL)
+
+def rule_answer(intent, policies, count=None):
+    """지역/나이/카테고리가 분명한 질문은 DB 조회 결과로 바로 답함 (LLM 호출 없이)
+    policies가 앞부분만이면 count에 전체 개수"""
+    count = len(policies) if count is None else count
+    if not count:
+        return f"{describe(intent)} 조건에 맞는 정책을 찾지 못했어요. 조건을 바꿔서 다시 물어봐 주세요."
+    titles = '\n'.join(f"- {policy['title']}" for policy in policies[:5])
+    more = f"\n외 {count - 5}개" if count > 5 else ''
+    return f"{describe(intent)} 정책 {count}개를 찾았어요!\n{titles}{more}"
+
+def refine_session(session, snapshot, region='', age_min=None, age_max=None, categories=(), keywords=()):
+    """세션에 조건을 더하고 후보 갱신 → 지금 후보에서 바로 좁혔으면 True (session.lock을 잡은 상태에서 호출)
+    카테고리/키워드는 누적, 지역/나이는 새 값으로 (바뀌었거나 스냅샷 세대가 바뀌었으면 전체 조건으로 다시 찾음)
+    snapshot은 요청 처음에 한 번 get_snapshot()한 것 (후보를 읽는 session_policies에도 같은 것을 넘김)"""
+    new_categories = tuple(c for c in dict.fromkeys(categories) if c and c not in session.categories)
+    new_keywords = tuple(k for k in dict.fromkeys(keywords) if k and k not in session.keywords)
+    if age_min is not None and age_max is None:
+        age_max = age_min
+    new_age = age_min is not None and (age_min, age_max) != (session.age_min, session.age_max)
+    incremental = (snapshot is not None and session.version == snapshot.generation
+                   and not (region and region != session.region)
+                   and not (new_age and session.age_min is not None)
+                   and all(snapshot_keyword(k) for k in new_keywords))
+    
+    if region:
+        session.region = region
+    if new_age:
+        session.age_min, session.age_max = age_min, age_max
+    session.categories += new_categories
+    session.keywords += new_keywords
+    
+    if incremental:
+        rows = session.rows
+        if new_age:
+            rows = snapshot.narrow(rows, age=age_min, age_to=age_max)
+        for category in new_categories:
+            rows = snapshot.narrow(rows, category=category)
+        for keyword in new_keywords:
+            rows = snapshot.narrow(rows, keyword=keyword)
+        if rows is not session.rows:
+            session.rows = array('i', rows)
+        return True
+    
+    categories, keywords = session.categories, session.keywords
+    if snapshot and all(snapshot_keyword(k) for k in keywords):
+        rows = snapshot.filter(region=session.region or None, age=session.age_min,
+                               category=categories[0] if categories else None,
+                               keyword=keywords[0] if keywords else None, age_to=session.age_max)
+        for category in categories[1:]:
+            rows = snapshot.narrow(rows, category=category)
+        for keyword in keywords[1:]:
+            rows = snapshot.narrow(rows, keyword=keyword)
+        session.rows, session.version = array('i', rows), snapshot.generation
+    else:
+        # 스냅샷이 없으면 DB에서 찾고 정책 id만 보관 (나머지 카테고리/키워드는 찾은 정책에서 거름)
+        policies = find_policies(keywords[0] if keywords else '', session.region, session.age_min,
+                                 categories[0] if categories else '', age_to=session.age_max)
+        policies = [policy for policy in policies
+                    if all(category in policy['categories'] for category in categories[1:])
+                    and all(keyword.lower() in ' '.join((policy['title'], policy['benefits'] or '',
+                                                          policy['conditions'] or '')).lower()
+                            for keyword in keywords[1:])]
+        session.rows, session.version = array('i', (policy['id'] for policy in policies)), None
+    return False
+
+def session_policies(session, snapshot, offset=0, limit=None):
+    """세션 후보 중 offset부터 limit개(None이면 끝까지)를 정책 dict로 (session.lock을 잡은 상태에서 호출)
+    snapshot은 refine_session에 넘긴 것 (다시 get_snapshot()하면 그 사이 세대가 바뀌어 None일 수 있음)"""
+    if session.version is not None and (snapshot is None or snapshot.generation != session.version):
+        # 그 사이 데이터 세대가 바뀌어 행 번호가 안 맞음 → 조건 그대로 다시 찾음 (스냅샷이 없으면 DB로)
+        refine_session(session, snapshot)
+        chat_sessions.save(session)
+    page = session.rows[offset:None if limit is None else offset + limit]
+    if session.version is not None:
+        return snapshot.policies(page)
+    if not page:
+        return []
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(POLICY_SELECT + f" WHERE p.id IN ({','.join('?' * len(page))}) ORDER BY p.region, p.title",
+                            list(page)).fetchall()
+        return [row_to_policy(row) for row in rows]
+    finally:
+        conn.close()
+
+@app.route('/api/chat', methods=['POST'])
+def chat():
+    """챗봇 응답 생성 (지역/나이/카테고리가 분명하면 DB로 바로, 아니면 Watsonx.ai, API 키는 서버에만)"""
+    data = request.get_json(silent=True) or {}
+    message = str(data.get('message') or '').strip()
+    if not message:
+        return jsonify({"success": False, "error": "message는 필수입니다"}), 400
+    
+    intent = parse_intent(message)
+    session = chat_sessions.get(str(data['session_id'])) if data.get('session_id') else None
+    if (session and not intent.free_form and not intent.out_of_scope and (intent.region or not intent.regions)
+            and (intent.regions or intent.age_min is not None or intent.categories)):
+        # 대화 중 후속 질문: 세션 후보에서 새 조건만 더 거름
+        with session.lock:
+            try:
+                snapshot = get_snapshot()
+                incremental = refine_session(session, snapshot, intent.region or '', intent.age_min,
+                                             intent.age_max, intent.categories)
+                chat_sessions.save(session)
+                policies = session_policies(session, snapshot, 0, CHAT_POLICY_LIMIT)
+            except Exception as e:
+                return jsonify({"success": False, "error": str(e)}), 500
+            return jsonify({
+                "success": True,
+                "response": rule_answer(session.intent(), policies, len(session.rows)),
+                "cached": False,
+                "source": "session",
+                "session_id": session.session_id,
+                "incremental": incremental,
+                "count": len(session.rows),
+                "policies": policies
+            })
+    
+    if intent.answerable:
+        try:
+            policies = find_policies('', intent.region, intent.age_min,
+                                     intent.categories[0] if intent.categories else '', age_to=intent.age_max)
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 500
+        return jsonify({
+            "success": True,
+            "response": rule_answer(intent, policies),
+            "cached": False,
+            "source": "rules",
+            "count": len(policies),
+            "policies": policies[:CHAT_POLICY_LIMIT]
+        })
+    
+    gateway = get_gateway()
+    if gateway is None:
+        return jsonify({"success": False, "error": "LLM이 설정되지 않았습니다 (IBM_API_KEY)"}), 503
+    
+    try:
+        # 같은 질문(캐시 키 기준)이 동시에 오면 Watson 호출은 한 번
+        response, cached = chat_cache.get_or_generate(message, lambda: flight.do(
+            ('chat',) + chat_cache.key(message), lambda: gateway.generate(CHAT_PROMPT.format(message=message)))[0])
+        return jsonify({"success": True, "response": response, "cached": cached, "source": "llm"})
+    
+    except LLMBusyError as e:
+        return jsonify({"success": False, "error": str(e)}), 429
+    except LLMError as e:
+        print(f"❌ LLM 호출 실패: {e}")
+        return jsonify({"success": False, "error": "응답을 생성할 수 없습니다"}), 502
+
+def sse_event(event, data):
+    """SSE 이벤트 한 개 (data는 JSON)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/chat/stream', methods=['GET', 'POST'])
+def chat_stream():
+    """챗봇 응답 스트리밍 (SSE): 찾은 정책(policies) → 생성 텍스트 조각(token) → done
+    EventSource는 GET만 되므로 ?message=&region=&age= 로도 받음"""
+    data = request.get_json(silent=True) or request.args
+    message = str(data.get('message') or '').strip()
+    region = str(data.get('region') or '')
+    age = str(data.get('age') or '')
+    if not message:
+        return jsonify({"success": False, "error": "message는 필수입니다"}), 400
+    if age and not age.isdigit():
+        return jsonify({"success": False, "error": "age는 숫자여야 합니다."}), 400
+    
+    def events():
+        yield ': connected\n\n'  # 정책 조회 전에 바로 첫 바이트
+        
+        # 1. 질문에서 뽑은 지역/나이/카테고리로 정책 먼저 (파라미터가 있으면 그쪽 우선)
+        intent = parse_intent(message)
+        policy_region = region or intent.region or ''
+        age_min, age_max = (int(age), int(age)) if age else (intent.age_min, intent.age_max)
+        category = intent.categories[0] if intent.categories else ''
+        if intent.out_of_scope:
+            # 서울/경기/인천 밖 지역 질문에 다른 지역 정책을 보여주지 않음 (/api/chat처럼 LLM이 답함)
+            policy_region, age_min, age_max, category = '', None, None, ''
+        policies = None
+        try:
+            # 조건이 하나도 없으면 전체 목록이 아니라 빈 결과 (설명 질문에 전체 정책 수를 알리지 않도록)
+            has_filter = bool(policy_region or age_min is not None or category)
+            policies = find_policies('', policy_region, age_min, category, age_to=age_max) if has_filter else []
+            yield sse_event('policies', {
+                "region": policy_region,
+                "age_min": age_min,
+                "age_max": age_max,
+                "category": category,
+                "count": len(policies),
+                "policies": policies[:CHAT_POLICY_LIMIT]
+            })
+        except Exception as e:
+            yield sse_event('error', {"stage": "policies", "error": str(e)})
+        
+        # 2. 조건이 분명한 질문은 찾은 정책으로 바로 답함
+        if intent.answerable and policies is not None:
+            yield sse_event('token', {"text": rule_answer(intent, policies)})
+            yield sse_event('done', {"cached": False, "source": "rules"})
+            return
+        
+        # 3. 설명 텍스트 (캐시에 있으면 한 번에, 없으면 생성되는 대로)
+        cached = chat_cache.get(message)
+        if cached is not None:
+            yield sse_event('token', {"text": cached})
+            yield sse_event('done', {"cached": True, "source": "llm"})
+            return
+        
+        gateway = get_gateway()
+        if gateway is None:
+            yield sse_event('error', {"stage": "llm", "error": "LLM이 설정되지 않았습니다 (IBM_API_KEY)"})
+            yield sse_event('done', {"cached": False, "source": "llm"})
+            return
+        
+        pieces = []
+        try:
+            for piece in gateway.generate_stream(CHAT_PROMPT.format(message=message)):
+                pieces.append(piece)
+                yield sse_event('token', {"text": piece})
+        except LLMError as e:
+            print(f"❌ LLM 스트림 실패: {e}")
+            yield sse_event('error', {"stage": "llm", "error": "응답을 생성할 수 없습니다"})
+        else:
+            response = ''.join(pieces).strip()
+            if response:
+                chat_cache.put(message, response)
+        yield sse_event('done', {"cached": False, "source": "llm"})
+    
+    # 프록시(nginx 등)가 모아서 보내지 않도록
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def session_conditions(data):
+    """요청 body → (지역, 나이 하한, 상한, 카테고리들, 키워드들), message가 있으면 질문에서 뽑은 조건도 더함"""
+    region = str(data.get('region') or '')
+    age = str(data.get('age') or '')
+    age_to = str(data.get('age_to') or '')
+    if (age and not age.isdigit()) or (age_to and not age_to.isdigit()):
+        raise ValueError("age는 숫자여야 합니다.")
+    age_min = int(age) if age else None
+    age_max = int(age_to) if age_to else age_min
+    category = data.get('category') or []
+    categories = [category] if isinstance(category, str) else list(category)
+    keyword = str(data.get('keyword') or '').strip()
+    
+    message = str(data.get('message') or '').strip()
+    if message:
+        intent = parse_intent(message)
+        region = region or intent.region or ''
+        if age_min is None:
+            age_min, age_max = intent.age_min, intent.age_max
+        categories += intent.categories
+    return region, age_min, age_max, tuple(categories), (keyword,) if keyword else ()
+
+def session_result(session, snapshot, offset=0, limit=None, **extra):
+    """session.lock을 잡은 상태에서 호출 (후보가 다시 찾아질 수 있으므로 정책을 먼저 읽고 개수를 셈)"""
+    policies = session_policies(session, snapshot, offset, limit)
+    return jsonify({
+        "success": True,
+        "session_id": session.session_id,
+        "conditions": session.conditions(),
+        **extra,
+        "count": len(session.rows),
+        "offset": offset,
+        "policies": policies
+    })
+
+@app.route('/api/chat/session', methods=['POST'])
+def create_chat_session():
+    """대화 세션 만들기 (첫 조건으로 후보 정책을 찾아 세션에 보관)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        conditions = session_conditions(data)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    try:
+        session = chat_sessions.create()
+        with session.lock:
+            snapshot = get_snapshot()
+            refine_session(session, snapshot, *conditions)
+            chat_sessions.save(session)
+            return session_result(session, snapshot, incremental=False)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/chat/session/<session_id>/refine', methods=['POST'])
+def refine_chat_session(session_id):
+    """후속 조건(나이/카테고리/키워드/질문)으로 세션 후보 좁히기 (지역 전체를 다시 조회하지 않음)"""
+    session = chat_sessions.get(session_id)
+    if session is None:
+        return jsonify({"success": False, "error": "세션이 없거나 만료되었습니다"}), 404
+    data = request.get_json(silent=True) or {}
+    try:
+        conditions = session_conditions(data)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    try:
+        with session.lock:
+            snapshot = get_snapshot()
+            incremental = refine_session(session, snapshot, *conditions)
+            chat_sessions.save(session)
+            return session_result(session, snapshot, incremental=incremental)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/chat/session/<session_id>', methods=['GET', 'DELETE'])
+def chat_session(session_id):
+    """세션 후보 정책 조회 (?offset=&limit=) / 세션 삭제"""
+    if request.method == 'DELETE':
+        return jsonify({"success": chat_sessions.delete(session_id)})
+    
+    session = chat_sessions.get(session_id)
+    if session is None:
+        return jsonify({"success": False, "error": "세션이 없거나 만료되었습니다"}), 404
+    offset = request.args.get('offset', '0')
+    limit = request.args.get('limit', '')
+    if not offset.isdigit() or (limit and not limit.isdigit()):
+        return jsonify({"success": False, "error": "offset/limit은 0 이상의 숫자여야 합니다."}), 400
+    
+    try:
+        with session.lock:
+            return session_result(session, get_snapshot(), int(offset), int(limit) if limit else None)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/chat/cache', methods=['GET'])
+def chat_cache_stats():
+    """챗봇 응답 캐시 통계 (적중률 등) + 요청 합치기/대화 세션 통계"""
+    return jsonify({"success": True, "cache": chat_cache.metrics(), "single_flight": flight.metrics(),
+                    "sessions": chat_sessions.metrics()})
+
 if __name__ == '__main__':
     print("🚀 복지정책 API 서버 시작...")
     print("📊 사용 가능한 엔드포인트:")
     print("   GET /api/health - 서버 상태 확인")
     print("   GET /api/policies - 모든 정책 조회")
     print("   GET /api/policies/region/<region> - 지역별 정책 조회")
-    print("   GET /api/policies/search?keyword=<keyword>&region=<region>&age=<age> - 정책 검색")
+    print("   GET /api/policies/search?keyword=<keyword>&region=<region>&age=<age>&category=<category> - 정책 검색")
+    print("   GET /api/policies/open?date=<YYYY-MM-DD>&region=<region>&include_always=<0|1> - 지금 신청 가능한 정책")
+    print("   GET /api/policies/upcoming?days=<days>&date=<YYYY-MM-DD>&region=<region> - 신청 예정 정책")
+    print("   GET /api/policies/closing?days=<days>&date=<YYYY-MM-DD>&region=<region> - 마감 임박 정책 (기본 7일)")
     print("   GET /api/regions - 지역 목록 조회")
     print("   GET /api/stats - 통계 정보")
+    print("   POST /api/chat {message, session_id} - 챗봇 응답 생성 (Watsonx.ai, 세션이 있으면 후보에서 좁힘)")
+    print("   GET|POST /api/chat/stream?message=<message>&region=<region>&age=<age> - 챗봇 응답 스트리밍 (SSE)")
+    print("   POST /api/chat/session {region, age, category, keyword, message} - 대화 세션 만들기")
+    print("   POST /api/chat/session/<id>/refine {age, category, keyword, message} - 세션 후보 좁히기")
+    print("   GET|DELETE /api/chat/session/<id>?offset=<offset>&limit=<limit> - 세션 후보 조회 / 삭제")
+    print("   GET /api/chat/cache - 챗봇 응답 캐시/요청 합치기/대화 세션 통계")
     print("\n🌐 서버 주소: http://localhost:5000")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
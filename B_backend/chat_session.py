@@ -0,0 +1,131 @@
+#"챗봇 대화 세션 저장소" (서버 메모리)
+#하는 일:
+#대화마다 지금까지의 조건(지역/나이/카테고리/키워드)과 남은 후보 정책을 작은 정수 배열(array)로 보관
+#  후보는 스냅샷 행 번호 (스냅샷이 없을 때 만든 후보는 정책 id)
+#세션 수 / 후보 배열 메모리 합계 / 안 쓴 시간으로 제한, 넘으면 가장 오래 안 쓴 세션부터 버림 (LRU)
+#언제 사용: app_flask_api_server.py의 /api/chat/session, /api/chat (session_id) - 조건 좁히기는 refine_session
+#  세션을 바꾸거나 후보를 읽을 때는 session.lock을 잡음 (같은 세션으로 요청이 동시에 와도 조건/후보가 섞이지 않게)
+#  세션은 워커 프로세스 메모리에 있으므로 워커가 여러 개면 같은 워커로 보내야 함 (없으면 새로 만들면 됨)
+
+import secrets
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from intent import Intent
+
+# 후보 배열 말고 세션 하나가 차지하는 대략의 메모리 (조건, dict 항목 등)
+SESSION_OVERHEAD = 512
+
+
+@dataclass
+class ChatSession:
+    session_id: str
+    region: str = ''
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
+    categories: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
+    rows: array = field(default_factory=lambda: array('i'))  # 남은 후보 (지역, 제목 순서)
+    version: Optional[int] = None  # 후보를 만든 스냅샷 데이터 세대 (None이면 DB에서 찾은 정책 id)
+    touched_at: float = field(default_factory=time.time)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)  # 세션 조건/후보 변경용
+
+    @property
+    def nbytes(self) -> int:
+        return SESSION_OVERHEAD + len(self.rows) * self.rows.itemsize
+
+    def intent(self) -> Intent:
+        """지금까지 조건을 Intent로 (응답 문장용)"""
+        return Intent((self.region,) if self.region else (), self.age_min, self.age_max, self.categories)
+
+    def conditions(self) -> Dict:
+        return {
+            'region': self.region,
+            'age_min': self.age_min,
+            'age_max': self.age_max,
+            'categories': list(self.categories),
+            'keywords': list(self.keywords),
+        }
+
+
+class ChatSessionStore:
+    """session_id → ChatSession (스레드 안전, 개수/메모리/유휴 시간 제한 LRU)"""
+
+    def __init__(self, max_sessions: int = 1000, max_bytes: int = 8 * 1024 * 1024, ttl: float = 1800):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl  # 이 시간(초) 동안 안 쓴 세션은 삭제
+        self._lock = threading.Lock()
+        self._sessions: 'OrderedDict[str, ChatSession]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}  # 세션별로 계산해 둔 메모리 (합계 갱신용)
+        self._bytes = 0
+        self.stats = {'created': 0, 'expired': 0, 'evicted': 0, 'missing': 0}
+
+    def create(self) -> ChatSession:
+        session = ChatSession(secrets.token_urlsafe(16))
+        with self._lock:
+            self.stats['created'] += 1
+            self._store(session)
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """세션 (없거나 유휴 시간이 지났으면 None)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                self.stats['missing'] += 1
+                return None
+            if time.time() - session.touched_at > self.ttl:
+                self._remove(session_id)
+                self.stats['expired'] += 1
+                self.stats['missing'] += 1
+                return None
+            session.touched_at = time.time()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def save(self, session: ChatSession):
+        """후보/조건을 바꾼 뒤 호출 (메모리 합계 갱신, 한도를 넘으면 오래된 세션 삭제)"""
+        with self._lock:
+            session.touched_at = time.time()
+            self._store(session)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._remove(session_id)
+            return True
+
+    def _store(self, session: ChatSession):
+        """self._lock을 잡은 상태에서 호출"""
+        self._bytes += session.nbytes - self._sizes.get(session.session_id, 0)
+        self._sizes[session.session_id] = session.nbytes
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        self._evict()
+
+    def _remove(self, session_id: str):
+        del self._sessions[session_id]
+        self._bytes -= self._sizes.pop(session_id)
+
+    def _evict(self):
+        """유휴 세션 → 그래도 넘으면 가장 오래 안 쓴 세션부터 (방금 쓴 세션 하나는 남김)"""
+        cutoff = time.time() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.touched_at >= cutoff:
+                break
+            self._remove(session_id)
+            self.stats['expired'] += 1
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._sessions)))
+            self.stats['evicted'] += 1
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats, sessions=len(self._sessions), bytes=self._bytes)
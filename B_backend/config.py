@@ -0,0 +1,44 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Config:
+    # IBM Watsonx.ai API 설정 (API 키는 서버 환경변수에만, 브라우저에는 보내지 않음)
+    IBM_API_KEY = os.getenv('IBM_API_KEY', '')
+    IAM_TOKEN_URL = os.getenv('IAM_TOKEN_URL', 'https://iam.cloud.ibm.com/identity/token')
+    WATSON_ENDPOINT = os.getenv('WATSON_ENDPOINT', 'https://us-south.ml.cloud.ibm.com/ml/v1/text/generation')
+    WATSON_VERSION = os.getenv('WATSON_VERSION', '2023-05-29')
+    # /ml/v1/text/generation은 모델/프로젝트가 필요, /deployments/... 엔드포인트면 비워 둠
+    WATSON_MODEL_ID = os.getenv('WATSON_MODEL_ID', '')
+    WATSON_PROJECT_ID = os.getenv('WATSON_PROJECT_ID', '')
+
+    # LLM 게이트웨이 설정
+    LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '3'))
+    LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', '30'))
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))  # 동시에 보내는 생성 요청 수 (= 연결 풀 크기)
+    LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '10'))  # 자리가 없을 때 기다리는 최대 시간
+    IAM_REFRESH_MARGIN = int(os.getenv('IAM_REFRESH_MARGIN', '300'))  # 만료 몇 초 전부터 미리 토큰 갱신
+
+    # LLM 응답 캐시 설정
+    LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', '1000'))  # 최대 캐시 항목 수
+    LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '3600'))  # 캐시 유지 시간(초)
+    LLM_CACHE_SIMILARITY = float(os.getenv('LLM_CACHE_SIMILARITY', '0.9'))  # 유사 질문 기준 (0이면 정확히 같은 질문만)
+
+    # 같은 요청 합치기 (gunicorn 워커끼리도 합치려면 같은 서버의 공유 폴더 지정, 비우면 워커 안 스레드끼리만)
+    SINGLE_FLIGHT_DIR = os.getenv('SINGLE_FLIGHT_DIR', '')
+
+    # 대화 세션 (워커 메모리에 후보 정책 배열 보관)
+    CHAT_SESSION_MAX = int(os.getenv('CHAT_SESSION_MAX', '1000'))  # 최대 세션 수
+    CHAT_SESSION_MAX_BYTES = int(os.getenv('CHAT_SESSION_MAX_BYTES', str(8 * 1024 * 1024)))  # 세션 메모리 합계 한도
+    CHAT_SESSION_TTL = float(os.getenv('CHAT_SESSION_TTL', '1800'))  # 이 시간(초) 동안 안 쓴 세션은 삭제
+
+    # 데이터베이스 설정 (sqlite:///<경로>, 상대 경로는 API 서버 폴더 기준)
+    DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///welfare_policies.db')
+
+    # CORS 설정
+    ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
+
+    # 서버 설정
+    FLASK_ENV = os.getenv('FLASK_ENV', 'development')
+    DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
@@ -0,0 +1,178 @@
+#"챗봇 질문 의도/조건 추출기" (LLM 없이 규칙으로)
+#하는 일:
+#질문에서 지역(서울/경기/인천 + 구/시 이름, 별칭), 나이("만 27세", "20대 후반", "스물다섯 살", "20~25세"),
+#정책 카테고리 키워드를 한 번에 찾음 (별칭 전체를 미리 컴파일한 정규식 하나로 한 번만 훑음)
+#지역 하나 + 나이나 카테고리가 있고 설명/비교를 묻는 질문이 아니면 answerable → DB에서 바로 답 (LLM 호출 X)
+#언제 사용: app_flask_api_server.py의 /api/chat, /api/chat/stream, llm_cache.py의 캐시 키
+#평가/속도 측정: python intent_benchmark.py (라벨 데이터 intent_samples.jsonl)
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from welfare_db.policy_schema import CATEGORY_KEYWORDS, CATEGORY_LABELS, REGION_NAMES
+
+# 서비스 지역 밖이라 DB에 없는 지역 (다른 지역의 같은 구 이름을 서울/인천으로 잘못 잡지 않도록 같이 인식)
+OTHER_REGION = 'other'
+
+# 지역 코드 → 별칭 (중구/동구/서구처럼 여러 지역에 있는 이름, 이천/고양/강화처럼 흔한 낱말은 '시/군/구'를 붙인 것만)
+# 경기 광주시는 '광주시'/'경기 광주'로만 (그냥 '광주', '광주광역시'는 서비스 밖 지역)
+REGION_ALIASES = {
+    'seoul': [
+        '서울', '서울시', '서울특별시', 'seoul',
+        '종로구', '용산구', '성동구', '광진구', '동대문구', '중랑구', '성북구', '강북구', '도봉구', '노원구',
+        '은평구', '서대문구', '마포구', '양천구', '강서구', '구로구', '금천구', '영등포구', '동작구', '관악구',
+        '서초구', '강남구', '송파구', '강동구',
+        '종로', '용산', '성동', '광진', '동대문', '중랑', '성북', '강북', '도봉', '노원', '은평', '서대문',
+        '마포', '양천', '강서', '구로', '금천', '영등포', '관악', '서초', '강남', '송파', '강동', '신촌', '홍대',
+    ],
+    'gyeonggi': [
+        '경기', '경기도', 'gyeonggi',
+        '수원', '성남', '고양시', '용인', '부천', '안산', '안양', '남양주', '화성시', '평택', '의정부', '시흥',
+        '파주', '김포', '광명', '군포', '하남', '오산', '이천시', '안성', '의왕', '양주시', '포천', '여주시',
+        '동두천', '과천', '구리시', '가평', '양평', '연천', '분당', '일산', '판교',
+        '광주시', '경기 광주', '경기도 광주', '경기광주',
+    ],
+    'incheon': [
+        '인천', '인천시', '인천광역시', 'incheon',
+        '미추홀구', '연수구', '남동구', '부평구', '계양구', '강화군', '옹진군',
+        '미추홀', '부평', '계양', '송도', '청라', '영종도', '검단',
+    ],
+    OTHER_REGION: [
+        '부산', '대구', '광주', '광주광역시', '대전', '울산', '세종', '강원', '충북', '충남', '충청', '전북', '전남', '전라',
+        '경북', '경남', '경상', '제주',
+    ],
+}
+
+# 시/도 이름 (나머지 구/시/동네 별칭은 '부산 강서구'처럼 서비스 밖 지역과 같이 나오면 그 지역 것으로 봄)
+PROVINCE_ALIASES = {'서울', '서울시', '서울특별시', 'seoul', '경기', '경기도', 'gyeonggi',
+                    '인천', '인천시', '인천광역시', 'incheon'}
+
+# policy_schema 카테고리 키워드에 더해 질문에서 자주 쓰는 표현 (App.js categoryKeywords 기준)
+CATEGORY_ALIASES = {
+    'housing': ['주거비', '임대료', '매입임대', '거주비', '자취', '원룸', '이사비'],
+    'employment': ['고용', '구직활동', '일자리', '알바', '직장'],
+    'finance': ['계좌', '투자', '부채', '채무', '목돈', '적립'],
+    'education': ['교육비', '등록금', '학비', '장학금', '공부'],
+    'health': ['정신건강', '마음건강', '체력', '검진'],
+    'startup': ['창업자', '사업자등록'],
+    'culture': ['전시', '콘서트', '뮤지컬', '연극', '문화패스'],
+    'living': ['교통비', '버스', '지하철', '대중교통', 'k-패스', 'k패스', '기후동행카드', '식비'],
+}
+
+# 이런 말이 있으면 조건 검색보다 설명이 필요한 질문 → LLM
+FREE_FORM_CUES = ['어떻게', '왜', '차이', '방법', '설명', '비교', '뭐가 좋', '추천해']
+
+_NATIVE_TENS = {'열': 10, '스물': 20, '스무': 20, '서른': 30, '마흔': 40}
+_NATIVE_ONES = {'한': 1, '하나': 1, '두': 2, '둘': 2, '세': 3, '셋': 3, '네': 4, '넷': 4, '다섯': 5,
+                '여섯': 6, '일곱': 7, '여덟': 8, '아홉': 9}
+_DECADE_PARTS = {'초반': (0, 3), '중반': (4, 6), '후반': (7, 9)}
+
+_AGE_RANGE = re.compile(r'(\d{1,2})\s*(?:세|살)?\s*[~\-]\s*(\d{1,2})\s*(?:세|살)')
+_AGE_EXACT = re.compile(r'(?:만\s*)?(\d{1,2})\s*(?:세|살)')
+_AGE_NATIVE = re.compile(r'(열|스물|스무|서른|마흔)\s*(하나|한|둘|두|셋|세|넷|네|다섯|여섯|일곱|여덟|아홉)?\s*살')
+_DECADE = re.compile(r'([1-9])0\s*대\s*(초반|중반|후반)?')
+
+
+def _build_matcher() -> Tuple[re.Pattern, Dict[str, Tuple[str, str]]]:
+    """별칭 전체 → (정규식 하나, 별칭 → (슬롯, 값)), 긴 별칭 먼저라 '강서구'가 '강서'보다 우선"""
+    table: Dict[str, Tuple[str, str]] = {}
+    for code, aliases in REGION_ALIASES.items():
+        for alias in aliases:
+            table[alias] = ('region', code)
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for keyword in keywords + CATEGORY_ALIASES.get(category, []):
+            table.setdefault(keyword, ('category', category))
+    for cue in FREE_FORM_CUES:
+        table[cue] = ('free_form', cue)
+    pattern = re.compile('|'.join(re.escape(alias) for alias in sorted(table, key=len, reverse=True)))
+    return pattern, table
+
+
+_MATCHER, _ALIAS_TABLE = _build_matcher()
+
+
+@dataclass
+class Intent:
+    regions: Tuple[str, ...] = ()  # 서비스 지역 코드 (찾은 순서, 중복 없음)
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
+    categories: Tuple[str, ...] = ()
+    out_of_scope: bool = False  # 서울/경기/인천 밖 지역이 나옴
+    free_form: bool = False  # 설명/비교/방법을 묻는 질문
+
+    @property
+    def region(self) -> Optional[str]:
+        return self.regions[0] if len(self.regions) == 1 else None
+
+    @property
+    def age(self) -> Optional[int]:
+        """정확한 나이 하나일 때만 (범위면 None)"""
+        return self.age_min if self.age_min is not None and self.age_min == self.age_max else None
+
+    @property
+    def answerable(self) -> bool:
+        """DB 조회만으로 답할 수 있는 질문인지 (지역 하나 + 나이나 카테고리, 설명 요청 아님)"""
+        return (self.region is not None and not self.out_of_scope and not self.free_form
+                and (self.age_min is not None or bool(self.categories)))
+
+    def key(self) -> tuple:
+        """캐시 키용 튜플"""
+        return self.regions, self.age_min, self.age_max, self.categories
+
+
+def parse_age(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """나이 표현 → (하한, 상한): '만 27세' (27, 27), '20대 후반' (27, 29), '20~25세' (20, 25)"""
+    match = _AGE_RANGE.search(text)
+    if match:
+        low, high = sorted((int(match.group(1)), int(match.group(2))))
+        return low, high
+    match = _AGE_EXACT.search(text)
+    if match:
+        age = int(match.group(1))
+        return age, age
+    match = _AGE_NATIVE.search(text)
+    if match:
+        age = _NATIVE_TENS[match.group(1)] + _NATIVE_ONES.get(match.group(2) or '', 0)
+        return age, age
+    match = _DECADE.search(text)
+    if match:
+        base = int(match.group(1)) * 10
+        low, high = _DECADE_PARTS.get(match.group(2) or '', (0, 9))
+        return base + low, base + high
+    return None, None
+
+
+def parse_intent(message: str) -> Intent:
+    """질문 → Intent (지역/나이/카테고리/서비스 밖 지역/설명 요청)"""
+    text = unicodedata.normalize('NFKC', message or '').lower()
+    found, categories = [], []  # found: (지역 코드, 시/도 이름으로 나왔는지)
+    out_of_scope = free_form = False
+    for match in _MATCHER.finditer(text):
+        slot, value = _ALIAS_TABLE[match.group()]
+        if slot == 'region':
+            if value == OTHER_REGION:
+                out_of_scope = True
+            else:
+                found.append((value, match.group() in PROVINCE_ALIASES))
+        elif slot == 'category':
+            if value not in categories:
+                categories.append(value)
+        else:
+            free_form = True
+    # 서비스 밖 지역과 같이 나온 구/동네 이름('부산 강서구', '부산 송도')은 그 지역 것
+    regions = dict.fromkeys(code for code, province in found if province or not out_of_scope)
+    age_min, age_max = parse_age(text)
+    return Intent(tuple(regions), age_min, age_max, tuple(categories), out_of_scope, free_form)
+
+
+def describe(intent: Intent) -> str:
+    """'서울 27세 주거' 같은 조건 요약 (응답 문장용)"""
+    parts = [REGION_NAMES.get(region, region) for region in intent.regions]
+    if intent.age is not None:
+        parts.append(f'{intent.age}세')
+    elif intent.age_min is not None:
+        parts.append(f'{intent.age_min}~{intent.age_max}세')
+    parts += [CATEGORY_LABELS.get(category, category) for category in intent.categories]
+    return ' '.join(parts)
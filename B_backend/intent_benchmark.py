@@ -0,0 +1,130 @@
+#"질문 의도 추출기 평가/속도 측정 도구"
+#하는 일:
+#라벨을 붙인 질문(intent_samples.jsonl)으로 intent.py의 지역/나이/카테고리/서비스 밖 지역/answerable 정확도 계산, 틀린 질문 출력
+#질문 하나 추출에 걸리는 시간(µs)과, answerable 질문을 스냅샷에서 바로 답하는 시간(ms) 측정
+#언제 사용: intent.py 별칭/규칙을 바꾼 뒤
+#예: python intent_benchmark.py --repeat 2000 --snapshot welfare_policies.snapshot
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from intent import parse_intent
+from welfare_db.policy_snapshot import PolicySnapshot
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SLOTS = ('regions', 'age', 'categories', 'out_of_scope', 'answerable')
+
+
+def load_samples(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def predicted_slots(intent):
+    """Intent → 라벨과 같은 모양 (지역/카테고리는 순서 무시)"""
+    return {
+        'regions': sorted(intent.regions),
+        'age': None if intent.age_min is None else [intent.age_min, intent.age_max],
+        'categories': sorted(intent.categories),
+        'out_of_scope': intent.out_of_scope,
+        'answerable': intent.answerable,
+    }
+
+
+def expected_slots(sample):
+    """라벨 한 줄 → predicted_slots와 같은 모양"""
+    return {
+        'regions': sorted(sample['regions']),
+        'age': sample['age'],
+        'categories': sorted(sample['categories']),
+        'out_of_scope': sample['out_of_scope'],
+        'answerable': sample['answerable'],
+    }
+
+
+def evaluate(samples):
+    """슬롯별 정답 수, 모든 슬롯이 맞은 수, 틀린 (질문, 라벨, 예측) 목록"""
+    correct = {slot: 0 for slot in SLOTS}
+    exact = 0
+    failures = []
+    for sample in samples:
+        expected = expected_slots(sample)
+        predicted = predicted_slots(parse_intent(sample['text']))
+        matched = [slot for slot in SLOTS if predicted[slot] == expected[slot]]
+        for slot in matched:
+            correct[slot] += 1
+        if len(matched) == len(SLOTS):
+            exact += 1
+        else:
+            failures.append((sample['text'], expected, predicted))
+    return correct, exact, failures
+
+
+def time_parsing(samples, repeat):
+    """질문 하나 추출 평균 시간 (µs)"""
+    texts = [sample['text'] for sample in samples]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            parse_intent(text)
+    return (time.perf_counter() - started) / (repeat * len(texts)) * 1e6
+
+
+def time_answers(samples, snapshot_path, repeat):
+    """answerable 질문: 추출 + 스냅샷 조회 + 정책 dict 생성 평균 시간 (ms)"""
+    snapshot = PolicySnapshot(snapshot_path)
+    texts = [sample['text'] for sample in samples if parse_intent(sample['text']).answerable]
+    if not texts:
+        return 0.0, 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            intent = parse_intent(text)
+            rows = snapshot.filter(region=intent.region, age=intent.age_min,
+                                   category=intent.categories[0] if intent.categories else None,
+                                   age_to=intent.age_max)
+            snapshot.policies(rows[:10])
+    elapsed = (time.perf_counter() - started) / (repeat * len(texts)) * 1000
+    snapshot.close()
+    return elapsed, len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="질문 의도 추출기 평가/속도 측정")
+    parser.add_argument('--samples', default=os.path.join(BASE_DIR, 'intent_samples.jsonl'), help="라벨 데이터 (JSONL)")
+    parser.add_argument('--repeat', type=int, default=1000, help="속도 측정 반복 횟수")
+    parser.add_argument('--snapshot', default=os.path.join(BASE_DIR, 'welfare_policies.snapshot'),
+                        help="DB 바로 답하기 시간 측정용 정책 스냅샷 (없으면 건너뜀)")
+    parser.add_argument('--min-accuracy', type=float, default=0.9, help="모든 슬롯 정답 비율이 이보다 낮으면 실패 코드")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    print(f"🧪 의도 추출 평가: {len(samples)}개 질문\n")
+
+    correct, exact, failures = evaluate(samples)
+    for slot in SLOTS:
+        print(f"   {slot}: {correct[slot]}/{len(samples)} ({correct[slot] / len(samples):.1%})")
+    accuracy = exact / len(samples)
+    print(f"   전체 슬롯 정답: {exact}/{len(samples)} ({accuracy:.1%})")
+    for text, expected, predicted in failures:
+        print(f"\n   ❌ {text}")
+        for slot in SLOTS:
+            if expected[slot] != predicted[slot]:
+                print(f"      {slot}: 정답 {expected[slot]} / 예측 {predicted[slot]}")
+
+    print(f"\n⏱️ 추출 속도: 질문당 {time_parsing(samples, args.repeat):.1f}µs")
+    if os.path.exists(args.snapshot):
+        answer_ms, answerable = time_answers(samples, args.snapshot, max(1, args.repeat // 10))
+        print(f"⏱️ DB 바로 답하기 ({answerable}개 질문): 질문당 {answer_ms:.3f}ms (추출 + 스냅샷 조회)")
+    else:
+        print(f"   (스냅샷이 없어 DB 응답 시간은 건너뜀: {args.snapshot})")
+
+    if accuracy < args.min_accuracy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
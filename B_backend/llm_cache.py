@@ -0,0 +1,130 @@
+#"챗봇 LLM 응답 캐시"
+#하는 일:
+#질문을 정규화(대소문자/공백/문장부호)하고 의도(지역, 나이, 카테고리, intent.py)를 뽑아서 캐시 키로 사용
+#  "서울 20대 월세 지원 있어?" / "서울 20대  월세 지원 있어" → 같은 키 → Watson 호출 없이 바로 응답
+#의도가 같은 캐시 항목 중 글자 3-gram 자카드 유사도가 높은 질문도 같은 질문으로 봄 (선택)
+#LRU + TTL로 오래되거나 안 쓰는 항목 삭제, 최대 항목 수 제한, 적중률 통계
+#언제 사용: app_flask_api_server.py의 /api/chat (LLM 게이트웨이 앞단)
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, Optional, Tuple
+
+from intent import parse_intent
+from welfare_db.near_duplicates import shingles
+
+_NOISE = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+
+# 의도가 같은 항목 중 유사 질문 비교는 최근 것부터 이만큼만 (질문 하나당 비교 횟수 일정)
+SIMILAR_SCAN_LIMIT = 50
+
+
+def normalize_prompt(message: str) -> str:
+    """질문 정규화 (전각/반각 통일, 소문자, 문장부호 제거, 공백 하나로)"""
+    text = unicodedata.normalize('NFKC', message or '').lower()
+    return _SPACES.sub(' ', _NOISE.sub(' ', text)).strip()
+
+
+class LLMResponseCache:
+    """정규화된 질문 + 의도 → LLM 응답 (스레드 안전 LRU/TTL 캐시)"""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600, similarity: float = 0.9):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity  # 0이면 유사 질문 매칭 안 함
+        self._lock = threading.Lock()
+        # 키 → (응답, 저장 시각, 질문 3-gram)
+        self._entries: 'OrderedDict[tuple, Tuple[str, float, frozenset]]' = OrderedDict()
+        # 의도 → 그 의도의 캐시 키들 (유사 질문 후보)
+        self._by_intent: Dict[tuple, 'OrderedDict[tuple, None]'] = {}
+        self.stats = {'hits': 0, 'similar_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def key(self, message: str) -> tuple:
+        """(지역들, 나이 하한, 상한, 카테고리들, 정규화된 질문) - 앞 4개가 의도"""
+        return parse_intent(message).key() + (normalize_prompt(message),)
+
+    def _remove(self, key: tuple):
+        self._entries.pop(key, None)
+        keys = self._by_intent.get(key[:4])
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._by_intent[key[:4]]
+
+    def _alive(self, key: tuple, now: float) -> bool:
+        """TTL이 지난 항목이면 지우고 False"""
+        if now - self._entries[key][1] <= self.ttl:
+            return True
+        self._remove(key)
+        self.stats['expirations'] += 1
+        return False
+
+    def _find_similar(self, key: tuple, grams: frozenset, now: float) -> Optional[tuple]:
+        """의도가 같은 항목 중 질문 3-gram 자카드 유사도가 similarity 이상인 것"""
+        candidates = self._by_intent.get(key[:4])
+        if not candidates or not grams:
+            return None
+        for candidate in list(islice(reversed(candidates), SIMILAR_SCAN_LIMIT)):
+            if not self._alive(candidate, now):
+                continue
+            other = self._entries[candidate][2]
+            if len(grams & other) / len(grams | other) >= self.similarity:
+                return candidate
+        return None
+
+    def get(self, message: str) -> Optional[str]:
+        """캐시된 응답 (없으면 None)"""
+        key = self.key(message)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries and self._alive(key, now):
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._entries[key][0]
+            if self.similarity:
+                similar = self._find_similar(key, frozenset(shingles(key[4])), now)
+                if similar is not None:
+                    self._entries.move_to_end(similar)
+                    self.stats['similar_hits'] += 1
+                    return self._entries[similar][0]
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, message: str, response: str):
+        key = self.key(message)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (response, time.monotonic(), frozenset(shingles(key[4])))
+            self._by_intent.setdefault(key[:4], OrderedDict())[key] = None
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def get_or_generate(self, message: str, generate: Callable[[], str]) -> Tuple[str, bool]:
+        """캐시에 있으면 (응답, True), 없으면 generate()로 만들어 저장 후 (응답, False)"""
+        cached = self.get(message)
+        if cached is not None:
+            return cached, True
+        response = generate()
+        if response:  # 빈 응답은 저장하지 않음 (다음 질문 때 다시 생성)
+            self.put(message, response)
+        return response, False
+
+    def metrics(self) -> Dict[str, float]:
+        """적중률 포함 통계"""
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        lookups = stats['hits'] + stats['similar_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['similar_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_intent.clear()
@@ -0,0 +1,241 @@
+#"Watsonx.ai 호출 게이트웨이" (브라우저 대신 서버가 LLM을 부름)
+#하는 일:
+#IAM 토큰을 프로세스 전체에서 한 번 받아 캐시, 만료 전에 백그라운드로 미리 갱신 (메시지마다 토큰 요청 X)
+#keep-alive 연결 풀(requests.Session)로 생성 API 호출, 연결/응답 타임아웃
+#동시 생성 요청 수 제한 (자리가 안 나면 LLMBusyError), 401이면 토큰 새로 받아 한 번 재시도
+#generation_stream 엔드포인트로 생성 토큰을 받는 대로 넘겨주기 (generate_stream)
+#언제 사용: app_flask_api_server.py의 /api/chat, /api/chat/stream (로컬 테스트는 llm_stub_server.py)
+
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+# App.js에서 쓰던 생성 파라미터
+DEFAULT_PARAMETERS = {
+    'decoding_method': 'sample',
+    'max_new_tokens': 200,
+    'temperature': 0.7,
+    'top_p': 1,
+    'top_k': 50,
+    'repetition_penalty': 1,
+}
+
+# 남은 유효시간이 이보다 짧은 토큰은 쓰지 않고 새로 받음 (요청 도중 만료 방지)
+MIN_TOKEN_LIFETIME = 30
+
+
+class LLMError(Exception):
+    """LLM 호출 실패 (네트워크/인증/응답 오류)"""
+
+
+class LLMBusyError(LLMError):
+    """동시 요청 한도가 차서 기다리다 포기함"""
+
+
+class IAMTokenCache:
+    """IBM IAM 액세스 토큰 캐시 (스레드 안전, 만료 refresh_margin초 전부터 백그라운드 갱신)"""
+
+    def __init__(self, api_key: str, url: str, session: requests.Session,
+                 timeout=(3, 10), refresh_margin: int = 300):
+        self.api_key = api_key
+        self.url = url
+        self.session = session
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refreshing = False
+
+    def get(self) -> str:
+        """유효한 토큰 (대부분 캐시에서 바로, 만료됐으면 한 스레드만 받아오고 나머지는 기다림)"""
+        token, expires_at = self._token, self._expires_at
+        now = time.time()
+        if token and now < expires_at - max(self.refresh_margin, MIN_TOKEN_LIFETIME):
+            return token
+        if token and now < expires_at - MIN_TOKEN_LIFETIME:
+            self._refresh_in_background()  # 아직 쓸 수 있으니 기다리지 않음
+            return token
+        with self._lock:
+            if self._token and time.time() < self._expires_at - MIN_TOKEN_LIFETIME:
+                return self._token  # 기다리는 동안 다른 스레드가 받아 옴
+            return self._fetch()
+
+    def invalidate(self):
+        """서버가 토큰을 거부했을 때 (다음 get에서 새로 받음)"""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                with self._lock:
+                    if time.time() < self._expires_at - self.refresh_margin:
+                        return  # 이미 다른 쪽에서 갱신
+                    self._fetch()
+            except LLMError as e:
+                print(f"⚠️ IAM 토큰 미리 갱신 실패 (기존 토큰 계속 사용): {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name='iam-token-refresh', daemon=True).start()
+
+    def _fetch(self) -> str:
+        """IAM에서 토큰 받기 (self._lock을 잡은 상태에서 호출)"""
+        try:
+            response = self.session.post(
+                self.url,
+                data={'grant_type': 'urn:ibm:params:oauth:grant-type:apikey', 'apikey': self.api_key},
+                headers={'Accept': 'application/json'},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise LLMError(f"IAM 토큰 요청 실패: {e}") from e
+        if not response.ok:
+            raise LLMError(f"IAM 토큰 요청 실패: HTTP {response.status_code} {response.text[:200]}")
+
+        data = response.json()
+        if not data.get('access_token'):
+            raise LLMError("IAM 응답에 access_token이 없습니다")
+        now = time.time()
+        # expiration(유닉스 시각)이 있으면 그대로, 없으면 expires_in(초)으로 계산
+        self._expires_at = float(data.get('expiration') or now + float(data.get('expires_in', 3600)))
+        self._token = data['access_token']
+        return self._token
+
+
+class WatsonxGateway:
+    """Watsonx.ai 텍스트 생성 클라이언트 (연결 풀 + 토큰 캐시 + 동시 요청 제한)"""
+
+    def __init__(self, api_key: str, endpoint: str, iam_url: str = Config.IAM_TOKEN_URL,
+                 version: Optional[str] = Config.WATSON_VERSION, model_id: str = '', project_id: str = '',
+                 connect_timeout: float = 3, read_timeout: float = 30,
+                 max_concurrency: int = 4, queue_timeout: float = 10, refresh_margin: int = 300):
+        self.endpoint = endpoint
+        self.version = version
+        self.model_id = model_id
+        self.project_id = project_id
+        self.timeout = (connect_timeout, read_timeout)
+        self.queue_timeout = queue_timeout
+
+        self.session = requests.Session()
+        # 생성 요청 수만큼 keep-alive 연결 유지 (+1은 토큰 갱신용)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_concurrency + 1)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.tokens = IAMTokenCache(api_key, iam_url, self.session,
+                                    timeout=(connect_timeout, 10), refresh_margin=refresh_margin)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def _payload(self, prompt: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        payload = {'input': prompt, 'parameters': dict(DEFAULT_PARAMETERS, **parameters)}
+        # 배포(deployment) 엔드포인트는 URL에 모델이 정해져 있어 model_id/project_id를 보내지 않음
+        if '/deployments/' not in self.endpoint:
+            if self.model_id:
+                payload['model_id'] = self.model_id
+            if self.project_id:
+                payload['project_id'] = self.project_id
+        return payload
+
+    def _post(self, prompt: str, parameters: Dict[str, Any], stream: bool = False) -> requests.Response:
+        """생성 API 호출 (401이면 토큰 새로 받아 한 번 더)"""
+        endpoint = self.endpoint
+        if stream:
+            # .../text/generation → .../text/generation_stream (배포 엔드포인트도 같은 규칙)
+            path, _, query = endpoint.partition('?')
+            endpoint = path + '_stream' + ('?' + query if query else '')
+        params = {'version': self.version} if self.version and 'version=' not in endpoint else None
+        payload = self._payload(prompt, parameters)
+        accept = 'text/event-stream' if stream else 'application/json'
+        for attempt in range(2):
+            headers = {'Authorization': f'Bearer {self.tokens.get()}', 'Accept': accept}
+            try:
+                response = self.session.post(endpoint, params=params, json=payload, headers=headers,
+                                             timeout=self.timeout, stream=stream)
+            except requests.RequestException as e:
+                raise LLMError(f"생성 요청 실패: {e}") from e
+            if response.status_code == 401 and attempt == 0:
+                response.close()
+                self.tokens.invalidate()
+                continue
+            if not response.ok:
+                raise LLMError(f"생성 요청 실패: HTTP {response.status_code} {response.text[:200]}")
+            return response
+
+    def generate(self, prompt: str, **parameters) -> str:
+        """프롬프트 → 생성된 텍스트 (parameters는 DEFAULT_PARAMETERS를 덮어씀)"""
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise LLMBusyError("LLM 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+        try:
+            data = self._post(prompt, parameters).json()
+        except ValueError as e:
+            raise LLMError(f"생성 응답이 JSON이 아닙니다: {e}") from e
+        finally:
+            self._slots.release()
+        results = data.get('results') or []
+        return (results[0].get('generated_text') or '').strip() if results else ''
+
+    def generate_stream(self, prompt: str, **parameters) -> Iterator[str]:
+        """프롬프트 → 생성되는 대로 텍스트 조각 (SSE data 줄마다 generated_text)
+        다 읽거나 닫을 때까지 동시 요청 자리 하나를 차지함"""
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise LLMBusyError("LLM 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+        try:
+            response = self._post(prompt, parameters, stream=True)
+            with response:
+                for line in response.iter_lines(chunk_size=None):  # 512바이트씩 모으지 않고 받는 대로
+                    if not line.startswith(b'data:'):
+                        continue  # id:/event: 줄, keep-alive 빈 줄
+                    try:
+                        data = json.loads(line[5:])
+                    except ValueError:
+                        continue
+                    results = data.get('results') or []
+                    text = results[0].get('generated_text') if results else None
+                    if text:
+                        yield text
+        except requests.RequestException as e:
+            raise LLMError(f"생성 스트림 끊김: {e}") from e
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self.session.close()
+
+
+_gateway: Optional[WatsonxGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> Optional[WatsonxGateway]:
+    """프로세스 전체에서 같이 쓰는 게이트웨이 (IBM_API_KEY가 없으면 None → 간단 응답으로 대체)"""
+    global _gateway
+    if _gateway is None and Config.IBM_API_KEY:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = WatsonxGateway(
+                    Config.IBM_API_KEY, Config.WATSON_ENDPOINT,
+                    iam_url=Config.IAM_TOKEN_URL,
+                    version=Config.WATSON_VERSION,
+                    model_id=Config.WATSON_MODEL_ID,
+                    project_id=Config.WATSON_PROJECT_ID,
+                    connect_timeout=Config.LLM_CONNECT_TIMEOUT,
+                    read_timeout=Config.LLM_READ_TIMEOUT,
+                    max_concurrency=Config.LLM_MAX_CONCURRENCY,
+                    queue_timeout=Config.LLM_QUEUE_TIMEOUT,
+                    refresh_margin=Config.IAM_REFRESH_MARGIN,
+                )
+    return _gateway
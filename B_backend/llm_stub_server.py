@@ -0,0 +1,155 @@
+#"Watsonx.ai 흉내 서버" (로컬 테스트용)
+#하는 일:
+#IAM 토큰(/identity/token)과 텍스트 생성(/ml/v1/text/generation, /ml/v1/text/generation_stream) 엔드포인트를 흉내냄
+#토큰 만료시간/응답 지연/스트림 토큰 간격을 조절할 수 있고, 엔드포인트별 요청 수와 동시 처리 최대치를 /stats로 확인
+#언제 사용: 실제 API 키 없이 llm_gateway.py / /api/chat을 확인할 때
+#예: python llm_stub_server.py --port 8089 --delay 0.5
+#    IAM_TOKEN_URL=http://127.0.0.1:8089/identity/token WATSON_ENDPOINT=http://127.0.0.1:8089/ml/v1/text/generation
+#    IBM_API_KEY=test python app_flask_api_server.py
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubState:
+    """요청 수 / 동시 처리 수 기록"""
+
+    def __init__(self, token_ttl: int, delay: float, token_delay: float = 0.05):
+        self.token_ttl = token_ttl
+        self.delay = delay
+        self.token_delay = token_delay
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.active = 0
+        self.max_active = 0
+        self.tokens = set()
+
+    def count(self, name: str):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive (게이트웨이 연결 재사용 확인용)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, text: str):
+        """Watsonx generation_stream처럼 단어마다 SSE 이벤트 (chunked 전송, 이벤트 하나 = chunk 하나)"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        words = text.split(' ')
+        for number, word in enumerate(words, 1):
+            piece = word if number == 1 else ' ' + word
+            result = {'generated_text': piece, 'stop_reason': 'eos_token' if number == len(words) else 'not_finished'}
+            event = f"id: {number}\nevent: message\ndata: {json.dumps({'results': [result]}, ensure_ascii=False)}\n\n"
+            data = event.encode('utf-8')
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            self.wfile.flush()
+            time.sleep(self.server.state.token_delay)
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def do_GET(self):
+        state = self.server.state
+        if urlparse(self.path).path == '/stats':
+            with state.lock:
+                self._send_json(200, {'counts': state.counts, 'max_active': state.max_active})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        state = self.server.state
+        path = urlparse(self.path).path
+        body = self._read_body()
+
+        if path == '/identity/token':
+            state.count('token')
+            form = parse_qs(body.decode('utf-8'))
+            if not form.get('apikey'):
+                self._send_json(400, {'errorMessage': 'apikey required'})
+                return
+            token = uuid.uuid4().hex
+            with state.lock:
+                state.tokens.add(token)
+            self._send_json(200, {
+                'access_token': token, 'token_type': 'Bearer',
+                'expires_in': state.token_ttl, 'expiration': int(time.time()) + state.token_ttl,
+            })
+            return
+
+        if path.endswith('/text/generation') or path.endswith('/text/generation_stream'):
+            stream = path.endswith('_stream')
+            state.count('generation_stream' if stream else 'generation')
+            token = (self.headers.get('Authorization') or '').replace('Bearer ', '')
+            if token not in state.tokens:
+                self._send_json(401, {'errors': [{'code': 'authentication_token_expired'}]})
+                return
+            with state.lock:
+                state.active += 1
+                state.max_active = max(state.max_active, state.active)
+            try:
+                time.sleep(state.delay)
+                prompt = json.loads(body or b'{}').get('input', '')
+                text = f"[stub] {prompt[:40]}"
+                try:
+                    if stream:
+                        self._send_stream(text)
+                    else:
+                        self._send_json(200, {'results': [{'generated_text': text, 'stop_reason': 'eos_token'}]})
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # 게이트웨이가 스트림을 중간에 닫거나 타임아웃으로 끊음
+            finally:
+                with state.lock:
+                    state.active -= 1
+            return
+
+        self._send_json(404, {'error': 'not found'})
+
+
+def make_server(port: int = 0, token_ttl: int = 3600, delay: float = 0.0,
+                token_delay: float = 0.05) -> ThreadingHTTPServer:
+    """흉내 서버 생성 (port=0이면 빈 포트, 주소는 server.server_address)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(token_ttl, delay, token_delay)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watsonx.ai 흉내 서버")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--token-ttl', type=int, default=3600, help="발급 토큰 유효시간(초)")
+    parser.add_argument('--delay', type=float, default=0.0, help="생성 응답 지연(초)")
+    parser.add_argument('--token-delay', type=float, default=0.05, help="스트림 응답의 단어 사이 지연(초)")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.token_ttl, args.delay, args.token_delay)
+    host, port = server.server_address
+    print(f"🧪 Watsonx 흉내 서버: http://{host}:{port} (토큰 {args.token_ttl}초, 지연 {args.delay}초)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
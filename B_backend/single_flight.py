@@ -0,0 +1,159 @@
+#"같은 요청 합치기 (single-flight)"
+#하는 일:
+#같은 키의 요청이 동시에 들어오면 하나만 실제로 계산하고 나머지는 그 결과를 같이 받음
+#  (정책 발표 직후 같은 검색/같은 질문이 몰려도 SQLite 쿼리/LLM 호출은 한 번)
+#워커 안: 스레드끼리 Event로 기다림
+#워커 사이(선택, lock_dir): 키별 잠금 파일(fcntl.flock)로 한 워커만 계산, 결과는 JSON 파일로 넘겨줌
+#  기다리기 시작한 뒤에 쓰인 결과만 씀 (끝난 계산 결과를 캐시처럼 다시 쓰지 않음)
+#언제 사용: app_flask_api_server.py의 정책 검색(find_policies), /api/chat LLM 생성
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: 워커 사이 합치기는 안 되고 스레드끼리만
+    fcntl = None
+
+
+class _Call:
+    """진행 중인 계산 하나 (먼저 온 요청이 계산, 나머지는 done을 기다림)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException = RuntimeError("같이 기다리던 계산이 끝나지 못했습니다")
+
+
+class SingleFlight:
+    """키가 같은 동시 호출을 하나로 합침 (lock_dir를 주면 같은 서버의 다른 워커 프로세스와도)"""
+
+    def __init__(self, lock_dir: str = '', wait_timeout: float = 60, cleanup_age: float = 600):
+        self.lock_dir = lock_dir if lock_dir and fcntl else ''
+        if lock_dir and not fcntl:
+            print("⚠️ 이 OS는 fcntl이 없어 워커 사이 요청 합치기는 끕니다 (스레드끼리만)")
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self.wait_timeout = wait_timeout  # 다른 워커 계산을 기다리는 최대 시간 (넘으면 직접 계산)
+        self.cleanup_age = cleanup_age  # 이보다 오래 안 쓴 잠금/결과 파일은 정리
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {'calls': 0, 'shared': 0, 'shared_across_workers': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """fn() 결과와, 다른 요청의 계산 결과를 받았는지 여부 (fn 예외는 기다린 요청 모두에게)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats['calls'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        shared = False
+        try:
+            if self.lock_dir:
+                call.result, shared = self._do_across_workers(key, fn)
+            else:
+                call.result = fn()
+            call.error = None
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, shared
+
+    def _paths(self, key: Hashable) -> Tuple[str, str]:
+        name = hashlib.blake2b(json.dumps(key, ensure_ascii=False, default=str).encode('utf-8'),
+                               digest_size=16).hexdigest()
+        return os.path.join(self.lock_dir, name + '.lock'), os.path.join(self.lock_dir, name + '.json')
+
+    def _do_across_workers(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """키별 잠금 파일을 잡은 워커만 계산, 잡을 때까지 기다린 워커는 그 사이 쓰인 결과를 읽음"""
+        lock_path, result_path = self._paths(key)
+        started = time.time()
+        with open(lock_path, 'a') as lock_file:
+            locked = self._acquire(lock_file, started)
+            try:
+                if locked:
+                    os.utime(lock_path)  # 정리 대상에서 빠지도록 (최근에 쓴 키)
+                    result = self._read_result(result_path, started)
+                    if result is not None:
+                        with self._lock:
+                            self.stats['shared_across_workers'] += 1
+                        return result['value'], True
+
+                value = fn()
+                if locked:
+                    self._write_result(result_path, value)
+                    self._cleanup()
+                return value, False
+            finally:
+                if locked:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _acquire(self, lock_file, started: float) -> bool:
+        """잠금 파일 잡기 (wait_timeout이 지나면 포기하고 직접 계산)"""
+        delay = 0.005
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.time() - started > self.wait_timeout:
+                    return False
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+
+    @staticmethod
+    def _read_result(path: str, started: float):
+        """기다리기 시작한 뒤에 쓰인 결과만 ({'value': ...}), 없으면 None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get('written_at', 0) >= started else None
+
+    @staticmethod
+    def _write_result(path: str, value: Any):
+        """다른 워커가 읽을 결과 파일 (JSON으로 못 바꾸는 결과면 공유하지 않음)"""
+        try:
+            data = json.dumps({'written_at': time.time(), 'value': value}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _cleanup(self):
+        """100번에 한 번, 오래 안 쓴 키의 잠금/결과 파일 삭제 (키 종류만큼 파일이 쌓이지 않게)"""
+        if self.stats['calls'] % 100:
+            return
+        cutoff = time.time() - self.cleanup_age
+        for name in os.listdir(self.lock_dir):
+            path = os.path.join(self.lock_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._calls))
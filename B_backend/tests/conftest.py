@@ -0,0 +1,57 @@
+# API 서버 모듈은 B_backend/ 폴더에서 바로 import 하는 구조라 테스트에서도 같은 경로를 씀
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# API 서버는 import할 때 DB를 마이그레이션하고 스냅샷을 쓰므로 저장소 DB 대신 임시 복사본을 씀
+_db_dir = tempfile.mkdtemp(prefix='welfare-api-test-')
+shutil.copy(os.path.join(BACKEND_DIR, 'welfare_policies.db'), _db_dir)
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'welfare_policies.db')
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_db_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def stub():
+    """llm_stub_server를 빈 포트에 띄우는 함수 (옵션은 make_server 인자, 테스트가 끝나면 종료)"""
+    from llm_stub_server import make_server
+    servers = []
+
+    def start(**options):
+        server = make_server(**options)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def gateway_for():
+    """흉내 서버를 가리키는 WatsonxGateway를 만드는 함수 (테스트가 끝나면 연결 닫음)"""
+    from llm_gateway import WatsonxGateway
+    gateways = []
+
+    def create(server, **options):
+        host, port = server.server_address
+        base = f'http://{host}:{port}'
+        gateway = WatsonxGateway('test-key', f'{base}/ml/v1/text/generation',
+                                 iam_url=f'{base}/identity/token', **options)
+        gateways.append(gateway)
+        return gateway
+
+    yield create
+    for gateway in gateways:
+        gateway.close()
@@ -0,0 +1,56 @@
+# API 서버 스냅샷 테스트: DB와 데이터 세대 번호가 같은 스냅샷만 쓰고, 다르면 DB로 조회하며 다시 만듦
+import sqlite3
+import time
+
+import app_flask_api_server as api
+from welfare_db.policy_snapshot import data_generation
+from welfare_db.policy_store import insert_data_to_db
+
+
+def wait_for_snapshot(timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        snapshot = api.get_snapshot()
+        if snapshot is not None:
+            return snapshot
+        time.sleep(0.02)
+    raise AssertionError("스냅샷이 다시 만들어지지 않음")
+
+
+def db_titles():
+    conn = sqlite3.connect(api.DB_PATH)
+    try:
+        return [title for title, in conn.execute('SELECT title FROM welfare_policies ORDER BY region, title')]
+    finally:
+        conn.close()
+
+
+def test_policies_come_from_snapshot_of_current_generation():
+    snapshot = wait_for_snapshot()
+    assert snapshot.generation == api.db_generation()
+
+    body = api.app.test_client().get('/api/policies').get_json()
+    assert body['success']
+    assert [policy['title'] for policy in body['policies']] == db_titles()
+
+
+def test_import_makes_snapshot_stale_until_rebuilt():
+    old = wait_for_snapshot()
+    conn = sqlite3.connect(api.DB_PATH)
+    try:
+        insert_data_to_db(conn, [{'title': '스냅샷 테스트 교통비 지원', 'url': 'https://example.com/snapshot-test',
+                                  'region': '서울', 'age_range': [19, 39], 'application_period': '상시',
+                                  'conditions': '', 'benefits': '교통 바우처'}])
+        generation = data_generation(conn)
+    finally:
+        conn.close()
+    assert generation == old.generation + 1
+
+    # 세대가 다른 스냅샷은 쓰지 않음 → 이번 요청은 DB로 조회해서 새 정책이 바로 보임
+    assert api.get_snapshot() is None
+    titles = [policy['title'] for policy in api.app.test_client().get('/api/policies').get_json()['policies']]
+    assert '스냅샷 테스트 교통비 지원' in titles
+
+    fresh = wait_for_snapshot()
+    assert fresh.generation == generation
+    assert '스냅샷 테스트 교통비 지원' in [policy['title'] for policy in fresh.policies(fresh.filter(region='seoul'))]
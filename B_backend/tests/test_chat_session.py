@@ -0,0 +1,160 @@
+# chat_session.py / 대화 세션 API 테스트: 세션 수/메모리/유휴 시간 제한(LRU), 후속 질문으로 후보 좁히기
+import types
+from array import array
+
+import pytest
+
+import chat_session
+from chat_session import SESSION_OVERHEAD, ChatSessionStore
+
+
+class Clock:
+    """chat_session이 보는 time.time 대신 (유휴 시간을 기다리지 않고 시간을 넘김)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(chat_session, 'time', types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+def create(store):
+    """새 세션 (만든 시각도 Clock 기준이 되도록 한 번 저장)"""
+    session = store.create()
+    store.save(session)
+    return session
+
+
+def test_least_recently_used_session_is_evicted_over_count():
+    store = ChatSessionStore(max_sessions=3)
+    sessions = [store.create() for _ in range(3)]
+    store.get(sessions[0].session_id)  # 0번을 최근에 씀 → 1번이 가장 오래 안 씀
+    store.create()
+    assert store.get(sessions[1].session_id) is None
+    assert store.get(sessions[0].session_id) is sessions[0]
+    assert store.get(sessions[2].session_id) is sessions[2]
+    assert store.metrics()['evicted'] == 1 and store.metrics()['sessions'] == 3
+
+
+def test_byte_limit_counts_candidate_arrays():
+    store = ChatSessionStore(max_sessions=100, max_bytes=3 * SESSION_OVERHEAD + 400 * 4)
+    first, second = store.create(), store.create()
+    first.rows = array('i', range(200))
+    store.save(first)
+    assert store.metrics()['bytes'] == 2 * SESSION_OVERHEAD + 200 * 4
+
+    # 후보를 줄이면 합계도 줄어듦
+    first.rows = array('i', range(50))
+    store.save(first)
+    assert store.metrics()['bytes'] == 2 * SESSION_OVERHEAD + 50 * 4
+
+    # 한도를 넘기면 가장 오래 안 쓴 세션부터 (방금 저장한 세션은 남김)
+    second.rows = array('i', range(500))
+    store.save(second)
+    assert store.get(first.session_id) is None
+    assert store.get(second.session_id) is second
+    metrics = store.metrics()
+    assert (metrics['sessions'], metrics['evicted'], metrics['bytes']) == (1, 1, SESSION_OVERHEAD + 500 * 4)
+
+
+def test_idle_session_expires_after_ttl(clock):
+    store = ChatSessionStore(ttl=60)
+    session = create(store)
+    clock.now += 59
+    assert store.get(session.session_id) is session  # 쓰면 유휴 시간이 다시 시작
+    clock.now += 59
+    assert store.get(session.session_id) is session
+    clock.now += 61
+    assert store.get(session.session_id) is None
+    assert store.metrics()['expired'] == 1 and store.metrics()['bytes'] == 0
+
+
+def test_idle_sessions_are_dropped_when_others_are_saved(clock):
+    store = ChatSessionStore(ttl=60)
+    idle = create(store)
+    clock.now += 61
+    active = create(store)
+    assert store.metrics()['sessions'] == 1
+    assert store.get(idle.session_id) is None and store.get(active.session_id) is active
+
+
+def test_delete_frees_session():
+    store = ChatSessionStore()
+    session = store.create()
+    assert store.delete(session.session_id) is True
+    assert store.delete(session.session_id) is False
+    assert store.metrics()['bytes'] == 0
+
+
+@pytest.fixture
+def api(monkeypatch):
+    import app_flask_api_server as api
+    monkeypatch.setattr(api, 'chat_sessions', ChatSessionStore())
+    return api
+
+
+def ids(body):
+    return [policy['id'] for policy in body['policies']]
+
+
+def expected_ids(api, region, age=None, category=''):
+    return [policy['id'] for policy in api.find_policies('', region, age, category, age_to=age)]
+
+
+def test_follow_up_conditions_narrow_session_candidates(api):
+    client = api.app.test_client()
+    body = client.post('/api/chat/session', json={'message': '서울 청년 정책'}).get_json()
+    session_id = body['session_id']
+    assert body['conditions']['region'] == 'seoul'
+    assert ids(body) == expected_ids(api, 'seoul') and body['count'] > 0
+
+    body = client.post(f'/api/chat/session/{session_id}/refine', json={'category': 'housing'}).get_json()
+    assert body['incremental'] is True
+    assert ids(body) == [policy_id for policy_id in expected_ids(api, 'seoul')
+                         if policy_id in expected_ids(api, 'seoul', category='housing')]
+
+    # 질문으로 나이를 더하면 /api/chat도 세션 후보에서 좁힘
+    body = client.post('/api/chat', json={'message': '25살이에요', 'session_id': session_id}).get_json()
+    assert (body['source'], body['incremental']) == ('session', True)
+    narrowed = client.get(f'/api/chat/session/{session_id}').get_json()
+    assert narrowed['conditions']['age_min'] == narrowed['conditions']['age_max'] == 25
+    assert set(ids(narrowed)) == set(expected_ids(api, 'seoul', 25, 'housing'))
+    assert body['count'] == narrowed['count'] <= len(expected_ids(api, 'seoul'))
+
+    # 지역이 바뀌면 처음부터 다시 찾음
+    body = client.post(f'/api/chat/session/{session_id}/refine', json={'region': 'incheon'}).get_json()
+    assert body['incremental'] is False
+    assert set(ids(body)) == set(expected_ids(api, 'incheon', 25, 'housing'))
+
+
+def test_paging_reads_session_candidates(api):
+    client = api.app.test_client()
+    body = client.post('/api/chat/session', json={'region': 'seoul'}).get_json()
+    page = client.get(f"/api/chat/session/{body['session_id']}?offset=2&limit=3").get_json()
+    assert ids(page) == ids(body)[2:5]
+    assert client.get(f"/api/chat/session/{body['session_id']}?offset=-1").status_code == 400
+    assert client.get('/api/chat/session/없는세션').status_code == 404
+
+
+def test_snapshot_gone_between_calls_falls_back_to_db(api, monkeypatch):
+    client = api.app.test_client()
+    body = client.post('/api/chat/session', json={'region': 'seoul', 'category': 'housing'}).get_json()
+    session = api.chat_sessions.get(body['session_id'])
+    assert session.version is not None  # 스냅샷 행 번호로 만든 후보
+    session.version -= 1  # 그 사이 임포트가 있었던 것처럼
+
+    # 세대가 바뀐 직후: 요청마다 None과 새 스냅샷이 섞여 나와도 한 요청 안에서는 같은 것을 씀
+    snapshot = api.get_snapshot()
+    answers = iter([None, snapshot])
+    monkeypatch.setattr(api, 'get_snapshot', lambda: next(answers, None))
+    page = client.get(f"/api/chat/session/{body['session_id']}").get_json()
+    assert page['success'] is True
+    assert session.version is None  # 스냅샷이 없어 DB에서 정책 id로 다시 찾음
+    assert set(ids(page)) == set(ids(body))
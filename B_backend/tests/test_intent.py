@@ -0,0 +1,62 @@
+# intent.py 테스트: 라벨 데이터(intent_samples.jsonl) 전체 슬롯, 서비스 밖 지역 질문의 스트림 응답
+import json
+import os
+
+import pytest
+
+from intent import parse_intent
+from intent_benchmark import expected_slots, load_samples, predicted_slots
+
+SAMPLES = load_samples(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'intent_samples.jsonl'))
+
+
+@pytest.mark.parametrize('sample', SAMPLES, ids=[sample['text'] for sample in SAMPLES])
+def test_labelled_sample(sample):
+    assert predicted_slots(parse_intent(sample['text'])) == expected_slots(sample)
+
+
+def test_district_next_to_other_region_is_not_a_service_region():
+    assert parse_intent('부산 강서구 월세 지원').regions == ()
+    assert parse_intent('강서구 월세 지원').regions == ('seoul',)
+    # 시/도 이름은 서비스 밖 지역과 같이 나와도 그대로
+    assert parse_intent('부산이랑 서울 비교').regions == ('seoul',)
+
+
+def stream_events(client, message):
+    """/api/chat/stream 응답 → [(이벤트 이름, data)]"""
+    body = client.post('/api/chat/stream', json={'message': message}).get_data(as_text=True)
+    events = []
+    for block in body.split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+@pytest.fixture
+def client(stub, gateway_for, monkeypatch):
+    import app_flask_api_server as api
+    server = stub(token_delay=0)
+    monkeypatch.setattr(api, 'get_gateway', lambda: gateway_for(server))
+    api.chat_cache.clear()
+    return api.app.test_client()
+
+
+@pytest.mark.parametrize('message', ['부산 강서구 월세 지원', '광주 20대 취업'])
+def test_stream_sends_no_policies_for_other_region(client, message):
+    events = stream_events(client, message)
+    policies = dict(events)['policies']
+    assert (policies['count'], policies['policies']) == (0, [])
+    assert (policies['region'], policies['age_min'], policies['category']) == ('', None, '')
+    # 규칙 답 대신 LLM 답
+    assert ''.join(data['text'] for event, data in events if event == 'token').startswith('[stub] ')
+    assert dict(events)['done']['source'] == 'llm'
+
+
+def test_stream_answers_service_region_from_db(client):
+    events = stream_events(client, '서울 20대 월세 지원 있어?')
+    policies = dict(events)['policies']
+    assert policies['region'] == 'seoul' and policies['count'] > 0
+    assert {policy['region'] for policy in policies['policies']} == {'seoul'}
+    assert dict(events)['done']['source'] == 'rules'
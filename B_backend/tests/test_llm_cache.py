@@ -0,0 +1,160 @@
+# llm_cache.py 테스트 (llm_stub_server.py를 생성 API로): 같은/비슷한 질문 적중, 의도가 다르면 따로, TTL/LRU, 적중률
+import types
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMResponseCache
+
+QUESTION = '청년 월세 지원 받으려면 어떤 서류가 필요한가요?'
+
+
+class Clock:
+    """llm_cache가 보는 time.monotonic 대신 (TTL을 기다리지 않고 시간을 넘김)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, 'time', types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def llm(stub, gateway_for):
+    """(흉내 서버, 캐시를 거쳐 생성하는 함수) - 생성 API 호출 수는 server.state.counts['generation']"""
+    server = stub()
+    gateway = gateway_for(server)
+
+    def ask(cache, message):
+        return cache.get_or_generate(message, lambda: gateway.generate(message))
+
+    return server, ask
+
+
+def generations(server) -> int:
+    return server.state.counts.get('generation', 0)
+
+
+def test_same_question_after_normalizing_is_an_exact_hit(llm):
+    server, ask = llm
+    cache = LLMResponseCache()
+    response, cached = ask(cache, QUESTION)
+    assert (response, cached) == (f'[stub] {QUESTION[:40]}', False)
+    assert ask(cache, '  청년 월세 지원 받으려면, 어떤 서류가 필요한가요 ') == (response, True)
+    assert ask(cache, QUESTION.upper()) == (response, True)
+    assert generations(server) == 1
+    assert cache.metrics()['hits'] == 2
+
+
+def test_similar_question_with_same_intent_is_a_similar_hit(llm):
+    server, ask = llm
+    cache = LLMResponseCache(similarity=0.9)
+    response, _ = ask(cache, QUESTION)
+    # 띄어쓰기만 다른 질문: 정규화한 문자열은 다르지만 3-gram은 같음
+    assert ask(cache, '청년 월세 지원 받으려면 어떤 서류가필요한가요') == (response, True)
+    assert generations(server) == 1
+    assert cache.metrics()['similar_hits'] == 1
+
+
+def test_similarity_zero_only_matches_exact_questions(llm):
+    server, ask = llm
+    cache = LLMResponseCache(similarity=0)
+    ask(cache, QUESTION)
+    assert ask(cache, '청년 월세 지원 받으려면 어떤 서류가필요한가요')[1] is False
+    assert generations(server) == 2
+
+
+@pytest.mark.parametrize('other', [
+    '청년 취업 지원 받으려면 어떤 서류가 필요한가요?',   # 카테고리가 다름
+    '서울 청년 월세 지원 받으려면 어떤 서류가 필요한가요?',  # 지역이 붙음
+    '25살 청년 월세 지원 받으려면 어떤 서류가 필요한가요?',  # 나이가 붙음
+])
+def test_different_intent_is_a_miss_even_for_similar_text(llm, other):
+    server, ask = llm
+    cache = LLMResponseCache(similarity=0.5)
+    ask(cache, QUESTION)
+    assert cache.key(other)[:4] != cache.key(QUESTION)[:4]
+    response, cached = ask(cache, other)
+    assert (response, cached) == (f'[stub] {other[:40]}', False)
+    assert generations(server) == 2
+
+
+def test_entries_expire_after_ttl(llm, clock):
+    server, ask = llm
+    cache = LLMResponseCache(ttl=60)
+    ask(cache, QUESTION)
+    clock.now += 59
+    assert ask(cache, QUESTION)[1] is True
+    clock.now += 2
+    assert ask(cache, QUESTION)[1] is False
+    assert ask(cache, '청년 월세 지원 받으려면 어떤 서류가필요한가요')[1] is True  # 다시 만든 항목과 비슷한 질문
+    assert generations(server) == 2
+    assert cache.metrics()['expirations'] == 1
+
+
+def test_expired_entry_is_not_a_similar_hit(llm, clock):
+    server, ask = llm
+    cache = LLMResponseCache(ttl=60)
+    ask(cache, QUESTION)
+    clock.now += 61
+    assert ask(cache, '청년 월세 지원 받으려면 어떤 서류가필요한가요')[1] is False
+    assert cache.metrics()['expirations'] == 1
+
+
+def test_size_bound_evicts_least_recently_used(llm):
+    server, ask = llm
+    cache = LLMResponseCache(max_entries=3, similarity=0)
+    questions = [f'질문 {number}번 자세히 설명해 주세요' for number in range(3)]
+    for question in questions:
+        ask(cache, question)
+    ask(cache, questions[0])  # 0번을 최근에 씀 → 1번이 가장 오래 안 씀
+    ask(cache, '새 질문 설명해 주세요')
+
+    metrics = cache.metrics()
+    assert metrics['entries'] == 3 and metrics['evictions'] == 1
+    assert cache.get(questions[0]) is not None
+    assert cache.get(questions[1]) is None
+    assert cache.get(questions[2]) is not None
+
+
+def test_empty_responses_are_not_cached():
+    cache = LLMResponseCache()
+    assert cache.get_or_generate(QUESTION, lambda: '') == ('', False)
+    assert cache.metrics()['entries'] == 0
+
+
+def test_hit_rate_counts_exact_and_similar_hits(llm):
+    server, ask = llm
+    cache = LLMResponseCache()
+    assert cache.metrics()['hit_rate'] == 0.0
+    ask(cache, QUESTION)                                       # miss
+    ask(cache, QUESTION)                                       # hit
+    ask(cache, '청년 월세 지원 받으려면 어떤 서류가필요한가요')  # similar hit
+    ask(cache, '청년 취업 지원 받으려면 어떤 서류가 필요한가요?')  # miss
+    metrics = cache.metrics()
+    assert (metrics['hits'], metrics['similar_hits'], metrics['misses']) == (1, 1, 2)
+    assert metrics['hit_rate'] == 0.5
+    assert generations(server) == 2
+
+
+def test_chat_endpoint_answers_repeated_question_from_cache(stub, gateway_for, monkeypatch):
+    import app_flask_api_server as api
+    server = stub()
+    monkeypatch.setattr(api, 'get_gateway', lambda: gateway_for(server))
+    api.chat_cache.clear()
+    client = api.app.test_client()
+
+    first = client.post('/api/chat', json={'message': QUESTION}).get_json()
+    second = client.post('/api/chat', json={'message': QUESTION + '!!'}).get_json()
+    assert first['source'] == second['source'] == 'llm'
+    assert (first['cached'], second['cached']) == (False, True)
+    assert second['response'] == first['response']
+    assert generations(server) == 1
+    assert client.get('/api/chat/cache').get_json()['cache']['hit_rate'] > 0
@@ -0,0 +1,119 @@
+# llm_gateway.py 테스트 (llm_stub_server.py를 로컬에 띄워서): 토큰 캐시/미리 갱신, 타임아웃, 동시 요청 제한
+import threading
+import time
+
+import pytest
+
+import llm_gateway
+from llm_gateway import LLMBusyError, LLMError
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("조건이 시간 안에 충족되지 않음")
+        time.sleep(0.01)
+
+
+def test_token_is_fetched_once_and_shared(stub, gateway_for):
+    server = stub()
+    gateway = gateway_for(server)
+    threads = [threading.Thread(target=gateway.generate, args=(f'질문 {number}',)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert gateway.generate('서울 청년 월세') == '[stub] 서울 청년 월세'
+    assert server.state.counts == {'token': 1, 'generation': 9}
+
+
+def test_token_is_refreshed_in_background_before_expiry(stub, gateway_for):
+    # 유효시간 200초 < 미리 갱신 기준 300초 → 받은 토큰은 바로 갱신 구간, 쓸 수는 있으므로 요청은 기다리지 않음
+    server = stub(token_ttl=200)
+    gateway = gateway_for(server, refresh_margin=300)
+    first = gateway.tokens.get()
+    assert gateway.tokens.get() == first
+    wait_until(lambda: server.state.counts.get('token') == 2)
+    wait_until(lambda: gateway.tokens._token != first)
+    assert gateway.generate('갱신 뒤') == '[stub] 갱신 뒤'
+
+
+def test_nearly_expired_token_is_replaced_before_use(stub, gateway_for):
+    # 남은 시간이 MIN_TOKEN_LIFETIME보다 짧은 토큰은 요청 도중 만료될 수 있으니 새로 받아서 씀
+    server = stub(token_ttl=llm_gateway.MIN_TOKEN_LIFETIME - 10)
+    gateway = gateway_for(server, refresh_margin=0)
+    gateway.generate('첫 번째')
+    gateway.generate('두 번째')
+    assert server.state.counts['token'] == 2
+
+
+def test_rejected_token_is_fetched_again_once(stub, gateway_for):
+    server = stub()
+    gateway = gateway_for(server)
+    gateway.generate('첫 번째')
+    server.state.tokens.clear()  # 서버가 발급한 토큰을 모두 무효로
+    assert gateway.generate('두 번째') == '[stub] 두 번째'
+    assert server.state.counts == {'token': 2, 'generation': 3}
+
+
+def test_slow_response_times_out(stub, gateway_for):
+    server = stub(delay=1.0)
+    gateway = gateway_for(server, read_timeout=0.2)
+    started = time.monotonic()
+    with pytest.raises(LLMError):
+        gateway.generate('느린 응답')
+    assert time.monotonic() - started < 0.9
+
+
+def test_unreachable_server_raises_llm_error(stub, gateway_for):
+    server = stub()
+    gateway = gateway_for(server, connect_timeout=0.5)
+    server.shutdown()
+    server.server_close()
+    with pytest.raises(LLMError):
+        gateway.generate('연결 안 됨')
+
+
+def test_concurrent_generations_are_capped(stub, gateway_for):
+    server = stub(delay=0.2)
+    gateway = gateway_for(server, max_concurrency=2)
+    results = []
+    threads = [threading.Thread(target=lambda n=number: results.append(gateway.generate(f'질문 {n}')))
+               for number in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 6
+    assert server.state.max_active == 2
+
+
+def test_full_gateway_gives_up_after_queue_timeout(stub, gateway_for):
+    server = stub(delay=0.5)
+    gateway = gateway_for(server, max_concurrency=1, queue_timeout=0.05)
+    busy = threading.Thread(target=gateway.generate, args=('먼저 온 질문',))
+    busy.start()
+    wait_until(lambda: server.state.max_active == 1)
+    with pytest.raises(LLMBusyError):
+        gateway.generate('나중 질문')
+    busy.join()
+    assert gateway.generate('자리 난 뒤') == '[stub] 자리 난 뒤'
+
+
+def test_stream_yields_pieces_and_frees_its_slot(stub, gateway_for):
+    server = stub(token_delay=0)
+    gateway = gateway_for(server, max_concurrency=1, queue_timeout=0.5)
+    assert ''.join(gateway.generate_stream('부산 청년 정책 알려줘')) == '[stub] 부산 청년 정책 알려줘'
+    # 스트림을 중간에 닫아도 자리를 돌려줌
+    stream = gateway.generate_stream('중간에 닫는 스트림')
+    next(stream)
+    stream.close()
+    assert gateway.generate('다음 질문') == '[stub] 다음 질문'
+    assert server.state.counts['generation_stream'] == 2
+
+
+def test_no_gateway_without_api_key(monkeypatch):
+    monkeypatch.setattr(llm_gateway.Config, 'IBM_API_KEY', '')
+    monkeypatch.setattr(llm_gateway, '_gateway', None)
+    assert llm_gateway.get_gateway() is None
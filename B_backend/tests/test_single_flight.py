@@ -0,0 +1,134 @@
+# single_flight.py 테스트: 스레드끼리 합치기(결과/예외 공유), 잠금 파일로 워커 프로세스끼리 합치기
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+import single_flight
+from single_flight import SingleFlight
+
+needs_flock = pytest.mark.skipif(single_flight.fcntl is None, reason="fcntl이 없는 OS")
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("조건이 시간 안에 충족되지 않음")
+        time.sleep(0.005)
+
+
+def run_together(flight, key, fn, callers):
+    """callers개 스레드가 같은 키로 do() → [(결과, 공유 여부) 또는 예외]
+    fn은 나머지가 모두 기다리기 시작한 뒤에 끝나도록 release를 기다림"""
+    release = threading.Event()
+    outcomes = [None] * callers
+
+    def call(number):
+        try:
+            outcomes[number] = flight.do(key, lambda: (release.wait(5), fn())[1])
+        except Exception as e:
+            outcomes[number] = e
+
+    threads = [threading.Thread(target=call, args=(number,)) for number in range(callers)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: flight.metrics()['shared'] == callers - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_concurrent_calls_run_once_and_share_result():
+    flight = SingleFlight()
+    runs = []
+    outcomes = run_together(flight, ('policies', '서울'), lambda: runs.append(1) or ['청년 월세 지원'], 8)
+    assert len(runs) == 1
+    assert [result for result, _ in outcomes] == [['청년 월세 지원']] * 8
+    assert sorted(shared for _, shared in outcomes) == [False] + [True] * 7
+    assert flight.metrics() == {'calls': 1, 'shared': 7, 'shared_across_workers': 0, 'in_flight': 0}
+
+
+def test_exception_is_raised_to_every_waiting_caller():
+    flight = SingleFlight()
+    runs = []
+
+    def fail():
+        runs.append(1)
+        raise ValueError("DB 잠김")
+
+    outcomes = run_together(flight, 'key', fail, 5)
+    assert len(runs) == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert len({id(outcome) for outcome in outcomes}) == 1
+    # 실패한 계산은 남지 않아 다음 호출은 새로 계산
+    assert flight.do('key', lambda: 'ok') == ('ok', False)
+
+
+def test_different_keys_and_later_calls_are_not_merged():
+    flight = SingleFlight()
+    runs = []
+    assert flight.do('a', lambda: runs.append('a') or 1) == (1, False)
+    assert flight.do('b', lambda: runs.append('b') or 2) == (2, False)
+    assert flight.do('a', lambda: runs.append('a') or 3) == (3, False)  # 끝난 결과는 캐시처럼 쓰지 않음
+    assert runs == ['a', 'b', 'a']
+
+
+def worker(lock_dir, log_path, start, results):
+    """워커 프로세스 하나: 모두 출발선에 선 뒤 같은 키로 do(), 계산하면 log에 pid 한 줄"""
+    flight = SingleFlight(lock_dir)
+
+    def compute():
+        with open(log_path, 'a') as f:
+            f.write(f'{os.getpid()}\n')
+        time.sleep(0.5)  # 나머지 워커가 잠금을 기다리는 동안
+        return {'count': 3, 'policies': ['청년 월세 지원']}
+
+    start.wait()
+    results.put(flight.do(('policies', '서울', 25), compute))
+
+
+@needs_flock
+def test_workers_share_one_computation_through_lock_files(tmp_path):
+    context = multiprocessing.get_context('fork')
+    log_path = str(tmp_path / 'computed.log')
+    start, results = context.Event(), context.Queue()
+    workers = [context.Process(target=worker, args=(str(tmp_path / 'locks'), log_path, start, results))
+               for _ in range(4)]
+    for process in workers:
+        process.start()
+    start.set()
+    outcomes = [results.get(timeout=10) for _ in workers]
+    for process in workers:
+        process.join(timeout=10)
+
+    with open(log_path) as f:
+        assert len(f.read().split()) == 1
+    assert [value for value, _ in outcomes] == [{'count': 3, 'policies': ['청년 월세 지원']}] * 4
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True]
+
+
+@needs_flock
+def test_worker_computes_itself_after_wait_timeout(tmp_path):
+    # 잠금 파일은 열 때마다 따로라 같은 프로세스의 두 인스턴스도 서로 다른 워커처럼 동작
+    holder, waiter = SingleFlight(str(tmp_path), wait_timeout=5), SingleFlight(str(tmp_path), wait_timeout=0.1)
+    computing, release = threading.Event(), threading.Event()
+    thread = threading.Thread(target=holder.do,
+                              args=('key', lambda: computing.set() or release.wait(5) and 'holder'))
+    thread.start()
+    assert computing.wait(5)  # holder가 잠금을 잡고 계산 중
+    assert waiter.do('key', lambda: 'waiter') == ('waiter', False)
+    release.set()
+    thread.join()
+
+
+@needs_flock
+def test_unserializable_result_is_not_shared_across_workers(tmp_path):
+    first, second = SingleFlight(str(tmp_path)), SingleFlight(str(tmp_path))
+    value = object()
+    assert first.do('key', lambda: value) == (value, False)
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.json')] == []
+    assert second.do('key', lambda: 'again') == ('again', False)
@@ -1,285 +1,580 @@
+import hashlib
 import sqlite3
 import json
 import os
+import time
+from array import array
+from collections import Counter
 from datetime import datetime
 
+# 스키마는 공용 패키지(welfare_db)의 마이그레이션 모듈이 관리
+from welfare_db.migrations import migrate
+from welfare_db.near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, duplicate_groups, policy_text
+
+# 나이대별 대상 정책 집계 구간 (구간과 나이 범위가 겹치면 포함)
+AGE_BUCKETS = [
+    (0, 19, "10대"),
+    (20, 29, "20대"),
+    (30, 39, "30대"),
+    (40, 100, "40대 이상")
+]
+
+# URL에 들어 있으면 해당 도메인으로 집계 (위에서부터 먼저 맞는 것)
+URL_DOMAINS = [
+    ('seoul', '서울시'),
+    ('incheon', '인천시'),
+    ('gg.go.kr', '경기도'),
+    ('bokjiro', '복지로')
+]
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def _age_group(age_min, age_max):
+    """나이 하한/상한 → 나이대 분포 라벨"""
+    if age_min is None and age_max is None:
+        return '나이정보없음'
+    if age_min is not None and age_max is not None:
+        if age_min >= 0 and age_max <= 19:
+            return '10대'
+        if age_min >= 20 and age_max <= 29:
+            return '20대'
+        if age_min >= 30 and age_max <= 39:
+            return '30대'
+    if age_min is not None and age_min >= 40:
+        return '40대이상'
+    return '기타'
+
+def _overlaps(age_min, age_max, low, high):
+    """정책 나이 범위와 [low, high] 구간이 겹치는지"""
+    return (age_min <= high and age_max >= low) or (age_min >= low and age_max <= high)
+
+def _url_domain(lowered_url):
+    for keyword, label in URL_DOMAINS:
+        if keyword in lowered_url:
+            return label
+    return '기타'
+
+# 정책 하나에 붙는 문제 코드 (validation_results.issues)
+ISSUE_CODES = ('empty_title', 'empty_url', 'empty_region', 'invalid_age', 'long_title',
+               'long_content', 'invalid_protocol', 'no_age')
+
+# 분포 지표 키 접두어 → metrics 항목
+DISTRIBUTIONS = {'region:': 'regions', 'age_group:': 'age_groups', 'domain:': 'domains', 'age_bucket:': 'age_buckets'}
+
+# 마지막 검증 시작 시각보다 이만큼 앞선 변경부터 다시 검사 (검증 중에 커밋된 느린 쓰기 대비)
+WATERMARK_MARGIN = '-10 minutes'
+
+def row_metric_keys(title, url, region, age_min, age_max, long_content):
+    """정책 한 행이 더하는 지표 키 목록 (문제 코드 포함)"""
+    keys = ['total', f'region:{region}', f'age_group:{_age_group(age_min, age_max)}']
+    
+    if not title:
+        keys.append('empty_title')
+    elif len(title) > 100:
+        keys.append('long_title')
+    
+    if not url:
+        keys += ['empty_url', 'domain:기타']
+    else:
+        lowered = url.lower()
+        if not lowered.startswith('http'):
+            keys.append('invalid_protocol')
+        keys.append(f'domain:{_url_domain(lowered)}')
+    
+    if not region or region == 'unknown':
+        keys.append('empty_region')
+    if long_content:
+        keys.append('long_content')
+    
+    if age_min is None and age_max is None:
+        keys.append('no_age')
+    if age_min is not None and age_max is not None:
+        if age_min > age_max:
+            keys.append('invalid_age')
+        if _overlaps(age_min, age_max, 20, 39):
+            keys.append('youth')
+        keys += [f'age_bucket:{label}' for min_age, max_age, label in AGE_BUCKETS
+                 if _overlaps(age_min, age_max, min_age, max_age)]
+    return keys
+
+def metrics_from_counts(counts):
+    """지표 키별 누적값 → 검증 출력/보고서용 metrics"""
+    metrics = {name: Counter() for name in DISTRIBUTIONS.values()}
+    for key in ('total', 'youth', 'duplicate_titles', 'duplicate_urls') + ISSUE_CODES:
+        metrics[key] = counts.get(key, 0)
+    for key, value in counts.items():
+        for prefix, name in DISTRIBUTIONS.items():
+            if key.startswith(prefix) and value:
+                metrics[name][key[len(prefix):]] = value
+    return metrics
+
+def diff_reports(old, new, path=''):
+    """두 보고서의 숫자 항목 비교 → {항목 경로: (이전 값, 현재 값)} (바뀐 것만)"""
+    changes = {}
+    for key in sorted(set(old) | set(new)):
+        before, after = old.get(key), new.get(key)
+        name = f"{path}{key}"
+        if isinstance(before, dict) or isinstance(after, dict):
+            changes.update(diff_reports(before or {}, after or {}, name + '.'))
+        elif isinstance(before, (int, float, type(None))) and isinstance(after, (int, float, type(None))):
+            if before != after:
+                changes[name] = (before or 0, after or 0)
+    return changes
+
 class WelfareDataValidator:
     def __init__(self, db_path):
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self.metrics = None  # collect_metrics 결과 (검증 출력과 보고서가 같이 사용)
+        self.run_id = None   # 이번 검증 실행 번호 (보고서 버전)
         
     def connect_db(self):
         """DB 연결"""
         try:
             self.conn = sqlite3.connect(self.db_path)
+            migrate(self.conn, verbose=False)  # 예전 스키마 DB면 통합 스키마로 업그레이드
             self.cursor = self.conn.cursor()
             print(f"✅ DB 연결 성공: {self.db_path}")
         except Exception as e:
             print(f"❌ DB 연결 실패: {e}")
             raise
     
+    def collect_metrics(self, batch_size=10000, full=False):
+        """지난 검증 이후 updated_at이 바뀐 정책만 다시 검사하고 지표 누적값을 증감으로 갱신
+        처음 실행/테이블 교체(임포트 swap)/full이면 테이블을 한 번 읽어서 전체 검사"""
+        started = time.monotonic()
+        run_started, watermark = self.conn.execute(
+            'SELECT CURRENT_TIMESTAMP, datetime(CURRENT_TIMESTAMP, ?)', (WATERMARK_MARGIN,)
+        ).fetchone()
+        table_root = self.conn.execute(
+            "SELECT rootpage FROM sqlite_master WHERE type = 'table' AND name = 'welfare_policies'"
+        ).fetchone()[0]
+        last_run = self.conn.execute('''
+            SELECT watermark, table_root FROM validation_runs
+            WHERE finished_at IS NOT NULL ORDER BY run_id DESC LIMIT 1
+        ''').fetchone()
+        full = full or last_run is None or last_run[1] != table_root
+        
+        self.conn.execute('BEGIN')
+        try:
+            if full:
+                checked, removed = self._validate_all(batch_size), 0
+            else:
+                checked = self._validate_changed(last_run[0], batch_size)
+                removed = self._remove_deleted()
+            self.cursor.execute('''
+                INSERT INTO validation_runs (started_at, finished_at, watermark, table_root, checked_rows, removed_rows)
+                VALUES (?, CURRENT_TIMESTAMP, ?, ?, ?, ?)
+            ''', (run_started, watermark, table_root, checked, removed))
+            self.run_id = self.cursor.lastrowid
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        
+        metrics = metrics_from_counts(dict(self.conn.execute('SELECT metric, value FROM validation_metrics')))
+        links = dict(self.conn.execute(
+            'SELECT policy_id, near_duplicate_of FROM validation_results WHERE near_duplicate_of IS NOT NULL'
+        ).fetchall())
+        metrics['near_duplicate_groups'] = duplicate_groups(links)
+        metrics.update(full=full, checked=checked, removed=removed, elapsed=time.monotonic() - started)
+        self.metrics = metrics
+        return metrics
+    
+    def _changed_rows(self, since, batch_size):
+        """검사할 정책 행 스트림 (since가 없으면 전체, 있으면 idx_updated_at 범위 스캔)"""
+        query = '''
+            SELECT id, title, url, region, age_min, age_max,
+                   LENGTH(conditions) > 1000 OR LENGTH(benefits) > 1000, conditions, benefits
+            FROM welfare_policies
+        '''
+        if since is None:
+            cursor = self.conn.execute(query + ' ORDER BY id')
+        else:
+            cursor = self.conn.execute(query + ' WHERE updated_at >= ? ORDER BY id', (since,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    
+    def _validate_all(self, batch_size):
+        """전체 검사: 테이블 1회 스캔, 중복/거의 중복은 메모리에서 세고 결과는 배치로 저장"""
+        for table in ('validation_results', 'validation_bands', 'validation_metrics'):
+            self.cursor.execute(f'DELETE FROM {table}')
+        
+        counts = Counter()
+        # 중복 검사용: 제목/URL 해시 → 개수 (긴 문자열 대신 16바이트 해시만 메모리에 유지)
+        title_counts = Counter()
+        url_counts = Counter()
+        near_index = NearDuplicateIndex()
+        
+        for rows in self._changed_rows(None, batch_size):
+            results = []
+            bands = []
+            for policy_id, title, url, region, age_min, age_max, long_content, conditions, benefits in rows:
+                keys = row_metric_keys(title, url, region, age_min, age_max, long_content)
+                counts.update(keys)
+                title_hash = _digest(title or '')
+                url_hash = _digest(url) if url else None
+                title_counts[title_hash] += 1
+                if url_hash:
+                    url_counts[url_hash] += 1
+                
+                signature = near_index.signature(policy_text(title, conditions, benefits))
+                link = None
+                if signature is not None:
+                    match = near_index.find(signature)
+                    link = match[0] if match else None
+                    near_index.insert(policy_id, signature)
+                    bands += [(band_key, policy_id) for band_key in near_index.band_keys(signature)]
+                
+                results.append((policy_id, json.dumps([key for key in keys if key in ISSUE_CODES]),
+                                json.dumps(keys), title_hash, url_hash,
+                                signature.tobytes() if signature is not None else None, link))
+            self._save_results(results, bands)
+        
+        counts['duplicate_titles'] = sum(1 for count in title_counts.values() if count > 1)
+        counts['duplicate_urls'] = sum(1 for count in url_counts.values() if count > 1)
+        self.cursor.executemany('INSERT INTO validation_metrics (metric, value) VALUES (?, ?)', counts.items())
+        return counts['total']
+    
+    def _save_results(self, results, bands):
+        self.cursor.executemany('''
+            INSERT OR REPLACE INTO validation_results
+            (policy_id, issues, metric_keys, title_hash, url_hash, signature, near_duplicate_of)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', results)
+        self.cursor.executemany('INSERT OR IGNORE INTO validation_bands (band_key, policy_id) VALUES (?, ?)', bands)
+    
+    def _validate_changed(self, since, batch_size):
+        """증분 검사: 바뀐 정책마다 이전 기여분을 빼고 새 결과를 더함 (중복 수는 해시 인덱스로 확인)"""
+        near_index = NearDuplicateIndex()
+        deltas = Counter()
+        checked = 0
+        
+        for rows in self._changed_rows(since, batch_size):
+            for policy_id, title, url, region, age_min, age_max, long_content, conditions, benefits in rows:
+                old = self.cursor.execute(
+                    'SELECT metric_keys, title_hash, url_hash FROM validation_results WHERE policy_id = ?', (policy_id,)
+                ).fetchone()
+                keys = row_metric_keys(title, url, region, age_min, age_max, long_content)
+                deltas.update(keys)
+                if old:
+                    deltas.subtract(json.loads(old[0]))
+                
+                title_hash = _digest(title or '')
+                url_hash = _digest(url) if url else None
+                self._move_hash(deltas, 'duplicate_titles', 'title_hash', old[1] if old else None, title_hash)
+                self._move_hash(deltas, 'duplicate_urls', 'url_hash', old[2] if old else None, url_hash)
+                
+                signature = near_index.signature(policy_text(title, conditions, benefits))
+                link = self._relink_near_duplicates(near_index, policy_id, signature)
+                self._save_results([(policy_id, json.dumps([key for key in keys if key in ISSUE_CODES]),
+                                     json.dumps(keys), title_hash, url_hash,
+                                     signature.tobytes() if signature is not None else None, link)],
+                                   [(band_key, policy_id) for band_key in near_index.band_keys(signature)]
+                                   if signature is not None else [])
+                checked += 1
+        
+        self._apply_deltas(deltas)
+        return checked
+    
+    def _move_hash(self, deltas, metric, column, old_hash, new_hash):
+        """정책의 제목/URL 해시가 바뀔 때 중복 개수 증감 (같은 해시가 2개가 되거나 1개로 줄 때만 바뀜)"""
+        if old_hash == new_hash:
+            return
+        if old_hash is not None:
+            count = self.cursor.execute(f'SELECT COUNT(*) FROM validation_results WHERE {column} = ?',
+                                        (old_hash,)).fetchone()[0]
+            if count == 2:
+                deltas[metric] -= 1
+        if new_hash is not None:
+            count = self.cursor.execute(f'SELECT COUNT(*) FROM validation_results WHERE {column} = ?',
+                                        (new_hash,)).fetchone()[0]
+            if count == 1:
+                deltas[metric] += 1
+    
+    def _similar_policies(self, near_index, policy_id, signature):
+        """저장된 LSH 버킷에서 후보를 찾아 서명 일치율로 확인 → 비슷한 정책 id 목록"""
+        similar = []
+        checked = {policy_id}
+        for band_key in near_index.band_keys(signature):
+            candidates = self.cursor.execute(
+                'SELECT policy_id FROM validation_bands WHERE band_key = ? LIMIT ?', (band_key, near_index.max_bucket)
+            ).fetchall()
+            for (candidate,) in candidates:
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                row = self.cursor.execute('SELECT signature FROM validation_results WHERE policy_id = ?',
+                                          (candidate,)).fetchone()
+                if row and row[0] and near_index.similarity(signature, array('I', row[0])) >= near_index.threshold:
+                    similar.append(candidate)
+        return similar
+    
+    def _relink_near_duplicates(self, near_index, policy_id, signature):
+        """바뀐 정책의 거의 중복 연결 갱신 → 이 정책이 가리킬 더 앞선 정책 id (없으면 None)
+        뒤 정책 중 비슷한 것은 이 정책을 가리키게 하고, 더 이상 비슷하지 않은 정책의 연결은 다시 찾음"""
+        self.cursor.execute('DELETE FROM validation_bands WHERE policy_id = ?', (policy_id,))
+        similar = self._similar_policies(near_index, policy_id, signature) if signature is not None else []
+        
+        for later in (candidate for candidate in similar if candidate > policy_id):
+            self.cursor.execute('''
+                UPDATE validation_results SET near_duplicate_of = ?
+                WHERE policy_id = ? AND (near_duplicate_of IS NULL OR near_duplicate_of > ?)
+            ''', (policy_id, later, policy_id))
+        
+        dependents = self.cursor.execute(
+            'SELECT policy_id, signature FROM validation_results WHERE near_duplicate_of = ?', (policy_id,)
+        ).fetchall()
+        for dependent, stored in dependents:
+            if signature is not None and near_index.similarity(signature, array('I', stored)) >= near_index.threshold:
+                continue
+            earlier = [candidate for candidate in
+                       self._similar_policies(near_index, dependent, array('I', stored))
+                       if candidate < dependent and candidate != policy_id]
+            self.cursor.execute('UPDATE validation_results SET near_duplicate_of = ? WHERE policy_id = ?',
+                                (min(earlier) if earlier else None, dependent))
+        
+        earlier = [candidate for candidate in similar if candidate < policy_id]
+        return min(earlier) if earlier else None
+    
+    def _remove_deleted(self):
+        """삭제된 정책의 검증 결과/기여분 제거 (결과 수가 정책 수보다 많을 때만 찾음)"""
+        policies = self.conn.execute('SELECT COUNT(*) FROM welfare_policies').fetchone()[0]
+        results = self.conn.execute('SELECT COUNT(*) FROM validation_results').fetchone()[0]
+        if results <= policies:
+            return 0
+        
+        deltas = Counter()
+        removed = self.cursor.execute('''
+            SELECT policy_id, metric_keys, title_hash, url_hash FROM validation_results
+            WHERE policy_id NOT IN (SELECT id FROM welfare_policies)
+        ''').fetchall()
+        for policy_id, metric_keys, title_hash, url_hash in removed:
+            deltas.subtract(json.loads(metric_keys))
+            self._move_hash(deltas, 'duplicate_titles', 'title_hash', title_hash, None)
+            self._move_hash(deltas, 'duplicate_urls', 'url_hash', url_hash, None)
+            self.cursor.execute('DELETE FROM validation_results WHERE policy_id = ?', (policy_id,))
+            self._relink_near_duplicates(NearDuplicateIndex(), policy_id, None)
+        self._apply_deltas(deltas)
+        return len(removed)
+    
+    def _apply_deltas(self, deltas):
+        self.cursor.executemany('''
+            INSERT INTO validation_metrics (metric, value) VALUES (?, ?)
+            ON CONFLICT(metric) DO UPDATE SET value = value + excluded.value
+        ''', [(metric, value) for metric, value in deltas.items() if value])
+    
     def validate_data_quality(self):
         """데이터 품질 검증"""
         print("\n🔍 데이터 품질 검증 시작...")
+        metrics = self.collect_metrics()
+        if metrics['full']:
+            print(f"  (전체 검사: 테이블 1회 스캔, {metrics['checked']}행, {metrics['elapsed']:.2f}초)")
+        else:
+            print(f"  (증분 검사: 바뀐 정책 {metrics['checked']}개, 삭제된 정책 {metrics['removed']}개, "
+                  f"{metrics['elapsed']:.2f}초)")
         
         # 1. 기본 통계
-        self._show_basic_stats()
+        self._show_basic_stats(metrics)
         
         # 2. 필수 필드 검증
-        self._validate_required_fields()
+        self._validate_required_fields(metrics)
         
         # 3. 데이터 일관성 검증
-        self._validate_data_consistency()
+        self._validate_data_consistency(metrics)
         
         # 4. 중복 데이터 검증
-        self._validate_duplicates()
+        self._validate_duplicates(metrics)
         
         # 5. URL 유효성 검증
-        self._validate_urls()
+        self._validate_urls(metrics)
         
         # 6. 나이 범위 검증
-        self._validate_age_ranges()
+        self._validate_age_ranges(metrics)
         
         print("\n✅ 데이터 품질 검증 완료")
     
-    def _show_basic_stats(self):
+    def _show_basic_stats(self, metrics):
         """기본 통계 정보"""
         print("\n📊 기본 통계:")
         
-        # 전체 개수
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies')
-        total_count = self.cursor.fetchone()[0]
+        total_count = metrics['total']
         print(f"  총 정책 수: {total_count}개")
         
-        # 지역별 분포
-        self.cursor.execute('''
-            SELECT region, COUNT(*) as count 
-            FROM welfare_policies 
-            GROUP BY region 
-            ORDER BY count DESC
-        ''')
-        region_stats = self.cursor.fetchall()
         print(f"  지역별 분포:")
-        for region, count in region_stats:
+        for region, count in metrics['regions'].most_common():
             percentage = (count / total_count) * 100
             print(f"    {region}: {count}개 ({percentage:.1f}%)")
         
-        # 나이대별 분포
-        self.cursor.execute('''
-            SELECT 
-                CASE 
-                    WHEN age_min = -1 THEN '나이정보없음'
-                    WHEN age_min >= 0 AND age_max <= 19 THEN '10대'
-                    WHEN age_min >= 20 AND age_max <= 29 THEN '20대'
-                    WHEN age_min >= 30 AND age_max <= 39 THEN '30대'
-                    WHEN age_min >= 40 THEN '40대이상'
-                    ELSE '기타'
-                END as age_group,
-                COUNT(*) as count
-            FROM welfare_policies 
-            GROUP BY age_group 
-            ORDER BY count DESC
-        ''')
-        age_stats = self.cursor.fetchall()
         print(f"  나이대별 분포:")
-        for age_group, count in age_stats:
+        for age_group, count in metrics['age_groups'].most_common():
             percentage = (count / total_count) * 100
             print(f"    {age_group}: {count}개 ({percentage:.1f}%)")
     
-    def _validate_required_fields(self):
+    def _validate_required_fields(self, metrics):
         """필수 필드 검증"""
         print("\n🔍 필수 필드 검증:")
         
-        # 제목이 없는 정책
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies WHERE title IS NULL OR title = ""')
-        empty_title_count = self.cursor.fetchone()[0]
-        print(f"  제목 없는 정책: {empty_title_count}개")
-        
-        # URL이 없는 정책
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies WHERE url IS NULL OR url = ""')
-        empty_url_count = self.cursor.fetchone()[0]
-        print(f"  URL 없는 정책: {empty_url_count}개")
-        
-        # 지역 정보가 없는 정책
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies WHERE region IS NULL OR region = "" OR region = "미정"')
-        empty_region_count = self.cursor.fetchone()[0]
-        print(f"  지역 정보 없는 정책: {empty_region_count}개")
+        print(f"  제목 없는 정책: {metrics['empty_title']}개")
+        print(f"  URL 없는 정책: {metrics['empty_url']}개")
+        print(f"  지역 정보 없는 정책: {metrics['empty_region']}개")
         
-        if empty_title_count > 0 or empty_url_count > 0:
+        if metrics['empty_title'] > 0 or metrics['empty_url'] > 0:
             print("  ⚠️ 필수 필드가 누락된 정책이 있습니다.")
         else:
             print("  ✅ 모든 필수 필드가 완성되어 있습니다.")
     
-    def _validate_data_consistency(self):
+    def _validate_data_consistency(self, metrics):
         """데이터 일관성 검증"""
         print("\n🔍 데이터 일관성 검증:")
         
         # 나이 범위가 이상한 정책 (최소값이 최대값보다 큰 경우)
-        self.cursor.execute('''
-            SELECT COUNT(*) FROM welfare_policies 
-            WHERE age_min > age_max AND age_min != -1 AND age_max != -1
-        ''')
-        invalid_age_count = self.cursor.fetchone()[0]
-        print(f"  나이 범위 이상한 정책: {invalid_age_count}개")
-        
-        # 너무 긴 제목 (100자 이상)
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies WHERE LENGTH(title) > 100')
-        long_title_count = self.cursor.fetchone()[0]
-        print(f"  제목이 너무 긴 정책 (100자 이상): {long_title_count}개")
-        
-        # 너무 긴 조건/혜택 (1000자 이상)
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies WHERE LENGTH(conditions) > 1000 OR LENGTH(benefits) > 1000')
-        long_content_count = self.cursor.fetchone()[0]
-        print(f"  내용이 너무 긴 정책 (1000자 이상): {long_content_count}개")
+        print(f"  나이 범위 이상한 정책: {metrics['invalid_age']}개")
+        print(f"  제목이 너무 긴 정책 (100자 이상): {metrics['long_title']}개")
+        print(f"  내용이 너무 긴 정책 (1000자 이상): {metrics['long_content']}개")
     
-    def _validate_duplicates(self):
+    def _validate_duplicates(self, metrics):
         """중복 데이터 검증"""
         print("\n🔍 중복 데이터 검증:")
         
-        # 제목 기준 중복
-        self.cursor.execute('''
-            SELECT title, COUNT(*) as count 
-            FROM welfare_policies 
-            GROUP BY title 
-            HAVING count > 1
-            ORDER BY count DESC
-        ''')
-        duplicate_titles = self.cursor.fetchall()
-        print(f"  제목 중복 정책: {len(duplicate_titles)}개")
-        
-        # URL 기준 중복
-        self.cursor.execute('''
-            SELECT url, COUNT(*) as count 
-            FROM welfare_policies 
-            GROUP BY url 
-            HAVING count > 1
-            ORDER BY count DESC
-        ''')
-        duplicate_urls = self.cursor.fetchall()
-        print(f"  URL 중복 정책: {len(duplicate_urls)}개")
-        
-        if duplicate_titles or duplicate_urls:
+        print(f"  제목 중복 정책: {metrics['duplicate_titles']}개")
+        print(f"  URL 중복 정책: {metrics['duplicate_urls']}개")
+        
+        groups = metrics['near_duplicate_groups']
+        print(f"  거의 중복인 정책 묶음 (제목/조건/혜택 유사도 {DEFAULT_THRESHOLD:.0%} 이상): "
+              f"{len(groups)}개 ({sum(len(group) for group in groups)}개 정책)")
+        titles = self._titles([policy_id for group in groups[:3] for policy_id in group])
+        for group in groups[:3]:
+            print(f"    {' / '.join(titles.get(policy_id, str(policy_id)) for policy_id in group[:4])}")
+        
+        if metrics['duplicate_titles'] or metrics['duplicate_urls'] or groups:
             print("  ⚠️ 중복 데이터가 발견되었습니다.")
         else:
             print("  ✅ 중복 데이터가 없습니다.")
     
-    def _validate_urls(self):
+    def _titles(self, policy_ids):
+        """정책 id → 제목 (출력할 몇 개만 기본 키로 조회)"""
+        if not policy_ids:
+            return {}
+        placeholders = ', '.join('?' for _ in policy_ids)
+        return dict(self.conn.execute(
+            f'SELECT id, title FROM welfare_policies WHERE id IN ({placeholders})', policy_ids
+        ).fetchall())
+    
+    def _validate_urls(self, metrics):
         """URL 유효성 검증"""
         print("\n🔍 URL 유효성 검증:")
         
-        # HTTP/HTTPS 프로토콜 확인
-        self.cursor.execute('''
-            SELECT COUNT(*) FROM welfare_policies 
-            WHERE url NOT LIKE 'http%'
-        ''')
-        invalid_protocol_count = self.cursor.fetchone()[0]
-        print(f"  HTTP/HTTPS가 아닌 URL: {invalid_protocol_count}개")
-        
-        # 도메인별 분포
-        self.cursor.execute('''
-            SELECT 
-                CASE 
-                    WHEN url LIKE '%seoul%' THEN '서울시'
-                    WHEN url LIKE '%incheon%' THEN '인천시'
-                    WHEN url LIKE '%gg.go.kr%' THEN '경기도'
-                    WHEN url LIKE '%bokjiro%' THEN '복지로'
-                    ELSE '기타'
-                END as domain,
-                COUNT(*) as count
-            FROM welfare_policies 
-            GROUP BY domain 
-            ORDER BY count DESC
-        ''')
-        domain_stats = self.cursor.fetchall()
+        print(f"  HTTP/HTTPS가 아닌 URL: {metrics['invalid_protocol']}개")
+        
         print(f"  도메인별 분포:")
-        for domain, count in domain_stats:
+        for domain, count in metrics['domains'].most_common():
             print(f"    {domain}: {count}개")
     
-    def _validate_age_ranges(self):
+    def _validate_age_ranges(self, metrics):
         """나이 범위 검증"""
         print("\n🔍 나이 범위 검증:")
         
-        # 나이 정보가 없는 정책
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies WHERE age_min = -1 OR age_max = -1')
-        no_age_count = self.cursor.fetchone()[0]
-        print(f"  나이 정보 없는 정책: {no_age_count}개")
-        
-        # 청년 대상 정책 (20-39세)
-        self.cursor.execute('''
-            SELECT COUNT(*) FROM welfare_policies 
-            WHERE (age_min >= 20 AND age_max <= 39) 
-            OR (age_min <= 20 AND age_max >= 20)
-            OR (age_min <= 39 AND age_max >= 39)
-        ''')
-        youth_count = self.cursor.fetchone()[0]
-        print(f"  청년 대상 정책 (20-39세): {youth_count}개")
+        print(f"  나이 정보 없는 정책: {metrics['no_age']}개")
+        print(f"  청년 대상 정책 (20-39세): {metrics['youth']}개")
         
         # 특정 나이대별 정책 수
-        age_ranges = [
-            (0, 19, "10대"),
-            (20, 29, "20대"),
-            (30, 39, "30대"),
-            (40, 100, "40대 이상")
-        ]
-        
-        for min_age, max_age, label in age_ranges:
-            self.cursor.execute('''
-                SELECT COUNT(*) FROM welfare_policies 
-                WHERE (age_min <= ? AND age_max >= ?) 
-                OR (age_min >= ? AND age_max <= ?)
-                OR (age_min <= ? AND age_max >= ?)
-            ''', (max_age, min_age, min_age, max_age, min_age, max_age))
-            count = self.cursor.fetchone()[0]
-            print(f"  {label} 대상 정책: {count}개")
+        for _, _, label in AGE_BUCKETS:
+            print(f"  {label} 대상 정책: {metrics['age_buckets'][label]}개")
     
     def generate_report(self):
-        """검증 보고서 생성"""
+        """검증 보고서 생성 (validate_data_quality에서 계산한 지표 재사용)"""
         print("\n📋 검증 보고서 생성 중...")
+        metrics = self.metrics or self.collect_metrics()
         
         report = {
+            "보고서_버전": self.run_id,
             "검증_날짜": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "DB_경로": self.db_path,
-            "기본_통계": {},
-            "품질_검증": {},
+            "검사_방식": "전체" if metrics['full'] else "증분",
+            "검사한_정책_수": metrics['checked'],
+            "기본_통계": {
+                "총_정책_수": metrics['total'],
+                "지역별_분포": dict(metrics['regions']),
+                "나이대별_분포": dict(metrics['age_groups']),
+                "도메인별_분포": dict(metrics['domains'])
+            },
+            "품질_검증": {
+                "제목_누락": metrics['empty_title'],
+                "URL_누락": metrics['empty_url'],
+                "지역_누락": metrics['empty_region'],
+                "나이범위_오류": metrics['invalid_age'],
+                "긴_제목": metrics['long_title'],
+                "긴_내용": metrics['long_content'],
+                "제목_중복": metrics['duplicate_titles'],
+                "URL_중복": metrics['duplicate_urls'],
+                "URL_프로토콜_오류": metrics['invalid_protocol'],
+                "거의_중복_묶음_수": len(metrics['near_duplicate_groups']),
+                "거의_중복_묶음": metrics['near_duplicate_groups'][:50]  # 정책 id 묶음 (큰 순서)
+            },
             "권장사항": []
         }
         
-        # 기본 통계 수집
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies')
-        total_count = self.cursor.fetchone()[0]
-        report["기본_통계"]["총_정책_수"] = total_count
-        
-        # 지역별 통계
-        self.cursor.execute('SELECT region, COUNT(*) FROM welfare_policies GROUP BY region')
-        region_stats = dict(self.cursor.fetchall())
-        report["기본_통계"]["지역별_분포"] = region_stats
-        
-        # 품질 검증 결과
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies WHERE title IS NULL OR title = ""')
-        empty_title_count = self.cursor.fetchone()[0]
-        report["품질_검증"]["제목_누락"] = empty_title_count
-        
-        self.cursor.execute('SELECT COUNT(*) FROM welfare_policies WHERE url IS NULL OR url = ""')
-        empty_url_count = self.cursor.fetchone()[0]
-        report["품질_검증"]["URL_누락"] = empty_url_count
-        
         # 권장사항
-        if empty_title_count > 0:
+        if metrics['empty_title'] > 0:
             report["권장사항"].append("제목이 누락된 정책을 수정하세요.")
-        if empty_url_count > 0:
+        if metrics['empty_url'] > 0:
             report["권장사항"].append("URL이 누락된 정책을 수정하세요.")
-        if total_count < 50:
+        if metrics['near_duplicate_groups']:
+            report["권장사항"].append("거의 중복인 정책 묶음을 확인하고 하나로 합치세요.")
+        if metrics['total'] < 50:
             report["권장사항"].append("더 많은 정책 데이터를 수집하세요.")
         
-        # 보고서 저장
+        # 보고서 저장 (실행 기록에 버전별로 + 최신 보고서 파일)
+        self.conn.execute('UPDATE validation_runs SET report = ? WHERE run_id = ?',
+                          (json.dumps(report, ensure_ascii=False), self.run_id))
+        self.conn.commit()
         report_path = os.path.join(os.path.dirname(self.db_path), "validation_report.json")
         with open(report_path, 'w', encoding='utf-8') as f:
             json.dump(report, f, ensure_ascii=False, indent=2)
         
-        print(f"✅ 검증 보고서 저장: {report_path}")
+        print(f"✅ 검증 보고서 저장: {report_path} (버전 {self.run_id})")
         return report
     
+    def load_report(self, run_id=None):
+        """저장된 보고서 (run_id가 없으면 가장 최근 것)"""
+        if run_id is None:
+            row = self.conn.execute(
+                'SELECT report FROM validation_runs WHERE report IS NOT NULL ORDER BY run_id DESC LIMIT 1'
+            ).fetchone()
+        else:
+            row = self.conn.execute('SELECT report FROM validation_runs WHERE run_id = ?', (run_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+    
+    def compare_reports(self, old_run_id=None, new_run_id=None):
+        """두 보고서 버전 비교 출력 (기본: 이번 보고서와 바로 앞 보고서)"""
+        new_run_id = new_run_id or self.run_id
+        if old_run_id is None:
+            row = self.conn.execute('''
+                SELECT run_id FROM validation_runs WHERE report IS NOT NULL AND run_id < ?
+                ORDER BY run_id DESC LIMIT 1
+            ''', (new_run_id,)).fetchone()
+            if not row:
+                print("\n📈 비교할 이전 보고서가 없습니다.")
+                return {}
+            old_run_id = row[0]
+        
+        old, new = self.load_report(old_run_id), self.load_report(new_run_id)
+        changes = diff_reports(old["기본_통계"], new["기본_통계"], "기본_통계.")
+        changes.update(diff_reports(old["품질_검증"], new["품질_검증"], "품질_검증."))
+        print(f"\n📈 보고서 비교 (버전 {old_run_id} → {new_run_id}):")
+        if not changes:
+            print("  바뀐 지표 없음")
+        for name, (before, after) in changes.items():
+            mark = "⚠️" if name.startswith("품질_검증.") and after > before else "  "
+            print(f"  {mark} {name}: {before} → {after} ({after - before:+})")
+        return changes
+    
     def close_db(self):
         """DB 연결 종료"""
         if self.conn:
@@ -298,6 +593,7 @@ def main():
         validator.connect_db()
         validator.validate_data_quality()
         report = validator.generate_report()
+        validator.compare_reports()
         
         print(f"\n🎉 데이터 검증 완료!")
         print(f"총 정책 수: {report['기본_통계']['총_정책_수']}개")
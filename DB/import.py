@@ -2,6 +2,10 @@ import json
 import sqlite3
 import os
 
+# 통합 스키마/임포트 경로는 공용 패키지(welfare_db)와 공유
+from welfare_db.migrations import migrate
+from welfare_db.policy_store import insert_data_to_db
+
 # 1. JSON 파일 경로 (윈도우 경로는 raw string 추천)
 json_path = r'C:\Users\pst00\Downloads\서울_크롤링(11개)_완성.json'
 
@@ -16,52 +20,24 @@ with open(json_path, 'r', encoding='utf-8') as f:
 print(f"총 정책 개수: {len(data)}")
 print(f"첫번째 정책 예시: {data[0]}")
 
-# 3. SQLite DB 연결 및 테이블 생성
+# 3. SQLite DB 연결 및 테이블 생성 (예전 policies 테이블이 있으면 통합 스키마로 업그레이드)
 conn = sqlite3.connect(r'C:\sqlite\ok\ibm_data.db')
+migrate(conn)
 cur = conn.cursor()
 
 
-# 4. 데이터 삽입
-for i, item in enumerate(data):
-    try:
-        # region이 리스트면 문자열로 변환, 아니면 문자열 그대로
-        region = ', '.join(item['region']) if isinstance(item.get('region'), list) else str(item.get('region', ''))
-
-        # age_range가 리스트면 최소/최대 추출, 아니면 기본값 -1 설정
-        age_range = item.get('age_range', [])
-        if isinstance(age_range, list) and len(age_range) > 0:
-            age_min = min(age_range)
-            age_max = max(age_range)
-        else:
-            age_min = -1
-            age_max = -1
-        
-        # 기타 필드는 없으면 빈 문자열로 처리
-        cur.execute('''
-            INSERT INTO policies(title, url, region, age_min, age_max, application_period, conditions, benefits)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            item.get('title', ''),
-            item.get('url', ''),
-            region,
-            age_min,
-            age_max,
-            item.get('application_period', ''),
-            item.get('conditions', ''),
-            item.get('benefits', '')
-        ))
-    except Exception as e:
-        print(f"Error inserting item {i}: {e}")
+# 4. 데이터 삽입 (나이 하한/상한, 지역 코드, 신청기간 날짜로 정규화해서 url 기준 upsert)
+success, error = insert_data_to_db(conn, data)
+print(f"삽입 결과: 성공 {success}개, 실패 {error}개")
 
-# 5. 커밋하고 연결 종료
-conn.commit()
+# 5. 커밋은 insert_data_to_db 안에서 처리
 
 # 6. 저장 확인용 조회 출력
-cur.execute('SELECT COUNT(*) FROM policies')
+cur.execute('SELECT COUNT(*) FROM welfare_policies')
 count = cur.fetchone()[0]
 print(f"DB에 저장된 정책 개수: {count}")
 
-cur.execute('SELECT * FROM policies LIMIT 3')
+cur.execute('SELECT * FROM welfare_policies LIMIT 3')
 rows = cur.fetchall()
 for row in rows:
     print(row)
@@ -3,16 +3,38 @@ import sqlite3
 import os
 from datetime import datetime
 
+# 스키마/정규화 규칙은 공용 패키지(welfare_db)의 마이그레이션 모듈과 공유
+from welfare_db.migrations import clone_table, migrate, move_indexes
+from welfare_db.near_duplicates import NearDuplicateIndex, policy_text
+from welfare_db.policy_schema import CURRENT_COLUMNS, normalize_policy, policy_values, replace_categories
+from welfare_db.policy_snapshot import bump_generation, snapshot_path, write_snapshot
+
+# 실제 서비스 테이블과, 임포트 중에 새 데이터를 채우는 그림자 테이블 (정책 + 카테고리 태그)
+LIVE_TABLE = 'welfare_policies'
+SHADOW_TABLE = 'welfare_policies_shadow'
+RETIRED_TABLE = 'welfare_policies_old'
+LIVE_CATEGORIES = 'policy_categories'
+SHADOW_CATEGORIES = 'policy_categories_shadow'
+RETIRED_CATEGORIES = 'policy_categories_old'
+
 class WelfareDataImporter:
-    def __init__(self, db_path):
+    def __init__(self, db_path, near_dedup=False):
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self.shadow_ids = {}  # 그림자 테이블에 넣은 url → rowid (같은 url이 또 나오면 그 행을 덮어씀)
+        # True면 같은 지역에서 url은 다르지만 제목/조건/혜택이 거의 같은 정책은 먼저 들어온 것만 임포트
+        self.near_dedup = near_dedup
+        self.near_indexes = {}  # 지역 코드 → NearDuplicateIndex (다른 지역의 비슷한 정책은 서로 다른 정책)
+        self.near_skipped = 0
+        self.inserted = 0  # 그림자 테이블에 새로 들어간 행 수
+        self.updated = 0   # 입력에 같은 url이 또 나와서 앞의 행을 덮어쓴 수
         
     def connect_db(self):
-        """DB 연결"""
+        """DB 연결 (WAL 모드: 임포트 중에도 API 읽기가 막히지 않고 이전 데이터를 그대로 봄)"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = sqlite3.connect(self.db_path, timeout=30)
+            self.conn.execute('PRAGMA journal_mode=WAL')
             self.cursor = self.conn.cursor()
             print(f"✅ DB 연결 성공: {self.db_path}")
         except Exception as e:
@@ -20,35 +42,76 @@ class WelfareDataImporter:
             raise
     
     def create_table(self):
-        """테이블 생성"""
+        """테이블 생성 (예전 스키마 DB면 통합 스키마로 업그레이드)"""
         try:
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS welfare_policies (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    url TEXT NOT NULL,
-                    region TEXT NOT NULL,
-                    age_min INTEGER,
-                    age_max INTEGER,
-                    application_period TEXT,
-                    conditions TEXT,
-                    benefits TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # 인덱스 생성
-            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_region ON welfare_policies(region)')
-            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_age_range ON welfare_policies(age_min, age_max)')
-            
-            self.conn.commit()
-            print("✅ 테이블 및 인덱스 생성 완료")
+            version = migrate(self.conn)
+            print(f"✅ 테이블 및 인덱스 준비 완료 (스키마 버전 {version})")
             
         except Exception as e:
             print(f"❌ 테이블 생성 실패: {e}")
             raise
     
+    def begin_shadow(self):
+        """서비스 테이블과 같은 스키마의 빈 그림자 테이블 만들기 (인덱스는 swap 때 생성)"""
+        for table in (SHADOW_TABLE, RETIRED_TABLE, SHADOW_CATEGORIES, RETIRED_CATEGORIES):
+            self.cursor.execute(f'DROP TABLE IF EXISTS {table}')  # 이전에 실패한 임포트 잔여물
+        clone_table(self.conn, LIVE_TABLE, SHADOW_TABLE)
+        clone_table(self.conn, LIVE_CATEGORIES, SHADOW_CATEGORIES)
+        # 새 정책 id는 서비스 테이블에서 쓴 적 있는 id 다음부터 (기존 정책은 같은 id를 그대로 가져감)
+        self.cursor.execute(f'''
+            INSERT INTO sqlite_sequence (name, seq)
+            SELECT ?, MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+                          COALESCE((SELECT MAX(id) FROM {LIVE_TABLE}), 0))
+        ''', (SHADOW_TABLE, LIVE_TABLE))
+        self.conn.commit()
+        self.shadow_ids = {}
+        self.near_indexes = {}
+        self.near_skipped = 0
+        self.inserted = 0
+        self.updated = 0
+    
+    def swap_shadow(self):
+        """서비스 테이블 인덱스를 같은 이름으로 그림자 테이블에 옮기고 교체 (한 트랜잭션으로)
+        WAL 모드라 인덱스를 만드는 동안에도 API는 커밋 전까지 이전 테이블을 그대로 읽음
+        그림자 테이블에 들어간 정책이 없으면 교체하지 않음 (빈 테이블을 서비스에 내보내지 않도록)"""
+        if not self.inserted:
+            raise ValueError("새로 읽은 정책이 없어 교체하지 않습니다 (기존 데이터 유지)")
+        self.cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for live, shadow, retired in ((LIVE_TABLE, SHADOW_TABLE, RETIRED_TABLE),
+                                          (LIVE_CATEGORIES, SHADOW_CATEGORIES, RETIRED_CATEGORIES)):
+                move_indexes(self.conn, live, shadow)
+                self.cursor.execute(f'ALTER TABLE {live} RENAME TO {retired}')
+                self.cursor.execute(f'ALTER TABLE {shadow} RENAME TO {live}')
+            bump_generation(self.conn)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        print("🔁 새 데이터로 교체 완료")
+        
+        # 이전 테이블 삭제는 교체 뒤에 따로 (교체 트랜잭션을 짧게 유지)
+        self.cursor.execute(f'DROP TABLE IF EXISTS {RETIRED_TABLE}')
+        self.cursor.execute(f'DROP TABLE IF EXISTS {RETIRED_CATEGORIES}')
+        self.conn.commit()
+        self.save_snapshot()
+    
+    def save_snapshot(self):
+        """교체된 데이터로 API용 스냅샷 다시 쓰기 (실패해도 API는 DB로 조회하므로 경고만)"""
+        path = snapshot_path(self.db_path)
+        try:
+            count = write_snapshot(self.conn, path)
+            print(f"📸 스냅샷 저장: {path} ({count}개 정책)")
+        except Exception as e:
+            print(f"⚠️ 스냅샷 저장 실패: {e}")
+    
+    def abort_shadow(self):
+        """실패한 임포트의 그림자 테이블 정리 (서비스 테이블은 그대로)"""
+        self.conn.rollback()
+        self.cursor.execute(f'DROP TABLE IF EXISTS {SHADOW_TABLE}')
+        self.cursor.execute(f'DROP TABLE IF EXISTS {SHADOW_CATEGORIES}')
+        self.conn.commit()
+    
     def load_json_data(self, json_path):
         """JSON 파일 로드"""
         try:
@@ -66,38 +129,12 @@ class WelfareDataImporter:
             raise
     
     def normalize_data(self, data):
-        """데이터 정규화"""
+        """데이터 정규화 (나이 하한/상한, 지역 코드, 신청기간 날짜, 카테고리 태그)"""
         normalized_data = []
         
         for item in data:
             try:
-                # region 정규화 (문자열로 통일)
-                region = item.get('region', '')
-                if isinstance(region, list):
-                    region = ', '.join(region)
-                elif not region:
-                    region = '미정'
-                
-                # age_range 정규화
-                age_range = item.get('age_range', [])
-                if isinstance(age_range, list) and len(age_range) > 0:
-                    age_min = min(age_range)
-                    age_max = max(age_range)
-                else:
-                    age_min = -1
-                    age_max = -1
-                
-                # 기타 필드 정규화
-                normalized_item = {
-                    'title': item.get('title', '').strip(),
-                    'url': item.get('url', '').strip(),
-                    'region': region.strip(),
-                    'age_min': age_min,
-                    'age_max': age_max,
-                    'application_period': item.get('application_period', '').strip(),
-                    'conditions': item.get('conditions', '').strip(),
-                    'benefits': item.get('benefits', '').strip()
-                }
+                normalized_item = normalize_policy(item)
                 
                 # 필수 필드 검증
                 if normalized_item['title'] and normalized_item['url']:
@@ -111,46 +148,134 @@ class WelfareDataImporter:
         
         return normalized_data
     
+    def drop_near_duplicates(self, data):
+        """이번 임포트에서 이미 넣은 같은 지역 정책과 거의 같은 정책 제외 (같은 url은 갱신이므로 그대로 둠)"""
+        if not self.near_dedup:
+            return data
+        
+        kept = []
+        for item in data:
+            near_index = self.near_indexes.setdefault(item['region'], NearDuplicateIndex())
+            key = item['url'] or f"#{len(near_index)}"  # url 없는 정책은 순번으로 구분
+            if key not in near_index.signatures:
+                match = near_index.add(key, policy_text(item['title'], item['conditions'], item['benefits']),
+                                       keep_duplicates=False)
+                if match:
+                    self.near_skipped += 1
+                    print(f"⚠️ 거의 중복이라 건너뜀 ({match[1]:.0%}): {item['title']} ← {match[0]}")
+                    continue
+            kept.append(item)
+        return kept
+    
+    def iter_chunks(self, json_paths, chunk_size=500):
+        """JSONL/JSON 파일들을 chunk_size개씩 스트리밍 (JSONL은 한 줄씩 읽어 메모리 일정)"""
+        chunk = []
+        for json_path in json_paths:
+            if not os.path.exists(json_path):
+                print(f"⚠️ 파일 없음, 건너뜀: {json_path}")
+                continue
+            
+            if json_path.endswith('.jsonl'):
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    records = (json.loads(line) for line in f if line.strip())
+                    for record in records:
+                        chunk.append(record)
+                        if len(chunk) >= chunk_size:
+                            yield chunk
+                            chunk = []
+            else:
+                for record in self.load_json_data(json_path):
+                    chunk.append(record)
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+        
+        if chunk:
+            yield chunk
+    
+    def import_stream(self, json_paths, chunk_size=500):
+        """파일들을 청크 단위로 정규화 → 그림자 테이블에 삽입 → 한 번에 교체 (전체를 메모리에 올리지 않음)"""
+        if not any(os.path.exists(json_path) for json_path in json_paths):
+            raise FileNotFoundError(f"임포트할 파일이 없습니다: {', '.join(json_paths)}")
+        
+        try:
+            self.begin_shadow()
+            
+            for chunk in self.iter_chunks(json_paths, chunk_size):
+                normalized = self.drop_near_duplicates(self.normalize_data(chunk))
+                self._insert_rows(normalized, SHADOW_TABLE, SHADOW_CATEGORIES)
+                self.conn.commit()  # 그림자 테이블만 바뀌므로 청크마다 커밋해도 API는 이전 데이터를 봄
+                print(f"📝 {self.inserted}개 정책 삽입 완료")
+            
+            self.swap_shadow()
+            self.print_summary()
+            return self.inserted
+            
+        except Exception as e:
+            print(f"❌ 데이터 삽입 실패: {e}")
+            self.abort_shadow()
+            raise
+    
     def insert_data(self, data):
-        """데이터 삽입"""
+        """데이터 삽입 (그림자 테이블에 채운 뒤 교체)"""
         try:
-            # 기존 데이터 삭제 (선택사항)
-            self.cursor.execute('DELETE FROM welfare_policies')
-            print("🗑️ 기존 데이터 삭제 완료")
+            self.begin_shadow()
             
             # 새 데이터 삽입
-            for i, item in enumerate(data):
-                try:
-                    self.cursor.execute('''
-                        INSERT INTO welfare_policies 
-                        (title, url, region, age_min, age_max, application_period, conditions, benefits)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        item['title'],
-                        item['url'],
-                        item['region'],
-                        item['age_min'],
-                        item['age_max'],
-                        item['application_period'],
-                        item['conditions'],
-                        item['benefits']
-                    ))
-                    
-                    if (i + 1) % 10 == 0:
-                        print(f"📝 {i + 1}개 정책 삽입 완료")
-                        
-                except Exception as e:
-                    print(f"❌ 정책 삽입 에러 ({item.get('title', '제목없음')}): {e}")
-                    continue
-            
+            data = self.drop_near_duplicates(data)
+            self._insert_rows(data, SHADOW_TABLE, SHADOW_CATEGORIES)
             self.conn.commit()
-            print(f"✅ 총 {len(data)}개 정책 삽입 완료")
+            
+            self.swap_shadow()
+            self.print_summary()
             
         except Exception as e:
             print(f"❌ 데이터 삽입 실패: {e}")
-            self.conn.rollback()
+            self.abort_shadow()
             raise
     
+    def print_summary(self):
+        """삽입한 행 수와 삽입하지 않은 입력(같은 url 갱신, 거의 중복 제외)을 따로 출력"""
+        print(f"✅ 총 {self.inserted}개 정책 삽입 완료")
+        if self.updated:
+            print(f"   같은 url이 다시 나와 덮어쓴 정책 {self.updated}개 (행 수에는 한 번만 셈)")
+        if self.near_skipped:
+            print(f"   거의 중복이라 건너뛴 정책 {self.near_skipped}개")
+    
+    def _insert_rows(self, data, table=LIVE_TABLE, categories_table=LIVE_CATEGORIES):
+        """정규화된 정책 행 + 카테고리 태그 삽입 (커밋은 호출한 쪽에서)
+        그림자 테이블은 url 인덱스가 교체 때 생기므로, 같은 url은 먼저 넣은 행을 id로 찾아 덮어씀
+        서비스 테이블에 이미 있는 url은 그 id를 그대로 씀 (카테고리/스냅샷/클라이언트가 가진 id 유지)"""
+        columns = ', '.join(CURRENT_COLUMNS)
+        placeholders = ', '.join('?' for _ in CURRENT_COLUMNS)
+        updates = ', '.join(f'{column} = ?' for column in CURRENT_COLUMNS)
+        categories_by_id = {}
+        for item in data:
+            try:
+                policy_id = self.shadow_ids.get(item['url']) if item['url'] else None
+                if policy_id:
+                    self.cursor.execute(
+                        f'UPDATE {table} SET {updates}, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                        policy_values(item, CURRENT_COLUMNS) + (policy_id,)
+                    )
+                    self.updated += 1
+                else:
+                    self.cursor.execute(
+                        f'''INSERT INTO {table} (id, {columns})
+                            VALUES ((SELECT id FROM {LIVE_TABLE} WHERE url = ?), {placeholders})''',
+                        (item['url'],) + policy_values(item, CURRENT_COLUMNS)
+                    )
+                    policy_id = self.cursor.lastrowid
+                    self.inserted += 1
+                    if item['url']:
+                        self.shadow_ids[item['url']] = policy_id
+                categories_by_id[policy_id] = item['categories']
+                
+            except Exception as e:
+                print(f"❌ 정책 삽입 에러 ({item.get('title', '제목없음')}): {e}")
+                continue
+        replace_categories(self.cursor, categories_by_id, categories_table)
+    
     def verify_data(self):
         """데이터 검증"""
         try:
@@ -166,7 +291,7 @@ class WelfareDataImporter:
             self.cursor.execute('''
                 SELECT 
                     CASE 
-                        WHEN age_min = -1 THEN '나이정보없음'
+                        WHEN age_min IS NULL AND age_max IS NULL THEN '나이정보없음'
                         WHEN age_min >= 0 AND age_max <= 29 THEN '20대'
                         WHEN age_min >= 30 AND age_max <= 39 THEN '30대'
                         ELSE '기타'
@@ -201,37 +326,21 @@ class WelfareDataImporter:
 def main():
     # 설정
     db_path = r'C:\B조\DB\ibm_data.db'
-    json_path = r'C:\B조\crawling\welfare_policies.json'
+    jsonl_path = r'C:\B조\crawling\welfare_policies.jsonl'
     
-    # JSON 파일이 없으면 기존 파일들 사용
-    if not os.path.exists(json_path):
-        print("⚠️ welfare_policies.json 파일이 없습니다. 기존 파일들을 통합합니다.")
-        
-        # 기존 JSON 파일들 로드
-        seoul_path = r'C:\B조\crawling\seoul.json'
-        incheon_path = r'C:\B조\crawling\incheon.json'
-        gyeonggi_path = r'C:\B조\crawling\gyeonggi.json'
-        
-        all_data = []
-        
-        for path in [seoul_path, incheon_path, gyeonggi_path]:
-            if os.path.exists(path):
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        all_data.extend(data)
-                        print(f"✅ {path} 로드 완료: {len(data)}개")
-                except Exception as e:
-                    print(f"❌ {path} 로드 실패: {e}")
-        
-        # 통합 데이터를 임시 파일로 저장
-        json_path = r'C:\B조\crawling\combined_policies.json'
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(all_data, f, ensure_ascii=False, indent=2)
-        print(f"✅ 통합 데이터 저장: {json_path}")
+    # 크롤러 JSONL 출력이 없으면 기존 지역별 파일들을 차례로 스트리밍 (통합 파일은 만들지 않음)
+    if os.path.exists(jsonl_path):
+        json_paths = [jsonl_path]
+    else:
+        print("⚠️ welfare_policies.jsonl 파일이 없습니다. 기존 파일들을 차례로 읽습니다.")
+        json_paths = [
+            r'C:\B조\crawling\seoul.json',
+            r'C:\B조\crawling\incheon.json',
+            r'C:\B조\crawling\gyeonggi.json'
+        ]
     
     # 데이터 임포트 실행
-    importer = WelfareDataImporter(db_path)
+    importer = WelfareDataImporter(db_path, near_dedup=True)
     
     try:
         # 1. DB 연결
@@ -240,17 +349,10 @@ def main():
         # 2. 테이블 생성
         importer.create_table()
         
-        # 3. JSON 데이터 로드
-        data = importer.load_json_data(json_path)
-        
-        # 4. 데이터 정규화
-        normalized_data = importer.normalize_data(data)
-        print(f"✅ 정규화 완료: {len(normalized_data)}개 정책")
-        
-        # 5. 데이터 삽입
-        importer.insert_data(normalized_data)
+        # 3. 청크 단위 로드 → 정규화 → 그림자 테이블에 삽입 → 교체
+        importer.import_stream(json_paths)
         
-        # 6. 데이터 검증
+        # 4. 데이터 검증
         success = importer.verify_data()
         
         if success:
@@ -265,4 +367,4 @@ def main():
         importer.close_db()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,64 @@
+# improved_import 테스트: 읽은 정책이 없으면 그림자 테이블을 교체하지 않고 서비스 테이블 유지
+import importlib.util
+import json
+import os
+import sqlite3
+
+import pytest
+
+DB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_importer_module():
+    spec = importlib.util.spec_from_file_location(
+        'improved_import', os.path.join(DB_DIR, 'improved_import(PM.VER).py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def policy(number: int) -> dict:
+    return {'title': f'청년 정책 {number}', 'url': f'https://example.com/policy/{number}', 'region': '서울',
+            'age_range': [19, 39], 'application_period': '상시', 'conditions': '서울 거주', 'benefits': '월 20만원'}
+
+
+@pytest.fixture
+def importer(tmp_path):
+    module = load_importer_module()
+    source = tmp_path / 'seoul.json'
+    source.write_text(json.dumps([policy(number) for number in range(3)], ensure_ascii=False), encoding='utf-8')
+    importer = module.WelfareDataImporter(str(tmp_path / 'policies.db'))
+    importer.connect_db()
+    importer.create_table()
+    importer.import_stream([str(source)])
+    yield importer
+    importer.close_db()
+
+
+def live_count(importer) -> int:
+    return importer.conn.execute('SELECT COUNT(*) FROM welfare_policies').fetchone()[0]
+
+
+def test_missing_inputs_keep_live_table(importer, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        importer.import_stream([str(tmp_path / 'missing.jsonl'), str(tmp_path / 'missing.json')])
+    assert live_count(importer) == 3
+
+
+@pytest.mark.parametrize('lines', ['', '{"title": "", "url": ""}\n'])
+def test_no_records_keep_live_table(importer, tmp_path, lines):
+    source = tmp_path / 'empty.jsonl'
+    source.write_text(lines, encoding='utf-8')
+    with pytest.raises(ValueError):
+        importer.import_stream([str(source)])
+    assert live_count(importer) == 3
+    tables = {name for name, in importer.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert 'welfare_policies_shadow' not in tables
+
+
+def test_reimport_replaces_live_table(importer, tmp_path):
+    source = tmp_path / 'update.jsonl'
+    source.write_text(''.join(json.dumps(policy(number), ensure_ascii=False) + '\n' for number in (1, 7)),
+                      encoding='utf-8')
+    assert importer.import_stream([str(source)]) == 2
+    assert live_count(importer) == 2
@@ -0,0 +1,176 @@
+#asyncio 기반 크롤링 요청 엔진
+#하는 일:
+#전체 동시 요청 수 제한 (세마포어)
+#호스트별 요청 속도 제한 (토큰 버킷) + 호스트별 동시 요청 수 제한
+#keep-alive 커넥션 재사용 (aiohttp 세션 하나 공유)
+#연결 오류/타임아웃/일시적 오류 응답(429, 5xx)은 간격을 늘려 가며 재시도 (재시도도 토큰 버킷을 거침)
+#언제 사용: 여러 페이지/여러 지역을 동시에 크롤링할 때
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# 잠깐 뒤 다시 요청하면 될 수 있는 응답 코드
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """호스트별 요청 속도 제한 (초당 rate개, 최대 capacity개까지 몰아서 허용)"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class AsyncFetcher:
+    """전역 동시성 제한 + 호스트별 속도 제한을 적용한 비동기 요청 엔진"""
+
+    def __init__(self, max_concurrency: int = 10, per_host_rate: float = 1.0,
+                 per_host_burst: int = 1, timeout: float = 10, headers: Optional[Dict[str, str]] = None,
+                 retries: int = 2, retry_backoff: float = 0.5):
+        self.max_concurrency = max_concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.timeout = timeout
+        self.retries = retries  # 첫 요청 말고 더 시도하는 횟수
+        self.retry_backoff = retry_backoff  # 첫 재시도 전 대기(초), 재시도마다 두 배
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+
+        self.session = None
+        self._semaphore = None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._host_limits: Dict[str, tuple] = {}
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """세션 생성 (커넥션 풀은 세션 단위로 재사용됨)"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        """세션 종료"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def set_host_limit(self, host: str, rate: float, burst: int = 1, concurrency: Optional[int] = None):
+        """특정 호스트의 속도 제한 변경 (concurrency를 주면 그 호스트의 동시 요청 수도 제한)"""
+        self._host_limits[host] = (rate, burst)
+        self._buckets.pop(host, None)
+        if concurrency:
+            self._host_semaphores[host] = asyncio.Semaphore(concurrency)
+        else:
+            self._host_semaphores.pop(host, None)
+
+    def _bucket_for(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self._host_limits.get(host, (self.per_host_rate, self.per_host_burst))
+            bucket = TokenBucket(rate, burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """단일 URL 요청 (호스트 슬롯 → 호스트 토큰 → 전역 슬롯 순서로 획득)"""
+        if self.session is None:
+            await self.open()
+
+        host_semaphore = self._host_semaphores.get(urlsplit(url).netloc)
+        if host_semaphore is None:
+            return await self._fetch(url, headers)
+        async with host_semaphore:
+            return await self._fetch(url, headers)
+
+    async def _fetch(self, url: str, headers: Optional[Dict[str, str]]) -> FetchResult:
+        """재시도 포함 요청 (마지막 시도도 일시적 오류 응답이면 그 응답, 연결 오류면 예외)"""
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                result = await self._fetch_once(url, headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if last:
+                    raise
+            else:
+                if result.status not in RETRY_STATUSES or last:
+                    return result
+            await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def _fetch_once(self, url: str, headers: Optional[Dict[str, str]]) -> FetchResult:
+        await self._bucket_for(url).acquire()
+        async with self._semaphore:
+            started = time.monotonic()
+            async with self.session.get(url, headers=headers) as response:
+                body = await response.read()
+                return FetchResult(
+                    url=url,
+                    status=response.status,
+                    text=body.decode('utf-8', errors='replace'),
+                    headers=dict(response.headers),
+                    elapsed=time.monotonic() - started
+                )
+
+    async def fetch_all(self, urls: List[str]) -> List[Optional[FetchResult]]:
+        """여러 URL 동시 요청 (실패한 URL은 None)"""
+        async def _safe_fetch(url):
+            try:
+                return await self.fetch(url)
+            except Exception as e:
+                print(f"❌ 요청 실패 ({url}): {e}")
+                return None
+
+        return await asyncio.gather(*(_safe_fetch(url) for url in urls))
@@ -0,0 +1,125 @@
+#크롤링 체크포인트 (중단된 크롤링 이어하기)
+#하는 일:
+#프론티어 URL별 상태(pending/done/failed)와 추출 결과를 로컬 SQLite에 저장
+#변경은 메모리에 모았다가 묶어서 커밋 (synchronous=FULL이라 커밋마다 fsync)
+#크롤러가 중간에 죽으면 다음 실행에서 done URL은 건너뛰고 나머지만 이어서 크롤링
+#언제 사용: 크롤링이 오래 걸려서 중간에 끊겨도 처음부터 다시 하지 않으려 할 때
+
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class CheckpointStore:
+    """SQLite 기반 크롤링 상태 저장소"""
+
+    def __init__(self, db_path: str = ".crawl_checkpoint.db", batch_size: int = 100,
+                 flush_interval: float = 5.0, max_attempts: int = 3):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=FULL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS crawl_frontier (
+                url TEXT PRIMARY KEY,
+                region TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',  -- pending / done / failed
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE IF NOT EXISTS crawl_records (
+                url TEXT PRIMARY KEY,
+                record TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS crawl_run (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP
+            );
+        ''')
+        self.conn.commit()
+
+        self._pending_ops: List[Tuple[str, tuple]] = []
+        self._last_flush = time.monotonic()
+
+    def start(self) -> bool:
+        """실행 시작. 끝나지 않은 이전 실행이 있으면 이어서 하고 True 반환"""
+        row = self.conn.execute('SELECT finished_at FROM crawl_run WHERE id = 1').fetchone()
+        if row and row[0] is None:
+            return True
+
+        # 이전 실행이 정상 종료됨 (또는 첫 실행) → 새로 시작
+        self.conn.executescript('''
+            DELETE FROM crawl_frontier;
+            DELETE FROM crawl_records;
+            INSERT OR REPLACE INTO crawl_run (id, started_at, finished_at) VALUES (1, CURRENT_TIMESTAMP, NULL);
+        ''')
+        self.conn.commit()
+        return False
+
+    def finish(self):
+        """실행 정상 종료 표시 (다음 실행은 처음부터)"""
+        self.flush()
+        self.conn.execute('UPDATE crawl_run SET finished_at = CURRENT_TIMESTAMP WHERE id = 1')
+        self.conn.commit()
+
+    def _queue(self, sql: str, params: tuple):
+        self._pending_ops.append((sql, params))
+        if (len(self._pending_ops) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def add_pending(self, url: str, region: str):
+        """프론티어에 URL 추가 (이미 있으면 무시)"""
+        self._queue('INSERT OR IGNORE INTO crawl_frontier (url, region) VALUES (?, ?)', (url, region))
+
+    def mark_done(self, url: str, record: Optional[Dict[str, Any]]):
+        """URL 완료 + 추출 결과 저장 (내용 없는 페이지는 결과 없이 완료)"""
+        self._queue('''
+            UPDATE crawl_frontier SET status = 'done', updated_at = CURRENT_TIMESTAMP WHERE url = ?
+        ''', (url,))
+        if record is not None:
+            self._queue('INSERT OR REPLACE INTO crawl_records (url, record) VALUES (?, ?)',
+                        (url, json.dumps(record, ensure_ascii=False)))
+
+    def mark_failed(self, url: str):
+        """URL 실패 (max_attempts까지는 다음 실행에서 재시도)"""
+        self._queue('''
+            UPDATE crawl_frontier
+            SET status = 'failed', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE url = ?
+        ''', (url,))
+
+    def flush(self):
+        """모아둔 변경을 한 트랜잭션으로 커밋 (커밋 시 fsync)"""
+        if self._pending_ops:
+            with self.conn:
+                for sql, params in self._pending_ops:
+                    self.conn.execute(sql, params)
+            self._pending_ops = []
+        self._last_flush = time.monotonic()
+
+    def done_urls(self) -> Iterator[Tuple[str, str]]:
+        """이전 실행에서 끝난 (url, region)"""
+        return self.conn.execute("SELECT url, region FROM crawl_frontier WHERE status = 'done'")
+
+    def pending_urls(self) -> Iterator[Tuple[str, str]]:
+        """이어서 크롤링할 (url, region) (재시도 한도 안의 실패 포함)"""
+        return self.conn.execute('''
+            SELECT url, region FROM crawl_frontier
+            WHERE status = 'pending' OR (status = 'failed' AND attempts < ?)
+        ''', (self.max_attempts,))
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """저장된 추출 결과 (커서로 하나씩 읽음)"""
+        for (record,) in self.conn.execute('SELECT record FROM crawl_records'):
+            yield json.loads(record)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
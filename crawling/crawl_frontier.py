@@ -0,0 +1,186 @@
+#크롤링 프론티어 (수집할 URL 대기열)
+#하는 일:
+#URL 정규화 (정책을 식별하는 파라미터만 남기고 페이지/메뉴 파라미터 제거)
+#중복 제거 (해시 셋 또는 Bloom 필터)
+#목록 페이지를 끝까지 넘기면서 찾은 상세 URL을 스트림으로 fetch 단계에 전달
+#  (목록 페이지가 오류 응답이면 ListPageError → 그 지역은 끝까지 못 읽은 것으로 처리)
+#언제 사용: 지역 전체 정책 목록을 20개 제한 없이 크롤링할 때
+
+import asyncio
+import hashlib
+import math
+from typing import Iterable, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+
+# 호스트별로 정책을 식별하는 쿼리 파라미터 (나머지는 버림)
+IDENTIFYING_PARAMS = {
+    'youth.incheon.go.kr': {'poly_seq'},
+}
+
+# 식별 파라미터가 등록되지 않은 호스트에서 버릴 목록/메뉴용 파라미터
+NAVIGATION_PARAMS = {
+    'pgno', 'page', 'pageNo', 'pageIndex', 'currentPage', 'menudiv', 'empmst',
+    'searchKeyword', 'searchCondition', 'searchType', 'sort', 'order'
+}
+
+
+class ListPageError(Exception):
+    """목록 페이지 요청 실패 (2xx가 아닌 응답)"""
+
+
+def canonicalize_url(url: str) -> str:
+    """같은 정책을 가리키는 URL 변형을 하나로 통일"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    params = parse_qsl(parts.query, keep_blank_values=True)
+
+    keep = IDENTIFYING_PARAMS.get(host)
+    if keep is not None:
+        params = [(key, value) for key, value in params if key in keep]
+    else:
+        params = [(key, value) for key, value in params if key not in NAVIGATION_PARAMS]
+
+    return urlunsplit((parts.scheme.lower(), host, parts.path, urlencode(sorted(params)), ''))
+
+
+def with_query_param(url: str, key: str, value) -> str:
+    """URL의 쿼리 파라미터 하나를 바꾼 URL"""
+    parts = urlsplit(url)
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != key]
+    params.append((key, str(value)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(params), parts.fragment))
+
+
+def _digest(url: str) -> bytes:
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+
+
+class SeenSet:
+    """정규화 URL 해시 셋 (정확한 중복 제거)"""
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, url: str) -> bool:
+        """처음 보는 URL이면 True"""
+        key = _digest(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def __len__(self):
+        return len(self._seen)
+
+
+class BloomFilter:
+    """메모리 고정 Bloom 필터 (오탐 확률만큼 새 URL을 놓칠 수 있음)"""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, url: str):
+        digest = _digest(url)
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, url: str) -> bool:
+        """처음 보는 URL이면 True"""
+        is_new = False
+        for position in self._positions(url):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                is_new = True
+        if is_new:
+            self.count += 1
+        return is_new
+
+    def __len__(self):
+        return self.count
+
+
+class CrawlFrontier:
+    """중복 제거된 (url, region) 스트림 (목록 수집과 상세 페이지 fetch가 동시에 진행됨)"""
+
+    def __init__(self, seen=None, max_pending: int = 1000, checkpoint=None):
+        self.seen = seen if seen is not None else SeenSet()
+        # 지정하면 새 URL을 체크포인트 저장소에도 pending으로 기록
+        self.checkpoint = checkpoint
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._closed = False
+
+    async def add(self, url: str, region: str) -> bool:
+        """정규화 후 처음 보는 URL만 대기열에 추가"""
+        url = canonicalize_url(url)
+        if not self.seen.add(url):
+            return False
+        if self.checkpoint:
+            self.checkpoint.add_pending(url, region)
+        await self._queue.put((url, region))
+        return True
+
+    async def add_all(self, urls: Iterable[str], region: str) -> int:
+        added = 0
+        for url in urls:
+            if await self.add(url, region):
+                added += 1
+        return added
+
+    async def close(self):
+        """더 이상 추가할 URL이 없음을 알림"""
+        if not self._closed:
+            self._closed = True
+            await self._queue.put(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self._queue.get()
+        if item is None:
+            # 다른 소비자도 종료되도록 종료 표시를 다시 넣어둠
+            await self._queue.put(None)
+            raise StopAsyncIteration
+        return item
+
+
+def extract_list_links(html: str, list_url: str, link_selector: str) -> Set[str]:
+    """목록 페이지 HTML → 정규화된 상세 URL 집합 (프로세스 풀에서도 돌 수 있게 모듈 함수)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return {
+        canonicalize_url(urljoin(list_url, link.get('href')))
+        for link in soup.select(link_selector) if link.get('href')
+    }
+
+
+async def discover_list_pages(fetcher, frontier: CrawlFrontier, list_url: str, link_selector: str,
+                              region: str, page_param: str, max_pages: Optional[int] = None,
+                              executor=None) -> int:
+    """목록 페이지를 1쪽부터 넘기며 상세 URL을 프론티어에 추가 (앞 쪽들과 같은 링크만 나오면 중단)
+    오류 응답이면 ListPageError (빈 목록으로 보고 순회를 끝내지 않음), 파싱은 executor(None이면 스레드)에서"""
+    loop = asyncio.get_running_loop()
+    page = 1
+    total = 0
+    listed = set()  # 이번 목록 순회에서 본 URL (프론티어의 seen과 별개라 이어하기 때도 끝까지 넘어감)
+    while max_pages is None or page <= max_pages:
+        page_url = with_query_param(list_url, page_param, page)
+        response = await fetcher.fetch(page_url)
+        if not response.ok:
+            raise ListPageError(f"목록 {page}쪽 요청 실패: HTTP {response.status} ({page_url})")
+        links = await loop.run_in_executor(executor, extract_list_links, response.text, list_url, link_selector)
+
+        new_links = links - listed
+        if not new_links:
+            break
+        listed |= new_links
+        total += await frontier.add_all(sorted(new_links), region)
+        page += 1
+
+    return total
@@ -0,0 +1,67 @@
+#크롤링 대상 지역(소스) 정의 등록소
+#하는 일:
+#지역별 시작 URL/목록 셀렉터/페이지 파라미터와 도메인별 예의 규칙(초당 요청 수, 동시 작업자 수) 정의
+#스케줄러(WelfareCrawler.crawl_all)는 등록된 소스를 모두 병렬로 크롤링
+#언제 사용: 새 지역을 추가할 때 (register_source로 정의 하나만 등록하면 됨)
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+
+@dataclass
+class SourceDefinition:
+    """지역 하나의 크롤링 방법"""
+    region: str
+    # 고정 상세 페이지 목록 (목록 페이지가 없는 사이트)
+    urls: List[str] = field(default_factory=list)
+    # 목록 페이지를 넘기며 상세 URL을 찾는 사이트
+    list_url: Optional[str] = None
+    link_selector: Optional[str] = None
+    page_param: Optional[str] = None
+    # 도메인별 예의 규칙: 초당 요청 수, 몰아서 허용할 요청 수, 동시 작업자 수
+    rate: float = 1.0
+    burst: int = 1
+    concurrency: int = 4
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.list_url or self.urls[0]).netloc
+
+
+SOURCES: Dict[str, SourceDefinition] = {}
+
+
+def register_source(source: SourceDefinition) -> SourceDefinition:
+    """소스 등록 (같은 지역이면 덮어씀)"""
+    if not source.urls and not (source.list_url and source.link_selector and source.page_param):
+        raise ValueError(f"{source.region}: urls 또는 list_url/link_selector/page_param이 필요합니다")
+    SOURCES[source.region] = source
+    return source
+
+
+register_source(SourceDefinition(
+    region="서울",
+    urls=[
+        "https://wis.seoul.go.kr/wfs/ywf/sickMan.do",
+        "https://wis.seoul.go.kr/wfs/ywf/selfReliance.do",
+        "https://wis.seoul.go.kr/wfs/ywf/saveAccnt.do"
+    ],
+    concurrency=3
+))
+
+# 인천시 청년정책 목록 (pgno로 페이지 이동)
+register_source(SourceDefinition(
+    region="인천",
+    list_url="https://youth.incheon.go.kr/youthpolicy/youthPolicyInfoList.do",
+    link_selector='a[href*="youthPolicyInfoDetail.do"]',
+    page_param='pgno'
+))
+
+# 경기도 청년정책 목록 (pageIndex로 페이지 이동)
+register_source(SourceDefinition(
+    region="경기",
+    list_url="https://youth.gg.go.kr/gg/intro/youth-policy-job-test.do?mode=list",
+    link_selector='a[href*="mode=view"]',
+    page_param='pageIndex'
+))
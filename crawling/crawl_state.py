@@ -0,0 +1,48 @@
+#증분 크롤링용 콘텐츠 해시 도구
+#하는 일:
+#페이지 HTML을 정규화(스크립트/태그/공백 제거)한 뒤 해시 계산
+#DB의 crawl_state 테이블에서 URL별 마지막 해시 읽기
+#언제 사용: 바뀐 정책만 추출/임포트하고 사라진 정책은 tombstone 처리할 때
+
+import hashlib
+import os
+import re
+import sqlite3
+from typing import Dict, Tuple
+
+_SCRIPT_STYLE = re.compile(r'<(script|style|noscript)\b.*?</\1\s*>', re.S | re.I)
+_COMMENT = re.compile(r'<!--.*?-->', re.S)
+_TAG = re.compile(r'<[^>]+>')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize_content(html: str) -> str:
+    """해시용 본문 정규화 (세션 토큰/스크립트/마크업 변화는 무시)"""
+    text = _SCRIPT_STYLE.sub(' ', html)
+    text = _COMMENT.sub(' ', text)
+    text = _TAG.sub(' ', text)
+    return _SPACE.sub(' ', text).strip()
+
+
+def content_hash(html: str) -> str:
+    """정규화된 본문의 해시"""
+    return hashlib.sha256(normalize_content(html).encode('utf-8')).hexdigest()
+
+
+def load_known_hashes(db_path: str) -> Dict[str, Tuple[str, str]]:
+    """crawl_state에서 활성 정책의 {url: (region, content_hash)} 조회"""
+    if not os.path.exists(db_path):
+        return {}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT url, region, content_hash FROM crawl_state WHERE status = 'active'"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # crawl_state 테이블이 아직 없는 DB (첫 증분 실행)
+        rows = []
+    finally:
+        conn.close()
+
+    return {url: (region, digest) for url, region, digest in rows}
@@ -1,9 +1,12 @@
-import requests
+import asyncio
 from bs4 import BeautifulSoup
 import re
 import json
 import os
 
+from async_fetcher import AsyncFetcher
+from section_tree import build_page_tree
+
 print("현재 작업 디렉토리:", os.getcwd())
 
 # 크롤링할 정책 URL들
@@ -20,27 +23,34 @@ urls = [
     "https://youth.incheon.go.kr/youthpolicy/youthPolicyInfoDetail.do?poly_seq=251&empmst=006003"
 ]
 
+# 제목/내용 영역 셀렉터 (우선순위 순)
+title_selectors = ['.title-area h2', '.b-title-box span', 'title']
+content_selectors = ['.txt-tp1', '#detail_con .line-box', '.box-gray', '.con-box']
+
+async def fetch_pages(urls):
+    """모든 URL을 동시에 요청 (호스트별 속도 제한 적용)"""
+    async with AsyncFetcher(max_concurrency=10, per_host_rate=1.0) as fetcher:
+        return await fetcher.fetch_all(urls)
+
 all_results = []
 
-for url in urls:
-    res = requests.get(url)
-    res.encoding = 'utf-8'
+for url, res in zip(urls, asyncio.run(fetch_pages(urls))):
+    if res is None:
+        continue
     soup = BeautifulSoup(res.text, 'html.parser')
 
     result = {}
     result['url'] = url
 
+    # 문서 한 번 순회 (제목/내용 셀렉터 매치 + 섹션 트리)
+    tree = build_page_tree(soup, title_selectors + content_selectors)
+
     # 제목 추출
-    title_tag = soup.select_one('.title-area h2') or soup.select_one('.b-title-box span') or soup.title
+    title_tag = tree.first(title_selectors)
     result['title'] = title_tag.get_text(strip=True) if title_tag else '제목 없음'
 
     # 내용 영역 찾기 (class 여러 개 시도)
-    content_box = (
-        soup.select_one('.txt-tp1') or 
-        soup.select_one('#detail_con .line-box') or 
-        soup.select_one('.box-gray') or 
-        soup.select_one('.con-box')
-    )
+    content_box = tree.first(content_selectors)
 
     if content_box is None:
         print(f"Warning: 내용 영역을 찾을 수 없습니다: {url}")
@@ -81,17 +91,15 @@ for url in urls:
     result['conditions'] = ""
     result['benefits'] = ""
 
-    elements = content_box.find_all(['h3', 'h4', 'ul'])
-    current_section = None
-
-    for el in elements:
-        if el.name in ['h3', 'h4']:
-            current_section = el.get_text(strip=True)
-        elif el.name == 'ul' and el.get('class') == ['ls-st1'] and current_section:
+    # 내용 영역 안의 h3/h4 → 다음 제목 전까지 문서 순서로 나온 ul (같은 순회에서 기록한 목록)
+    for section in tree.outline(content_box, ('h3', 'h4')):
+        for el in section.blocks:
+            if el.get('class') != ['ls-st1']:
+                continue
             text = el.get_text(separator=' ', strip=True)
-            if any(kw in current_section for kw in ['지원대상', '사업대상', '신청자격', '지원자격']):
+            if any(kw in section.title for kw in ['지원대상', '사업대상', '신청자격', '지원자격']):
                 result['conditions'] += text + " "
-            elif any(kw in current_section for kw in ['사업내용', '지원내용', '혜택']):
+            elif any(kw in section.title for kw in ['사업내용', '지원내용', '혜택']):
                 result['benefits'] += text + " "
 
     result['conditions'] = result['conditions'].strip()
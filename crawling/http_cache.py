@@ -0,0 +1,116 @@
+#크롤러용 조건부 요청(Conditional GET) 캐시
+#하는 일:
+#URL별 ETag / Last-Modified / 본문 해시 / 추출 결과를 디스크(SQLite)에 저장
+#다음 크롤링 때 If-None-Match / If-Modified-Since 헤더 생성
+#304 응답이거나 본문 해시가 같으면 파싱 없이 이전 추출 결과 재사용
+#언제 사용: 정기 크롤링에서 바뀌지 않은 페이지를 다시 받지/파싱하지 않을 때
+
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_hash: str
+    record: Optional[Dict[str, Any]]
+
+
+def hash_body(text: str) -> str:
+    """응답 본문 해시"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class HttpCache:
+    """URL을 키로 하는 디스크 HTTP 캐시"""
+
+    def __init__(self, db_path: str = ".http_cache.db", commit_every: int = 50):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT NOT NULL,
+                record TEXT,  -- 추출 결과 JSON (내용 없는 페이지는 NULL)
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.commit()
+
+        self._pending = 0
+        self.stats = {'not_modified': 0, 'unchanged': 0, 'changed': 0}
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """캐시 항목 조회"""
+        row = self.conn.execute(
+            'SELECT url, etag, last_modified, body_hash, record FROM http_cache WHERE url = ?', (url,)
+        ).fetchone()
+        if not row:
+            return None
+        return CacheEntry(row[0], row[1], row[2], row[3], json.loads(row[4]) if row[4] else None)
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """조건부 요청 헤더 생성"""
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def is_fresh(self, entry: Optional[CacheEntry], status: int, text: str) -> bool:
+        """304이거나 본문 해시가 같으면 이전 결과 재사용 가능"""
+        if entry is None:
+            return False
+        if status == 304:
+            self.stats['not_modified'] += 1
+            return True
+        if hash_body(text) == entry.body_hash:
+            self.stats['unchanged'] += 1
+            return True
+        return False
+
+    def put(self, url: str, headers: Dict[str, str], text: str, record: Optional[Dict[str, Any]]):
+        """새로 받은 응답과 추출 결과 저장"""
+        headers = {key.lower(): value for key, value in headers.items()}
+        self.conn.execute('''
+            INSERT INTO http_cache (url, etag, last_modified, body_hash, record, fetched_at)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                body_hash = excluded.body_hash,
+                record = excluded.record,
+                fetched_at = excluded.fetched_at
+        ''', (
+            url,
+            headers.get('etag'),
+            headers.get('last-modified'),
+            hash_body(text),
+            json.dumps(record, ensure_ascii=False) if record is not None else None
+        ))
+        self.stats['changed'] += 1
+
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        """쌓인 변경사항 커밋"""
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        """캐시 DB 닫기"""
+        self.flush()
+        self.conn.close()
@@ -1,267 +1,265 @@
-import requests
-from bs4 import BeautifulSoup
-import re
+import argparse
+import asyncio
+import hashlib
 import json
 import os
-from urllib.parse import urljoin
 import time
+from concurrent.futures import ProcessPoolExecutor
+
+from async_fetcher import AsyncFetcher
+from http_cache import HttpCache
+from crawl_state import content_hash, load_known_hashes
+from page_parser import parse_page, select_parser
+from crawl_frontier import BloomFilter, CrawlFrontier, SeenSet, discover_list_pages
+from jsonl_writer import JsonlWriter
+from crawl_checkpoint import CheckpointStore
+from crawl_sources import SOURCES, SourceDefinition
+from welfare_db.policy_schema import region_code
 
 class WelfareCrawler:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, fetcher: AsyncFetcher = None, cache: HttpCache = None, known_hashes=None,
+                 parse_workers: int = None, parser: str = None, queue_size: int = 64, corpus_dir: str = None,
+                 seen=None, output: JsonlWriter = None, checkpoint: CheckpointStore = None):
+        # 요청은 모두 공유 fetcher를 거침 (동시성/호스트별 속도 제한/커넥션 재사용)
+        # 전역 동시 요청 수는 지역 작업자 풀 합계 + 지역별 목록 요청 1개
+        self.fetcher = fetcher or AsyncFetcher(
+            max_concurrency=sum(source.concurrency + 1 for source in SOURCES.values()), per_host_rate=1.0)
+        # 조건부 요청 캐시 (None이면 매번 전체 다운로드)
+        self.cache = cache
+        # 증분 모드: DB crawl_state의 {url: (region, content_hash)}
+        self.known_hashes = known_hashes or {}
+        self.discovered_urls = {}  # url → region (이번 실행에서 목록에 있던 URL)
+        self.unchanged_count = 0
+        self.incomplete_regions = set()
+        # 정규화 URL 중복 제거 (지역 간 공유, 대규모 크롤링이면 BloomFilter 사용)
+        self.seen = seen if seen is not None else SeenSet()
         
-    def crawl_seoul(self):
-        """서울시 복지 정보 크롤링"""
-        print("🔄 서울시 복지 정보 크롤링 시작...")
+        # 파싱 단계: fetch 단계와 bounded 큐로 분리, ProcessPoolExecutor에서 실행
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.parser = select_parser(parser)
+        self.queue_size = queue_size
+        self.parse_queue = None
+        self.executor = None
+        # 지정하면 받은 HTML을 저장 (page_parser.py 벤치마크용 코퍼스)
+        self.corpus_dir = corpus_dir
+        # 지정하면 결과를 메모리에 모으지 않고 페이지마다 JSONL로 바로 기록
+        self.output = output
+        self.region_counts = {}
+        # 지정하면 프론티어/URL 상태/추출 결과를 저장해 중단된 크롤링을 이어서 함
+        self.checkpoint = checkpoint
         
-        seoul_urls = [
-            "https://wis.seoul.go.kr/wfs/ywf/sickMan.do",
-            "https://wis.seoul.go.kr/wfs/ywf/selfReliance.do",
-            "https://wis.seoul.go.kr/wfs/ywf/saveAccnt.do"
-        ]
+    async def crawl_all(self, sources=None):
+        """등록된 지역 소스를 하나의 fetcher 위에서 병렬로 크롤링 (지역마다 별도 작업자 풀/속도 제한)"""
+        sources = list(sources or SOURCES.values())
+        for source in sources:
+            self.fetcher.set_host_limit(source.host, source.rate, source.burst, source.concurrency)
         
-        results = []
-        for url in seoul_urls:
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
+            self.executor = executor
+            self.parse_queue = asyncio.Queue(maxsize=self.queue_size)
+            workers = [asyncio.create_task(self._parse_worker()) for _ in range(self.parse_workers)]
             try:
-                result = self._crawl_single_page(url, "서울")
-                if result:
-                    results.append(result)
-                time.sleep(1)  # 서버 부하 방지
-            except Exception as e:
-                print(f"❌ 서울 크롤링 에러 ({url}): {e}")
+                resumed_records, pending = self._resume()
+                pending_by_region = {}
+                for url, region in pending:
+                    pending_by_region.setdefault(region, []).append(url)
                 
-        return results
+                started = time.monotonic()
+                region_results = await asyncio.gather(*(
+                    self._timed(self.crawl_source(source, pending_by_region.pop(source.region, [])), source.region)
+                    for source in sources
+                ))
+                print(f"⏱️ 전체 {time.monotonic() - started:.1f}초")
+                for region, urls in pending_by_region.items():
+                    print(f"⚠️ 등록되지 않은 지역이라 이어하기에서 제외: {region} ({len(urls)}개)")
+                if self.checkpoint:
+                    self.checkpoint.finish()
+                
+                # 이전 실행분을 지역별 결과에 합침 (output 모드에서는 빈 목록)
+                by_region = {source.region: data for source, data in zip(sources, region_results)}
+                for record in resumed_records:
+                    by_region.setdefault(record['region'], []).append(record)
+                return by_region
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                self.parse_queue = None
+                await self.fetcher.close()
+                if self.cache:
+                    self.cache.flush()
     
-    def crawl_incheon(self):
-        """인천시 복지 정보 크롤링"""
-        print("🔄 인천시 복지 정보 크롤링 시작...")
+    async def _timed(self, coro, region):
+        """지역별 소요 시간 출력"""
+        started = time.monotonic()
+        result = await coro
+        print(f"⏱️ {region} {time.monotonic() - started:.1f}초")
+        return result
         
-        # 인천시 청년정책 사이트에서 목록 페이지 크롤링
-        base_url = "https://youth.incheon.go.kr/youthpolicy/youthPolicyInfoList.do"
+    def _resume(self):
+        """체크포인트에서 이전 실행 복원 (끝난 URL은 건너뛰고, 추출 결과는 다시 내보냄)"""
+        if not self.checkpoint or not self.checkpoint.start():
+            return [], []
         
-        results = []
-        try:
-            # 목록 페이지에서 정책 URL들 수집
-            policy_urls = self._get_incheon_policy_urls()
-            
-            for url in policy_urls[:20]:  # 최대 20개로 제한
-                try:
-                    result = self._crawl_single_page(url, "인천")
-                    if result:
-                        results.append(result)
-                    time.sleep(1)
-                except Exception as e:
-                    print(f"❌ 인천 크롤링 에러 ({url}): {e}")
-                    
-        except Exception as e:
-            print(f"❌ 인천 크롤링 초기화 에러: {e}")
-            
-        return results
+        for url, region in self.checkpoint.done_urls():
+            self.seen.add(url)
+            self.discovered_urls[url] = region_code(region)
+        
+        resumed_records = []
+        for record in self.checkpoint.records():
+            self._emit(record, resumed_records)
+        
+        pending = list(self.checkpoint.pending_urls())
+        print(f"♻️ 이전 크롤링 이어하기: 완료 {sum(self.region_counts.values())}개, 남은 URL {len(pending)}개")
+        return resumed_records, pending
     
-    def crawl_gyeonggi(self):
-        """경기도 복지 정보 크롤링"""
-        print("🔄 경기도 복지 정보 크롤링 시작...")
+    async def _parse_worker(self):
+        """파싱 단계 작업자: 큐에서 HTML을 꺼내 프로세스 풀에서 파싱"""
+        loop = asyncio.get_running_loop()
+        while True:
+            html, url, region, future = await self.parse_queue.get()
+            try:
+                result = await loop.run_in_executor(self.executor, parse_page, html, url, region, self.parser)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.parse_queue.task_done()
+    
+    async def _parse(self, html, url, region):
+        """파싱 단계로 넘기고 결과 대기 (큐가 차 있으면 fetch 단계도 대기)"""
+        if self.parse_queue is None:
+            return parse_page(html, url, region, self.parser)
         
-        base_url = "https://youth.gg.go.kr/gg/intro/youth-policy-job-test.do"
+        future = asyncio.get_running_loop().create_future()
+        await self.parse_queue.put((html, url, region, future))
+        return await future
         
-        results = []
-        try:
-            # 경기도 청년정책 목록에서 URL 수집
-            policy_urls = self._get_gyeonggi_policy_urls()
-            
-            for url in policy_urls[:20]:  # 최대 20개로 제한
-                try:
-                    result = self._crawl_single_page(url, "경기")
-                    if result:
-                        results.append(result)
-                    time.sleep(1)
-                except Exception as e:
-                    print(f"❌ 경기 크롤링 에러 ({url}): {e}")
-                    
-        except Exception as e:
-            print(f"❌ 경기 크롤링 초기화 에러: {e}")
-            
+    async def crawl_source(self, source: SourceDefinition, resume_urls=()):
+        """소스 하나 크롤링 (이어하기로 남은 URL 먼저, 그다음 고정 URL/목록 페이지)"""
+        print(f"🔄 {source.region} 복지 정보 크롤링 시작...")
+        frontier = CrawlFrontier(self.seen, checkpoint=self.checkpoint)
+        
+        async def discover():
+            try:
+                # 이어하기 URL은 seen에 아직 없으므로 그대로 프론티어에 들어감
+                await frontier.add_all(resume_urls, source.region)
+                if source.list_url:
+                    count = await discover_list_pages(self.fetcher, frontier, source.list_url,
+                                                      source.link_selector, source.region, source.page_param,
+                                                      executor=self.executor)
+                    print(f"🔗 {source.region} 정책 URL {count}개 발견")
+                else:
+                    await frontier.add_all(source.urls, source.region)
+            except Exception as e:
+                print(f"❌ {source.region} URL 수집 에러: {e}")
+                # 목록을 끝까지 못 읽은 지역은 사라진 정책 판단(tombstone)에서 제외
+                self.incomplete_regions.add(region_code(source.region))
+            finally:
+                await frontier.close()
+        
+        discovery = asyncio.create_task(discover())
+        results = await self._crawl_frontier(frontier, source.concurrency)
+        await discovery
         return results
     
-    def _get_incheon_policy_urls(self):
-        """인천시 정책 URL 목록 수집"""
-        urls = []
-        try:
-            response = self.session.get("https://youth.incheon.go.kr/youthpolicy/youthPolicyInfoList.do")
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 정책 링크들 찾기
-            links = soup.select('a[href*="youthPolicyInfoDetail.do"]')
-            for link in links:
-                href = link.get('href')
-                if href:
-                    full_url = urljoin("https://youth.incheon.go.kr/", href)
-                    urls.append(full_url)
-                    
-        except Exception as e:
-            print(f"인천 URL 수집 에러: {e}")
-            
-        return urls
+    async def crawl_seoul(self):
+        """서울시 복지 정보 크롤링"""
+        return await self.crawl_source(SOURCES["서울"])
     
-    def _get_gyeonggi_policy_urls(self):
-        """경기도 정책 URL 목록 수집"""
-        urls = []
-        try:
-            response = self.session.get("https://youth.gg.go.kr/gg/intro/youth-policy-job-test.do?mode=list")
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 정책 링크들 찾기
-            links = soup.select('a[href*="mode=view"]')
-            for link in links:
-                href = link.get('href')
-                if href:
-                    full_url = urljoin("https://youth.gg.go.kr/", href)
-                    urls.append(full_url)
-                    
-        except Exception as e:
-            print(f"경기 URL 수집 에러: {e}")
-            
-        return urls
+    async def crawl_incheon(self):
+        """인천시 복지 정보 크롤링"""
+        return await self.crawl_source(SOURCES["인천"])
+    
+    async def crawl_gyeonggi(self):
+        """경기도 복지 정보 크롤링"""
+        return await self.crawl_source(SOURCES["경기"])
+    
+    async def _crawl_frontier(self, frontier, workers=None):
+        """프론티어 스트림을 지역 작업자 풀이 나눠서 크롤링 (서버 부하 방지는 fetcher의 호스트별 제한이 담당)"""
+        results = []
+        
+        async def worker():
+            async for url, region in frontier:
+                self.discovered_urls[url] = region_code(region)
+                page = await self._crawl_single_page(url, region)
+                if page:
+                    self._emit(page, results)
+        
+        await asyncio.gather(*(worker() for _ in range(workers or self.fetcher.max_concurrency)))
+        return results
     
-    def _crawl_single_page(self, url, region):
-        """단일 페이지 크롤링"""
+    async def _crawl_single_page(self, url, region):
+        """단일 페이지 크롤링 (체크포인트에 완료/실패 기록)"""
         try:
-            response = self.session.get(url, timeout=10)
-            response.encoding = 'utf-8'
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            result = {
-                'url': url,
-                'region': region,
-                'title': '',
-                'age_range': [],
-                'application_period': '',
-                'conditions': '',
-                'benefits': ''
-            }
-            
-            # 제목 추출
-            title_selectors = [
-                '.title-area h2',
-                '.b-title-box span',
-                'h1',
-                '.page-title',
-                'title'
-            ]
-            
-            for selector in title_selectors:
-                title_tag = soup.select_one(selector)
-                if title_tag:
-                    result['title'] = title_tag.get_text(strip=True)
-                    break
-            
-            if not result['title']:
-                result['title'] = '제목 없음'
-            
-            # 내용 영역 찾기
-            content_selectors = [
-                '.txt-tp1',
-                '#detail_con .line-box',
-                '.box-gray',
-                '.con-box',
-                '.content-area',
-                '.detail-content'
-            ]
-            
-            content_text = ""
-            for selector in content_selectors:
-                content_box = soup.select_one(selector)
-                if content_box:
-                    content_text = content_box.get_text(separator=" ", strip=True)
-                    break
-            
-            if not content_text:
-                return None
-            
-            # 나이 범위 추출
-            result['age_range'] = self._extract_age_range(content_text)
-            
-            # 신청기간 추출
-            result['application_period'] = self._extract_application_period(content_text)
-            
-            # 조건/혜택 추출
-            result['conditions'], result['benefits'] = self._extract_conditions_benefits(soup)
-            
-            return result
-            
+            result = await self._fetch_and_parse(url, region)
         except Exception as e:
             print(f"페이지 크롤링 에러 ({url}): {e}")
+            if self.checkpoint:
+                self.checkpoint.mark_failed(url)
             return None
+        
+        if self.checkpoint:
+            self.checkpoint.mark_done(url, result)
+        return result
     
-    def _extract_age_range(self, text):
-        """나이 범위 추출"""
-        # 정규식 패턴들
-        patterns = [
-            r'(\d{1,2})\s*세\s*[~\-]\s*(\d{1,2})\s*세',  # 20세~29세
-            r'만\s*(\d{1,2})\s*세\s*이하',  # 만 29세 이하
-            r'(\d{1,2})\s*[~\-]\s*(\d{1,2})\s*세',  # 20~29세
-            r'만\s*(\d{1,2})\s*[~\-]\s*(\d{1,2})\s*세'  # 만 20~29세
-        ]
+    async def _fetch_and_parse(self, url, region):
+        """페이지 요청 → (캐시/해시 확인) → 파싱"""
+        entry = self.cache.get(url) if self.cache else None
+        response = await self.fetcher.fetch(url, headers=HttpCache.conditional_headers(entry))
+        if self.corpus_dir and response.ok:
+            self._save_corpus_page(url, response.text)
         
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                if len(match.groups()) == 2:
-                    start, end = int(match.group(1)), int(match.group(2))
-                    return list(range(start, end + 1))
-                else:
-                    max_age = int(match.group(1))
-                    return list(range(0, max_age + 1))
+        # 304 또는 본문 동일 → 파싱 생략하고 이전 추출 결과 재사용
+        if self.cache and self.cache.is_fresh(entry, response.status, response.text):
+            return entry.record
         
-        # 키워드 기반 추출
-        if '청년' in text or '대학생' in text:
-            return list(range(20, 30))
+        # 정규화 해시가 DB와 같으면 추출 생략 (증분 모드)
+        digest = content_hash(response.text)
+        known = self.known_hashes.get(url)
+        if known and known[1] == digest:
+            self.unchanged_count += 1
+            return None
         
-        return []
+        result = await self._parse(response.text, url, region)
+        if result:
+            result['content_hash'] = digest
+        if self.cache and response.ok:
+            self.cache.put(url, response.headers, response.text, result)
+        return result
+    
+    def _save_corpus_page(self, url, html):
+        """받은 HTML을 코퍼스 폴더에 저장"""
+        os.makedirs(self.corpus_dir, exist_ok=True)
+        filename = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html'
+        with open(os.path.join(self.corpus_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(html)
+    
+    def _emit(self, page, results):
+        """결과 한 건 처리 (output이 있으면 바로 파일에 쓰고 메모리에 쌓지 않음)"""
+        self.region_counts[page['region']] = self.region_counts.get(page['region'], 0) + 1
+        if self.output is None:
+            results.append(page)
+        elif self.is_changed(page):
+            self.output.write(page)
     
-    def _extract_application_period(self, text):
-        """신청기간 추출"""
-        patterns = [
-            r'신청기간[^\d]*(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})',
-            r'접수기간[^\d]*(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})',
-            r'(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})'
+    def is_changed(self, item):
+        """DB crawl_state와 해시가 다른 정책인지 (증분 모드가 아니면 항상 True)"""
+        return self.known_hashes.get(item['url'], (None, None))[1] != item.get('content_hash')
+    
+    def tombstones(self):
+        """이번 크롤링에서 사라진 정책 (목록 수집에 성공한 지역만 대상)"""
+        crawled_regions = set(self.discovered_urls.values()) - self.incomplete_regions
+        return [
+            {'url': url, 'region': region, 'deleted': True}
+            for url, (region, _) in self.known_hashes.items()
+            if region in crawled_regions and url not in self.discovered_urls
         ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return f"{match.group(1)}~{match.group(2)}"
-        
-        return '미정'
     
-    def _extract_conditions_benefits(self, soup):
-        """조건과 혜택 추출"""
-        conditions = ""
-        benefits = ""
-        
-        # 조건/혜택 관련 섹션 찾기
-        sections = soup.find_all(['h3', 'h4', 'h5'])
-        
-        for section in sections:
-            section_text = section.get_text(strip=True)
-            next_elements = section.find_next_siblings(['ul', 'p', 'div'])
-            
-            content = ""
-            for elem in next_elements[:3]:  # 최대 3개 요소까지만
-                if elem.name == 'ul':
-                    content += elem.get_text(separator=' ', strip=True) + " "
-                elif elem.name in ['p', 'div']:
-                    content += elem.get_text(strip=True) + " "
-            
-            if any(keyword in section_text for keyword in ['지원대상', '사업대상', '신청자격', '지원자격', '조건']):
-                conditions += content
-            elif any(keyword in section_text for keyword in ['사업내용', '지원내용', '혜택', '지원금액']):
-                benefits += content
-        
-        return conditions.strip(), benefits.strip()
+    def changed_records(self, data):
+        """DB에 반영할 레코드만 선별 (새 정책/바뀐 정책 + 사라진 정책 tombstone)"""
+        return [item for item in data if self.is_changed(item)] + self.tombstones()
     
     def save_to_json(self, data, filename):
         """JSON 파일로 저장"""
@@ -270,24 +268,46 @@ class WelfareCrawler:
         print(f"✅ {filename}에 {len(data)}개 정책 저장 완료")
 
 def main():
-    crawler = WelfareCrawler()
+    parser = argparse.ArgumentParser(description="복지 정책 크롤러")
+    parser.add_argument('--incremental-db', help="crawl_state가 있는 DB 경로 (지정하면 바뀐 정책만 저장)")
+    parser.add_argument('--parse-workers', type=int, default=None, help="파싱 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--parser', default=None, help="BeautifulSoup 파서 (기본: lxml, 없으면 html.parser)")
+    parser.add_argument('--save-corpus', default=None, help="받은 HTML을 저장할 폴더 (파싱 벤치마크용)")
+    parser.add_argument('--bloom', type=int, default=None, help="URL 중복 제거에 Bloom 필터 사용 (예상 URL 수)")
+    parser.add_argument('--checkpoint', default='.crawl_checkpoint.db', help="이어하기용 체크포인트 DB 경로")
+    parser.add_argument('--fresh', action='store_true', help="이전 체크포인트를 무시하고 처음부터 크롤링")
+    args = parser.parse_args()
     
-    # 각 지역별 크롤링
-    seoul_data = crawler.crawl_seoul()
-    incheon_data = crawler.crawl_incheon()
-    gyeonggi_data = crawler.crawl_gyeonggi()
+    known_hashes = load_known_hashes(args.incremental_db) if args.incremental_db else {}
+    output = JsonlWriter('welfare_policies_changes.jsonl' if args.incremental_db else 'welfare_policies.jsonl')
+    cache = HttpCache('.http_cache.db')
+    checkpoint = CheckpointStore(args.checkpoint)
+    if args.fresh:
+        checkpoint.finish()  # 이전 실행을 끝난 것으로 처리 → start()에서 초기화
+    crawler = WelfareCrawler(cache=cache, known_hashes=known_hashes, parse_workers=args.parse_workers,
+                             parser=args.parser, corpus_dir=args.save_corpus,
+                             seen=BloomFilter(args.bloom) if args.bloom else None, output=output,
+                             checkpoint=checkpoint)
     
-    # 통합 데이터
-    all_data = seoul_data + incheon_data + gyeonggi_data
+    # 등록된 지역 병렬 크롤링 (지역별 작업자 풀, 정책은 끝나는 대로 JSONL에 한 줄씩 기록)
+    asyncio.run(crawler.crawl_all())
     
-    # JSON 파일로 저장
-    crawler.save_to_json(all_data, 'welfare_policies.json')
+    # 증분 모드: 사라진 정책 tombstone 추가
+    if args.incremental_db:
+        for tombstone in crawler.tombstones():
+            output.write(tombstone)
+        print(f"변경 없음(추출 생략): {crawler.unchanged_count}개")
+    output.close()
     
+    counts = crawler.region_counts
     print(f"\n📊 크롤링 완료!")
-    print(f"서울: {len(seoul_data)}개")
-    print(f"인천: {len(incheon_data)}개")
-    print(f"경기: {len(gyeonggi_data)}개")
-    print(f"총계: {len(all_data)}개")
+    for region in SOURCES:
+        print(f"{region}: {counts.get(region, 0)}개")
+    print(f"총계: {sum(counts.values())}개")
+    print(f"캐시: 304 {cache.stats['not_modified']}개, 본문 동일 {cache.stats['unchanged']}개, "
+          f"새로 파싱 {cache.stats['changed']}개")
+    cache.close()
+    checkpoint.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,35 @@
+#크롤링 결과를 JSONL(한 줄에 정책 하나)로 바로바로 저장
+#하는 일:
+#페이지 하나가 끝날 때마다 한 줄 추가 + flush (메모리에 쌓지 않음)
+#크롤링이 끝나면 <파일명>.done 표시 파일 생성 (임포터가 따라 읽다가 멈출 시점)
+#언제 사용: 크롤링 결과가 커도 메모리를 일정하게 유지하고, 크롤링 중에 임포트를 시작할 때
+
+import json
+import os
+from typing import Any, Dict
+
+
+class JsonlWriter:
+    """JSONL 스트리밍 출력"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.done_marker = filename + '.done'
+        if os.path.exists(self.done_marker):
+            os.remove(self.done_marker)
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, record: Dict[str, Any]):
+        """레코드 한 줄 추가"""
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        """파일 닫고 완료 표시"""
+        if not self.file.closed:
+            self.file.close()
+            with open(self.done_marker, 'w', encoding='utf-8') as f:
+                f.write(str(self.count))
+            print(f"✅ {self.filename}에 {self.count}개 정책 저장 완료")
@@ -0,0 +1,242 @@
+#정책 상세 페이지 파싱/추출 단계
+#하는 일:
+#HTML → 정책 레코드 변환 (제목, 나이, 신청기간, 조건/혜택, 모두 섹션 트리 하나를 공유)
+#CPU를 쓰는 단계라 크롤러가 ProcessPoolExecutor에서 실행
+#파서 백엔드 선택 (lxml이 설치돼 있으면 lxml, 없으면 html.parser)
+#저장된 코퍼스로 처리량 측정 (python page_parser.py <코퍼스 폴더>, 프로세스 수 1/2/4/...별 속도 향상 비교)
+#언제 사용: 크롤러가 자동으로 사용 / 파싱 성능을 측정할 때
+
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from section_tree import build_page_tree
+
+
+def select_parser(name=None):
+    """BeautifulSoup 파서 백엔드 선택"""
+    if name:
+        return name
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+DEFAULT_PARSER = select_parser()
+
+
+# 제목/내용 영역 셀렉터 (우선순위 순)
+TITLE_SELECTORS = [
+    '.title-area h2',
+    '.b-title-box span',
+    'h1',
+    '.page-title',
+    'title'
+]
+
+CONTENT_SELECTORS = [
+    '.txt-tp1',
+    '#detail_con .line-box',
+    '.box-gray',
+    '.con-box',
+    '.content-area',
+    '.detail-content'
+]
+
+CONDITION_KEYWORDS = ['지원대상', '사업대상', '신청자격', '지원자격', '조건']
+BENEFIT_KEYWORDS = ['사업내용', '지원내용', '혜택', '지원금액']
+
+
+def parse_page(html, url, region, parser=None):
+    """페이지 HTML에서 정책 정보 추출"""
+    soup = BeautifulSoup(html, parser or DEFAULT_PARSER)
+    # 문서는 한 번만 순회하고 모든 추출기가 같은 트리를 사용
+    tree = build_page_tree(soup, TITLE_SELECTORS + CONTENT_SELECTORS)
+
+    result = {
+        'url': url,
+        'region': region,
+        'title': '',
+        'age_range': [],
+        'application_period': '',
+        'conditions': '',
+        'benefits': ''
+    }
+
+    # 제목 추출
+    result['title'] = extract_title(tree)
+
+    # 내용 영역 찾기
+    content_text = extract_content_text(tree)
+    if not content_text:
+        return None
+
+    # 나이 범위 추출
+    result['age_range'] = extract_age_range(content_text)
+
+    # 신청기간 추출
+    result['application_period'] = extract_application_period(content_text)
+
+    # 조건/혜택 추출
+    result['conditions'], result['benefits'] = extract_conditions_benefits(tree)
+
+    return result
+
+
+def extract_title(tree):
+    """제목 추출"""
+    title_tag = tree.first(TITLE_SELECTORS)
+    title = title_tag.get_text(strip=True) if title_tag else ''
+    return title or '제목 없음'
+
+
+def extract_content_text(tree):
+    """내용 영역 텍스트 추출"""
+    content_box = tree.first(CONTENT_SELECTORS)
+    return content_box.get_text(separator=" ", strip=True) if content_box else ""
+
+
+def extract_age_range(text):
+    """나이 범위 추출"""
+    # 정규식 패턴들
+    patterns = [
+        r'(\d{1,2})\s*세\s*[~\-]\s*(\d{1,2})\s*세',  # 20세~29세
+        r'만\s*(\d{1,2})\s*세\s*이하',  # 만 29세 이하
+        r'(\d{1,2})\s*[~\-]\s*(\d{1,2})\s*세',  # 20~29세
+        r'만\s*(\d{1,2})\s*[~\-]\s*(\d{1,2})\s*세'  # 만 20~29세
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            if len(match.groups()) == 2:
+                start, end = int(match.group(1)), int(match.group(2))
+                return list(range(start, end + 1))
+            else:
+                max_age = int(match.group(1))
+                return list(range(0, max_age + 1))
+
+    # 키워드 기반 추출
+    if '청년' in text or '대학생' in text:
+        return list(range(20, 30))
+
+    return []
+
+
+def extract_application_period(text):
+    """신청기간 추출"""
+    patterns = [
+        r'신청기간[^\d]*(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})',
+        r'접수기간[^\d]*(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})',
+        r'(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})'
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            return f"{match.group(1)}~{match.group(2)}"
+
+    return '미정'
+
+
+def extract_conditions_benefits(tree):
+    """조건과 혜택 추출 (섹션 트리 사용, 섹션당 내용 블록 최대 3개)"""
+    conditions = []
+    benefits = []
+
+    for section in tree.sections:
+        if any(keyword in section.title for keyword in CONDITION_KEYWORDS):
+            conditions.append(section.text(limit=3))
+        elif any(keyword in section.title for keyword in BENEFIT_KEYWORDS):
+            benefits.append(section.text(limit=3))
+
+    return ' '.join(filter(None, conditions)), ' '.join(filter(None, benefits))
+
+
+def _parse_file(path, parser):
+    """코퍼스 파일 하나 파싱 (벤치마크용)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_page(f.read(), path, '', parser) is not None
+
+
+def benchmark(corpus_dir, workers=None, parser=None):
+    """저장된 코퍼스(*.html)로 파싱 처리량 측정"""
+    paths = sorted(glob.glob(os.path.join(corpus_dir, '*.html')))
+    if not paths:
+        print(f"❌ 코퍼스가 비어 있습니다: {corpus_dir}")
+        return None
+
+    parser = select_parser(parser)
+    started = time.perf_counter()
+    if workers == 1:
+        parsed = sum(_parse_file(path, parser) for path in paths)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = sum(executor.map(_parse_file, paths, [parser] * len(paths), chunksize=16))
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 {parser} / workers={workers or os.cpu_count()}: "
+          f"{len(paths)}페이지 {elapsed:.2f}초 ({len(paths) / elapsed:.1f} pages/s, 추출 성공 {parsed}개)")
+    return len(paths) / elapsed
+
+
+def default_worker_counts():
+    """1, 2, 4, ... CPU 코어 수까지 (코어 수가 2의 거듭제곱이 아니면 마지막에 코어 수 추가)"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def scaling(corpus_dir, worker_counts, parser=None):
+    """프로세스 수별 처리량 측정 → 1개 대비 속도 향상/효율 표 출력 ({workers: pages/s})"""
+    rates = {}
+    for workers in worker_counts:
+        rate = benchmark(corpus_dir, workers, parser)
+        if rate is None:
+            return rates
+        rates[workers] = rate
+
+    base_workers = worker_counts[0]
+    print(f"\n📈 프로세스 수별 확장성 (CPU 코어 {os.cpu_count()}개, 기준: workers={base_workers})")
+    print(f"  {'workers':>7}  {'pages/s':>9}  {'속도 향상':>7}  {'효율':>6}")
+    for workers, rate in rates.items():
+        speedup = rate / rates[base_workers]
+        print(f"  {workers:>7}  {rate:>9.1f}  {speedup:>8.2f}x  {speedup * base_workers / workers:>6.0%}")
+    if max(worker_counts) > (os.cpu_count() or 1):
+        print("⚠️ 코어 수보다 많은 프로세스는 속도가 늘지 않고 전환 비용만 생김")
+    return rates
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="정책 페이지 파싱 처리량 측정")
+    arg_parser.add_argument('corpus_dir', help="크롤러 --save-corpus로 저장한 HTML 폴더")
+    arg_parser.add_argument('--workers', default=None,
+                            help="비교할 프로세스 수, 쉼표로 구분 (예: 1,2,4,8, 기본: 1부터 CPU 코어 수까지 2배씩)")
+    arg_parser.add_argument('--parser', default=None, help="lxml / html.parser")
+    args = arg_parser.parse_args()
+
+    if args.workers:
+        try:
+            worker_counts = [int(count) for count in args.workers.split(',')]
+        except ValueError:
+            arg_parser.error("--workers는 쉼표로 구분한 숫자여야 합니다 (예: 1,2,4)")
+        if min(worker_counts) < 1:
+            arg_parser.error("--workers는 1 이상이어야 합니다")
+    else:
+        worker_counts = default_worker_counts()
+    scaling(args.corpus_dir, worker_counts, args.parser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#한 번의 문서 순회로 만드는 섹션 트리
+#하는 일:
+#문서를 한 번만 훑으면서 제목/내용 셀렉터의 첫 매치를 기록
+#h3/h4/h5 제목 → 같은 부모 아래 이어지는 내용 블록(ul/p/div) 묶기
+#같은 순회에서 제목과 ul을 문서 순서대로 기록 → 영역(content_box) 안에서 제목별 ul 목록 (outline)
+#  (ul이 다른 wrapper div 안에 있거나 사이에 h5가 있어도 다음 제목 전까지는 같은 섹션)
+#언제 사용: 제목/내용/조건/혜택/나이/기간 추출기가 같은 트리를 공유할 때
+#(제목마다 find_next_siblings를 다시 도는 O(제목 수 × 형제 수) 방식 대체)
+
+import bisect
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bs4.element import Tag
+
+HEADING_TAGS = ('h3', 'h4', 'h5')
+BLOCK_TAGS = ('ul', 'p', 'div')
+OUTLINE_TAGS = HEADING_TAGS + ('ul',)
+
+_COMPOUND = re.compile(r'([a-zA-Z0-9]*)(?:#([\w-]+))?((?:\.[\w-]+)*)')
+
+
+def _compile_selector(selector: str) -> Tuple[tuple, ...]:
+    """'#detail_con .line-box' 같은 단순 셀렉터(태그/#id/.class + 자손 결합자)를 튜플로 변환"""
+    parts = []
+    for token in selector.split():
+        match = _COMPOUND.fullmatch(token)
+        if not match:
+            raise ValueError(f"지원하지 않는 셀렉터: {selector}")
+        tag, element_id, classes = match.groups()
+        parts.append((tag or None, element_id, tuple(c for c in classes.split('.') if c)))
+    return tuple(parts)
+
+
+def _matches_compound(element, compound) -> bool:
+    tag, element_id, classes = compound
+    if tag and element.name != tag:
+        return False
+    if element_id and element.get('id') != element_id:
+        return False
+    if classes:
+        element_classes = element.get('class') or ()
+        return all(cls in element_classes for cls in classes)
+    return True
+
+
+def _matches(element, compiled) -> bool:
+    """요소가 셀렉터에 맞는지 확인 (앞쪽 조건은 조상에서 순서대로 찾음)"""
+    if not _matches_compound(element, compiled[-1]):
+        return False
+    index = len(compiled) - 2
+    for ancestor in element.parents:
+        if index < 0:
+            break
+        if _matches_compound(ancestor, compiled[index]):
+            index -= 1
+    return index < 0
+
+
+@dataclass
+class Section:
+    heading: Tag
+    title: str
+    blocks: List[Tag] = field(default_factory=list)
+
+    def text(self, limit: Optional[int] = None) -> str:
+        """내용 블록 텍스트 (ul은 항목 사이를 공백으로 구분)"""
+        texts = []
+        for block in self.blocks[:limit]:
+            if block.name == 'ul':
+                texts.append(block.get_text(separator=' ', strip=True))
+            else:
+                texts.append(block.get_text(strip=True))
+        return ' '.join(text for text in texts if text)
+
+
+@dataclass
+class PageTree:
+    matches: Dict[str, Tag]
+    sections: List[Section]
+    ordered: List[Tag] = field(default_factory=list)  # 제목/ul (문서 순서)
+    ordered_positions: List[int] = field(default_factory=list)  # ordered 각 요소의 문서 순서 번호
+    positions: Dict[int, int] = field(default_factory=dict)  # id(요소) → 문서 순서 번호 (모든 요소)
+
+    def first(self, selectors: Iterable[str]) -> Optional[Tag]:
+        """우선순위 순서대로 첫 번째로 매치된 셀렉터의 요소"""
+        for selector in selectors:
+            element = self.matches.get(selector)
+            if element is not None:
+                return element
+        return None
+
+    def _subtree_end(self, element: Tag) -> int:
+        """element 자손이 끝난 다음 요소의 순서 번호 (자손은 순서 번호가 연속)"""
+        node = element
+        while node is not None:
+            following = node.find_next_sibling()
+            if following is not None:
+                return self.positions[id(following)]
+            node = node.parent
+        return len(self.positions)
+
+    def outline(self, within: Tag, heading_tags: Iterable[str] = ('h3', 'h4')) -> List[Section]:
+        """within 안의 제목 → 다음 제목 전까지 나온 ul (문서 순서, wrapper 깊이 상관없음)
+        heading_tags에 없는 제목(h5 등)은 섹션을 나누지 않음"""
+        heading_tags = tuple(heading_tags)
+        start, end = self.positions[id(within)], self._subtree_end(within)
+        low = bisect.bisect_right(self.ordered_positions, start)
+        high = bisect.bisect_left(self.ordered_positions, end, low)
+        sections = []
+        for element in self.ordered[low:high]:
+            if element.name in heading_tags:
+                sections.append(Section(element, element.get_text(strip=True)))
+            elif element.name == 'ul' and sections:
+                sections[-1].blocks.append(element)
+        return sections
+
+
+def build_page_tree(root, selectors: Iterable[str] = ()) -> PageTree:
+    """문서를 한 번 순회해서 셀렉터 첫 매치와 섹션 목록 생성"""
+    pending = {selector: _compile_selector(selector) for selector in selectors}
+    matches = {}
+    sections = []
+    open_sections = {}  # 부모 요소 id → 그 부모 아래에서 마지막으로 나온 제목의 섹션
+    ordered = []
+    ordered_positions = []
+    positions = {id(root): -1}
+
+    for position, element in enumerate(root.find_all(True)):
+        positions[id(element)] = position
+        if pending:
+            for selector, compiled in list(pending.items()):
+                if _matches(element, compiled):
+                    matches[selector] = element
+                    del pending[selector]
+
+        name = element.name
+        if name in OUTLINE_TAGS:
+            ordered.append(element)
+            ordered_positions.append(position)
+        if name in HEADING_TAGS:
+            section = Section(element, element.get_text(strip=True))
+            sections.append(section)
+            open_sections[id(element.parent)] = section
+        elif name in BLOCK_TAGS:
+            section = open_sections.get(id(element.parent))
+            if section is not None:
+                section.blocks.append(element)
+
+    return PageTree(matches, sections, ordered, ordered_positions, positions)
@@ -0,0 +1,5 @@
+# 크롤링 모듈은 crawling/ 폴더에서 바로 import 하는 구조라 테스트에서도 같은 경로를 씀
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
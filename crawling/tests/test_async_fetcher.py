@@ -0,0 +1,174 @@
+# async_fetcher.py 테스트: 지연을 흉내내는 로컬 aiohttp 서버로 동시성/속도 제한/재시도 확인
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from async_fetcher import AsyncFetcher
+
+
+class StubServer:
+    """요청마다 delay초 늦게 응답, 동시 처리 최대치/요청 시각 기록
+    /flaky는 처음 fail_times번 503, /down은 항상 503, /missing은 404"""
+
+    def __init__(self, delay: float = 0.05, fail_times: int = 0):
+        self.delay = delay
+        self.fail_times = fail_times
+        self.active = 0
+        self.max_active = 0
+        self.hits = {}
+        self.started_at = []
+
+    async def handle(self, request):
+        path = request.path
+        self.hits[path] = self.hits.get(path, 0) + 1
+        self.started_at.append(time.monotonic())
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if path == '/flaky' and self.hits[path] <= self.fail_times:
+            return web.Response(status=503, text='busy')
+        if path == '/down':
+            return web.Response(status=503, text='down')
+        if path == '/missing':
+            return web.Response(status=404, text='not found')
+        return web.Response(text=f'ok {path}')
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.host = f'127.0.0.1:{port}'
+        self.base = f'http://{self.host}'
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_per_host_concurrency_limit():
+    async def scenario():
+        async with StubServer(delay=0.1) as server:
+            async with AsyncFetcher(max_concurrency=10, per_host_rate=1000, per_host_burst=100) as fetcher:
+                fetcher.set_host_limit(server.host, rate=1000, burst=100, concurrency=2)
+                results = await fetcher.fetch_all([f'{server.base}/p{i}' for i in range(8)])
+            return server, results
+
+    server, results = run(scenario())
+    assert all(result is not None and result.ok for result in results)
+    assert server.max_active == 2
+
+
+def test_hosts_are_limited_independently():
+    async def scenario():
+        async with StubServer(delay=0.2) as first, StubServer(delay=0.2) as second:
+            async with AsyncFetcher(max_concurrency=10, per_host_rate=1000, per_host_burst=100) as fetcher:
+                fetcher.set_host_limit(first.host, rate=1000, burst=100, concurrency=1)
+                fetcher.set_host_limit(second.host, rate=1000, burst=100, concurrency=1)
+                urls = [f'{server.base}/p{i}' for server in (first, second) for i in range(2)]
+                started = time.monotonic()
+                await fetcher.fetch_all(urls)
+                return time.monotonic() - started, first, second
+
+    elapsed, first, second = run(scenario())
+    assert first.max_active == 1 and second.max_active == 1
+    # 호스트끼리는 동시에 진행 (한 줄로 세우면 0.8초)
+    assert elapsed < 0.7
+
+
+def test_global_concurrency_limit():
+    async def scenario():
+        async with StubServer(delay=0.1) as server:
+            async with AsyncFetcher(max_concurrency=3, per_host_rate=1000, per_host_burst=100) as fetcher:
+                await fetcher.fetch_all([f'{server.base}/p{i}' for i in range(9)])
+            return server
+
+    assert run(scenario()).max_active == 3
+
+
+def test_token_bucket_paces_requests():
+    async def scenario():
+        async with StubServer(delay=0) as server:
+            async with AsyncFetcher(max_concurrency=10, per_host_rate=10, per_host_burst=1) as fetcher:
+                await fetcher.fetch_all([f'{server.base}/p{i}' for i in range(6)])
+            return server
+
+    server = run(scenario())
+    gaps = [b - a for a, b in zip(server.started_at, server.started_at[1:])]
+    # 초당 10개 → 0.1초 간격 (타이머 오차 조금 허용)
+    assert len(gaps) == 5
+    assert min(gaps) >= 0.08
+    assert server.started_at[-1] - server.started_at[0] >= 0.45
+
+
+def test_token_bucket_allows_burst():
+    async def scenario():
+        async with StubServer(delay=0) as server:
+            async with AsyncFetcher(max_concurrency=10, per_host_rate=1, per_host_burst=3) as fetcher:
+                started = time.monotonic()
+                await fetcher.fetch_all([f'{server.base}/p{i}' for i in range(3)])
+                return time.monotonic() - started
+
+    assert run(scenario()) < 0.5
+
+
+def test_retries_transient_errors():
+    async def scenario():
+        async with StubServer(delay=0, fail_times=2) as server:
+            async with AsyncFetcher(per_host_rate=1000, per_host_burst=100, retries=2, retry_backoff=0.01) as fetcher:
+                result = await fetcher.fetch(f'{server.base}/flaky')
+            return server, result
+
+    server, result = run(scenario())
+    assert result.ok and result.text == 'ok /flaky'
+    assert server.hits['/flaky'] == 3
+
+
+def test_returns_last_error_response_after_retries():
+    async def scenario():
+        async with StubServer(delay=0) as server:
+            async with AsyncFetcher(per_host_rate=1000, per_host_burst=100, retries=2, retry_backoff=0.01) as fetcher:
+                result = await fetcher.fetch(f'{server.base}/down')
+            return server, result
+
+    server, result = run(scenario())
+    assert result.status == 503 and not result.ok
+    assert server.hits['/down'] == 3
+
+
+def test_does_not_retry_client_errors():
+    async def scenario():
+        async with StubServer(delay=0) as server:
+            async with AsyncFetcher(per_host_rate=1000, per_host_burst=100, retries=2, retry_backoff=0.01) as fetcher:
+                result = await fetcher.fetch(f'{server.base}/missing')
+            return server, result
+
+    server, result = run(scenario())
+    assert result.status == 404 and server.hits['/missing'] == 1
+
+
+def test_connection_error_raises_after_retries():
+    async def scenario():
+        async with StubServer(delay=0) as server:
+            url = f'{server.base}/gone'
+        # 서버를 닫은 뒤 같은 주소로 요청 → 연결 거부
+        async with AsyncFetcher(per_host_rate=1000, per_host_burst=100, retries=1, retry_backoff=0.01) as fetcher:
+            try:
+                await fetcher.fetch(url)
+            except aiohttp.ClientError:
+                return True
+        return False
+
+    assert run(scenario())
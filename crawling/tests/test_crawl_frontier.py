@@ -0,0 +1,118 @@
+# crawl_frontier.py 테스트: 목록 페이지 순회 (오류 응답이면 그 지역은 끝까지 못 읽은 것으로)
+import asyncio
+import importlib.util
+import os
+
+import pytest
+from aiohttp import web
+
+from async_fetcher import AsyncFetcher
+from crawl_frontier import CrawlFrontier, ListPageError, discover_list_pages
+from crawl_sources import SourceDefinition
+
+CRAWLING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_crawler_module():
+    spec = importlib.util.spec_from_file_location(
+        'improved_crawling', os.path.join(CRAWLING_DIR, 'improved_crawling(PM.VER).py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ListServer:
+    """pgno 1~pages쪽은 쪽마다 상세 링크 2개, 그 뒤는 마지막 쪽 반복, broken_page쪽은 500"""
+
+    def __init__(self, pages: int = 3, broken_page: int = None):
+        self.pages = pages
+        self.broken_page = broken_page
+
+    async def list_page(self, request):
+        page = int(request.query.get('pgno', '1'))
+        if page == self.broken_page:
+            return web.Response(status=500, text='<html>서버 오류</html>', content_type='text/html')
+        page = min(page, self.pages)
+        links = ''.join(f'<a class="item" href="detail?poly_seq={page * 10 + i}&pgno={page}">정책</a>'
+                        for i in range(2))
+        return web.Response(text=f'<html><body>{links}</body></html>', content_type='text/html')
+
+    async def detail(self, request):
+        seq = request.query['poly_seq']
+        html = (f'<html><head><title>정책 {seq}</title></head><body>'
+                f'<div class="con-box"><h3>지원대상</h3><ul class="ls-st1"><li>만 19~39세</li></ul></div>'
+                f'</body></html>')
+        return web.Response(text=html, content_type='text/html')
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get('/list', self.list_page)
+        app.router.add_get('/detail', self.detail)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, '127.0.0.1', 0).start()
+        self.base = f'http://127.0.0.1:{self.runner.addresses[0][1]}'
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+async def discover(server, frontier):
+    async with AsyncFetcher(per_host_rate=1000, per_host_burst=100, retries=0) as fetcher:
+        count = await discover_list_pages(fetcher, frontier, f'{server.base}/list', 'a.item', '인천', 'pgno')
+    await frontier.close()
+    return count
+
+
+def test_follows_pagination_until_pages_repeat():
+    async def scenario():
+        async with ListServer(pages=3) as server:
+            frontier = CrawlFrontier()
+            count = await discover(server, frontier)
+            return count, [url async for url, _ in frontier]
+
+    count, urls = asyncio.run(scenario())
+    assert count == 6
+    assert len(set(urls)) == 6
+    assert all('pgno' not in url for url in urls)
+
+
+def test_error_page_raises_instead_of_ending_listing():
+    async def scenario():
+        async with ListServer(pages=3, broken_page=2) as server:
+            frontier = CrawlFrontier()
+            with pytest.raises(ListPageError):
+                await discover(server, frontier)
+            await frontier.close()
+            return [url async for url, _ in frontier]
+
+    # 1쪽에서 찾은 URL은 그대로 크롤링 대상
+    assert len(asyncio.run(scenario())) == 2
+
+
+def test_failed_listing_region_is_not_tombstoned():
+    module = load_crawler_module()
+
+    async def scenario(broken_page):
+        async with ListServer(pages=3, broken_page=broken_page) as server:
+            known = {f'{server.base}/detail?poly_seq={seq}': ('incheon', 'old-hash') for seq in (10, 11, 20, 21, 30, 31)}
+            crawler = module.WelfareCrawler(
+                fetcher=AsyncFetcher(per_host_rate=1000, per_host_burst=100, retries=0),
+                known_hashes=known, parser='html.parser')
+            source = SourceDefinition(region='인천', list_url=f'{server.base}/list', link_selector='a.item',
+                                      page_param='pgno')
+            try:
+                await crawler.crawl_source(source)
+            finally:
+                await crawler.fetcher.close()
+            return crawler
+
+    complete = asyncio.run(scenario(broken_page=None))
+    assert complete.incomplete_regions == set()
+    assert complete.tombstones() == []
+
+    partial = asyncio.run(scenario(broken_page=2))
+    # 2쪽 이후 정책(20, 21, 30, 31)을 삭제하지 않음
+    assert partial.incomplete_regions == {'incheon'}
+    assert partial.tombstones() == []
@@ -0,0 +1,6 @@
+# crawl_state.py 테스트: 증분 크롤링용 본문 해시
+from crawl_state import content_hash
+
+
+def test_content_hash_ignores_markup_and_scripts():
+    assert content_hash('<p>월세  지원</p><script>token=1</script>') == content_hash('<div>월세 지원</div>')
@@ -0,0 +1,25 @@
+# page_parser.py 테스트: 파싱 벤치마크의 프로세스 수별 측정
+import os
+
+import pytest
+
+import page_parser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+@pytest.mark.parametrize('cores, counts', [(1, [1]), (4, [1, 2, 4]), (6, [1, 2, 4, 6]), (None, [1])])
+def test_default_worker_counts_double_up_to_cores(monkeypatch, cores, counts):
+    monkeypatch.setattr(page_parser.os, 'cpu_count', lambda: cores)
+    assert page_parser.default_worker_counts() == counts
+
+
+def test_scaling_reports_each_worker_count(tmp_path, capsys):
+    with open(os.path.join(FIXTURES, 'nested_sections.html'), encoding='utf-8') as f:
+        html = f.read()
+    for number in range(4):
+        (tmp_path / f'{number:04d}.html').write_text(html, encoding='utf-8')
+
+    rates = page_parser.scaling(str(tmp_path), [1, 2], 'html.parser')
+    assert set(rates) == {1, 2} and all(rate > 0 for rate in rates.values())
+    assert '확장성' in capsys.readouterr().out
@@ -0,0 +1,86 @@
+# section_tree.py 테스트: 문서 순서 outline이 예전 crawling.py의 find_all(['h3','h4','ul']) 순회와 같은지
+import os
+
+from bs4 import BeautifulSoup
+
+from section_tree import build_page_tree
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'nested_sections.html')
+CONTENT_SELECTORS = ['.txt-tp1', '#detail_con .line-box', '.box-gray', '.con-box']
+CONDITION_KEYWORDS = ['지원대상', '사업대상', '신청자격', '지원자격']
+BENEFIT_KEYWORDS = ['사업내용', '지원내용', '혜택']
+
+
+def load():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return BeautifulSoup(f.read(), 'html.parser')
+
+
+def legacy_extract(content_box):
+    """예전 crawling.py: 내용 영역 안 h3/h4/ul을 문서 순서로 훑으며 마지막 제목 아래 ul.ls-st1 모음"""
+    conditions = benefits = ''
+    current_section = None
+    for el in content_box.find_all(['h3', 'h4', 'ul']):
+        if el.name in ['h3', 'h4']:
+            current_section = el.get_text(strip=True)
+        elif el.name == 'ul' and el.get('class') == ['ls-st1'] and current_section:
+            text = el.get_text(separator=' ', strip=True)
+            if any(kw in current_section for kw in CONDITION_KEYWORDS):
+                conditions += text + ' '
+            elif any(kw in current_section for kw in BENEFIT_KEYWORDS):
+                benefits += text + ' '
+    return conditions.strip(), benefits.strip()
+
+
+def outline_extract(tree, content_box):
+    """지금 crawling.py 방식 (tree.outline)"""
+    conditions = benefits = ''
+    for section in tree.outline(content_box, ('h3', 'h4')):
+        for el in section.blocks:
+            if el.get('class') != ['ls-st1']:
+                continue
+            text = el.get_text(separator=' ', strip=True)
+            if any(kw in section.title for kw in CONDITION_KEYWORDS):
+                conditions += text + ' '
+            elif any(kw in section.title for kw in BENEFIT_KEYWORDS):
+                benefits += text + ' '
+    return conditions.strip(), benefits.strip()
+
+
+def test_outline_matches_legacy_walk():
+    soup = load()
+    tree = build_page_tree(soup, CONTENT_SELECTORS)
+    content_box = tree.first(CONTENT_SELECTORS)
+    assert content_box is soup.select_one('.con-box')
+    assert outline_extract(tree, content_box) == legacy_extract(content_box)
+
+
+def test_lists_under_nested_wrappers_are_kept():
+    soup = load()
+    tree = build_page_tree(soup, CONTENT_SELECTORS)
+    conditions, benefits = outline_extract(tree, tree.first(CONTENT_SELECTORS))
+    # h5를 사이에 둔 목록, 다른 wrapper div 안의 목록
+    assert '만 19~39세 무주택 청년' in conditions
+    assert '부모와 따로 사는 청년' in conditions
+    # 제목과 다른 div에 있는 목록, 중첩 목록, 섹션 wrapper 밖으로 이어진 목록
+    assert '월 최대 20만원' in benefits
+    assert benefits.count('최대 12개월') == 2  # 바깥 ul 텍스트 + 안쪽 ul 각각 (예전과 같음)
+    assert '제목 없는 섹션 전 목록은 위 섹션에 이어짐' in benefits
+    assert '다른 모양 목록' not in benefits
+
+
+def test_outline_stays_inside_content_box():
+    soup = load()
+    tree = build_page_tree(soup, CONTENT_SELECTORS)
+    sections = tree.outline(tree.first(CONTENT_SELECTORS), ('h3', 'h4'))
+    assert [section.title for section in sections] == ['지원대상', '지원내용', '문의']
+    texts = ' '.join(block.get_text() for section in sections for block in section.blocks)
+    assert '내용 영역 밖 목록' not in texts
+    assert '내용 영역 뒤 목록' not in texts
+
+
+def test_outline_of_whole_document():
+    soup = load()
+    tree = build_page_tree(soup)
+    titles = [section.title for section in tree.outline(soup, ('h3', 'h4'))]
+    assert titles == ['사이트 안내', '지원대상', '지원내용', '문의', '혜택']
@@ -0,0 +1,105 @@
+#"대량 임포트 속도 측정 도구"
+#하는 일:
+#가짜 정책 데이터를 만들어서 임시 DB에 임포트
+#예전 방식(행마다 SELECT → UPDATE/INSERT, url 인덱스 없음)과
+#지금 방식(url 유니크 인덱스 + ON CONFLICT upsert + executemany 배치)의 초당 처리량 비교
+#언제 사용: create_database.py 임포트 경로를 바꾼 뒤 성능을 확인할 때
+#예: python bulk_import_benchmark.py --rows 1000000 --legacy-rows 10000
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, Iterator
+
+from create_database import create_database
+from welfare_db.policy_store import insert_data_to_db
+
+
+def fake_policies(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """크롤러 출력과 같은 모양의 가짜 정책 (seed가 같으면 url도 같음)"""
+    for i in range(count):
+        yield {
+            'title': f"청년 월세 지원 {i}",
+            'url': f"https://example.go.kr/policy?id={i}",
+            'age_range': [19 + i % 10, 34],
+            'application_period': "2025.01.01 ~ 2025.12.31",
+            'conditions': f"만 19~34세 무주택 청년 (조건 {seed})" * 3,
+            'benefits': f"월 최대 20만원, 최대 12개월 (혜택 {seed})" * 3
+        }
+
+
+def legacy_insert(conn, data, region: str):
+    """예전 insert_data_to_db (행마다 url로 SELECT 후 UPDATE/INSERT, 출력은 제외)"""
+    cursor = conn.cursor()
+    for item in data:
+        age_range_json = json.dumps(item.get('age_range', []), ensure_ascii=False)
+        cursor.execute('SELECT id FROM welfare_policies WHERE url = ?', (item.get('url', ''),))
+        if cursor.fetchone():
+            cursor.execute('''
+                UPDATE welfare_policies
+                SET title = ?, region = ?, age_range = ?, application_period = ?,
+                    conditions = ?, benefits = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE url = ?
+            ''', (item.get('title', ''), region, age_range_json, item.get('application_period', ''),
+                  item.get('conditions', ''), item.get('benefits', ''), item.get('url', '')))
+        else:
+            cursor.execute('''
+                INSERT INTO welfare_policies
+                (title, url, region, age_range, application_period, conditions, benefits)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (item.get('title', ''), item.get('url', ''), region, age_range_json,
+                  item.get('application_period', ''), item.get('conditions', ''), item.get('benefits', '')))
+    conn.commit()
+
+
+def _timed(label: str, count: int, func, *args, **kwargs):
+    started = time.monotonic()
+    func(*args, **kwargs)
+    elapsed = time.monotonic() - started
+    print(f"   {label}: {count:,}개 {elapsed:.1f}초 ({count / elapsed:,.0f}개/초)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대량 임포트 벤치마크")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="지금 방식으로 넣을 행 수")
+    parser.add_argument('--legacy-rows', type=int, default=10_000,
+                        help="예전 방식으로 넣을 행 수 (행 수의 제곱에 비례해 느려지므로 작게)")
+    parser.add_argument('--batch-size', type=int, default=5000, help="executemany 배치 크기")
+    args = parser.parse_args()
+
+    print("⏱️ 대량 임포트 벤치마크\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.legacy_rows:
+            print("1. 예전 방식 (행마다 SELECT, url 인덱스 없음)")
+            conn = sqlite3.connect(os.path.join(tmp, 'legacy.db'))
+            conn.execute('''
+                CREATE TABLE welfare_policies (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, url TEXT, region TEXT,
+                    age_range TEXT, application_period TEXT, conditions TEXT, benefits TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            _timed("새 행", args.legacy_rows, legacy_insert, conn, fake_policies(args.legacy_rows), 'seoul')
+            _timed("같은 url 재임포트", args.legacy_rows, legacy_insert, conn,
+                   fake_policies(args.legacy_rows, seed=1), 'seoul')
+            conn.close()
+
+        print("\n2. 지금 방식 (url 유니크 인덱스 + ON CONFLICT upsert + executemany)")
+        db_path = os.path.join(tmp, 'bulk.db')
+        conn = create_database(db_path)
+        _timed("새 행", args.rows, insert_data_to_db, conn, fake_policies(args.rows), 'seoul',
+               batch_size=args.batch_size)
+        _timed("같은 url 재임포트", args.rows, insert_data_to_db, conn, fake_policies(args.rows, seed=1), 'seoul',
+               batch_size=args.batch_size)
+
+        total = conn.execute('SELECT COUNT(*) FROM welfare_policies').fetchone()[0]
+        conn.close()
+        print(f"\n📊 최종 행 수: {total:,}개, DB 크기: {os.path.getsize(db_path) / 1024 / 1024:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,31 @@
 #"실제 데이터베이스를 만들고 데이터를 넣는 도구"
 #하는 일:
-#새로운 데이터베이스 파일 생성
+#새로운 데이터베이스 파일 생성 (예전 스키마 DB는 welfare_db.migrations로 통합 스키마로 업그레이드)
 #JSON 파일의 데이터를 DB에 저장
-#중복 데이터 체크 및 업데이트
+#중복 데이터 체크 및 업데이트 (url 유니크 인덱스 + ON CONFLICT upsert, executemany 배치)
+#증분 크롤링 결과(바뀐 정책/사라진 정책)만 반영 (--changes)
+#크롤러 JSONL 출력을 청크 단위로 스트리밍 임포트 (--jsonl, 크롤링 중이면 --follow)
+#임포트가 끝나면 API용 열 단위 스냅샷(welfare_policies.snapshot) 다시 쓰기
 #언제 사용: 처음 DB를 만들거나 새로운 데이터를 추가할 때
 
 
 
+import argparse
 import json
 import sqlite3
 import os
+import time
 from datetime import datetime
 from typing import List, Dict, Any
 
+from welfare_db.migrations import migrate
+from welfare_db.policy_snapshot import snapshot_path, write_snapshot
+from welfare_db.policy_store import apply_changes, insert_data_to_db
+
 def create_database(db_path: str = "welfare_policies.db"):
-    """복지정책 데이터베이스 생성"""
+    """복지정책 데이터베이스 생성 (없는 테이블/인덱스는 마이그레이션으로 만들고, 예전 스키마면 업그레이드)"""
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # 복지정책 테이블 생성
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS welfare_policies (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            url TEXT,
-            region TEXT,
-            age_range TEXT,  -- JSON 형태로 저장
-            application_period TEXT,
-            conditions TEXT,
-            benefits TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 인덱스 생성 (검색 성능 향상)
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_region ON welfare_policies(region)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_title ON welfare_policies(title)')
-    
-    conn.commit()
+    migrate(conn)
     return conn
 
 def load_json_data(filename: str) -> List[Dict[str, Any]]:
@@ -50,65 +37,45 @@ def load_json_data(filename: str) -> List[Dict[str, Any]]:
         print(f"❌ {filename} 로드 실패: {e}")
         return []
 
-def insert_data_to_db(conn, data: List[Dict[str, Any]], region: str):
-    """데이터를 DB에 삽입"""
-    cursor = conn.cursor()
-    
-    success_count = 0
-    error_count = 0
-    
-    for item in data:
-        try:
-            # age_range를 JSON 문자열로 변환
-            age_range_json = json.dumps(item.get('age_range', []), ensure_ascii=False)
+def iter_jsonl_chunks(filename: str, chunk_size: int = 500, follow: bool = False):
+    """JSONL 파일을 chunk_size개씩 읽기 (follow면 크롤러가 <파일명>.done을 만들 때까지 따라 읽음)"""
+    if follow and not os.path.exists(filename):
+        # 크롤러가 아직 파일을 만들기 전 (먼저 실행한 경우)
+        print(f"   ⏳ {filename} 생성 대기 중...")
+        while not os.path.exists(filename):
+            if os.path.exists(filename + '.done'):
+                return  # 결과 없이 끝난 크롤링
+            time.sleep(0.5)
+    
+    chunk = []
+    with open(filename, 'r', encoding='utf-8') as f:
+        while True:
+            position = f.tell()
+            line = f.readline()
             
-            # 중복 체크 (URL 기준)
-            cursor.execute('SELECT id FROM welfare_policies WHERE url = ?', (item.get('url', ''),))
-            existing = cursor.fetchone()
+            if line.endswith('\n'):
+                if line.strip():
+                    chunk.append(json.loads(line))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+                continue
             
-            if existing:
-                # 기존 데이터 업데이트
-                cursor.execute('''
-                    UPDATE welfare_policies 
-                    SET title = ?, region = ?, age_range = ?, application_period = ?, 
-                        conditions = ?, benefits = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE url = ?
-                ''', (
-                    item.get('title', ''),
-                    region,
-                    age_range_json,
-                    item.get('application_period', ''),
-                    item.get('conditions', ''),
-                    item.get('benefits', ''),
-                    item.get('url', '')
-                ))
-                print(f"   업데이트: {item.get('title', '제목 없음')}")
-            else:
-                # 새 데이터 삽입
-                cursor.execute('''
-                    INSERT INTO welfare_policies 
-                    (title, url, region, age_range, application_period, conditions, benefits)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    item.get('title', ''),
-                    item.get('url', ''),
-                    region,
-                    age_range_json,
-                    item.get('application_period', ''),
-                    item.get('conditions', ''),
-                    item.get('benefits', '')
-                ))
-                print(f"   삽입: {item.get('title', '제목 없음')}")
+            # 파일 끝 (아직 쓰는 중인 줄이면 다음에 다시 읽음)
+            if follow and not os.path.exists(filename + '.done'):
+                f.seek(position)
+                if chunk:
+                    yield chunk
+                    chunk = []
+                time.sleep(0.5)
+                continue
             
-            success_count += 1
-            
-        except Exception as e:
-            print(f"❌ 데이터 처리 실패: {e}")
-            print(f"   문제 데이터: {item.get('title', '제목 없음')}")
-            error_count += 1
+            if line.strip():
+                chunk.append(json.loads(line))
+            break
     
-    conn.commit()
-    return success_count, error_count
+    if chunk:
+        yield chunk
 
 def display_database_stats(conn):
     """데이터베이스 통계 표시"""
@@ -158,17 +125,16 @@ def test_database_queries(conn):
         print(f"   {title} - {period}")
     
     # 2. 특정 연령대 정책 검색
-    print("\n2. 20대 대상 정책 검색:")
+    print("\n2. 20세 대상 정책 검색:")
     cursor.execute('''
-        SELECT title, region, age_range 
+        SELECT title, region, age_min, age_max 
         FROM welfare_policies 
-        WHERE age_range LIKE '%20%' 
+        WHERE age_min <= 20 AND age_max >= 20 
         LIMIT 3
     ''')
     age_policies = cursor.fetchall()
-    for title, region, age_range in age_policies:
-        age_list = json.loads(age_range) if age_range else []
-        print(f"   {title} ({region}) - 연령: {age_list}")
+    for title, region, age_min, age_max in age_policies:
+        print(f"   {title} ({region}) - 연령: {age_min}~{age_max}세")
     
     # 3. 월세 관련 정책 검색
     print("\n3. 월세 관련 정책 검색:")
@@ -183,8 +149,24 @@ def test_database_queries(conn):
         print(f"   {title} ({region})")
         print(f"     혜택: {benefits[:100]}...")
 
+def save_snapshot(conn, db_path: str):
+    """API가 mmap으로 읽는 정책 스냅샷 다시 쓰기 (실패해도 API는 DB로 조회하므로 경고만)"""
+    path = snapshot_path(db_path)
+    try:
+        count = write_snapshot(conn, path)
+        print(f"📸 스냅샷 저장: {path} ({count}개 정책)")
+    except Exception as e:
+        print(f"⚠️ 스냅샷 저장 실패: {e}")
+
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="복지정책 데이터베이스 생성")
+    parser.add_argument('--changes', '--jsonl', dest='changes',
+                        help="크롤러 출력 파일 (welfare_policies.jsonl / welfare_policies_changes.jsonl, .json도 가능)")
+    parser.add_argument('--follow', action='store_true', help="크롤링이 끝날 때까지 JSONL을 따라 읽으며 임포트")
+    parser.add_argument('--chunk-size', type=int, default=500, help="한 번에 반영할 레코드 수")
+    args = parser.parse_args()
+    
     print("🗄️ 복지정책 데이터베이스 생성 시작\n")
     
     # 데이터베이스 생성
@@ -192,6 +174,26 @@ def main():
     conn = create_database(db_path)
     print(f"✅ 데이터베이스 생성 완료: {db_path}")
     
+    if args.changes:
+        # 크롤러 출력 반영 (JSONL은 청크 단위 스트리밍, 사라진 정책은 tombstone)
+        print(f"\n📁 {args.changes} 반영 중...")
+        if args.changes.endswith('.jsonl'):
+            chunks = iter_jsonl_chunks(args.changes, args.chunk_size, args.follow)
+        else:
+            chunks = [load_json_data(args.changes)]
+        
+        total_success = total_error = total_removed = 0
+        for chunk in chunks:
+            success, error, removed = apply_changes(conn, chunk)
+            total_success += success
+            total_error += error
+            total_removed += removed
+        print(f"   결과: 반영 {total_success}개, 실패 {total_error}개, 삭제 {total_removed}개")
+        display_database_stats(conn)
+        save_snapshot(conn, db_path)
+        conn.close()
+        return
+    
     # JSON 파일들 로드 및 삽입
     regions = ['gyeonggi', 'incheon', 'seoul']
     total_success = 0
@@ -218,6 +220,7 @@ def main():
     # 쿼리 테스트
     test_database_queries(conn)
     
+    save_snapshot(conn, db_path)
     conn.close()
     
     print(f"\n🎉 데이터베이스 생성 완료!")
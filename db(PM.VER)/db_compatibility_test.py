@@ -1,10 +1,22 @@
 #모든 데이터가 DB와 호환되는지 확인하는 코드
 #JSON 파일들의 데이터가 데이터베이스와 호환되는지 검사
+#--stream: 큰 크롤링 결과(JSON/JSONL)를 파일 전체를 올리지 않고 청크 단위로 병렬 검사,
+#          레코드별 오류를 JSONL 보고서로 저장 (오류가 있으면 종료 코드 1 → CI에서 바로 거부)
 #언제 사용: 새로운 데이터를 추가하기 전에 확인할 때
+#예: python db_compatibility_test.py --stream crawling/welfare_policies.jsonl --report errors.jsonl
 
+import argparse
 import json
+import os
 import sqlite3
-from typing import List, Dict, Any
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Tuple
+
+from welfare_db.migrations import migrate
+from welfare_db.policy_schema import CURRENT_COLUMNS, REGION_NAMES, normalize_policy, policy_values
+from welfare_db.policy_store import UPSERT_SQL
 
 def load_json_data(filename: str) -> List[Dict[str, Any]]:
     """JSON 파일 로드"""
@@ -18,24 +30,9 @@ def load_json_data(filename: str) -> List[Dict[str, Any]]:
 def create_test_database():
     """테스트용 DB 생성"""
     conn = sqlite3.connect(':memory:')  # 메모리 DB 사용
-    cursor = conn.cursor()
     
-    # 복지정책 테이블 생성
-    cursor.execute('''
-        CREATE TABLE welfare_policies (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            url TEXT,
-            region TEXT,
-            age_range TEXT,  -- JSON 형태로 저장
-            application_period TEXT,
-            conditions TEXT,
-            benefits TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    conn.commit()
+    # 실제 DB와 같은 통합 스키마 (마이그레이션으로 생성)
+    migrate(conn, verbose=False)
     return conn
 
 def insert_data_to_db(conn, data: List[Dict[str, Any]], region: str):
@@ -47,22 +44,9 @@ def insert_data_to_db(conn, data: List[Dict[str, Any]], region: str):
     
     for item in data:
         try:
-            # age_range를 JSON 문자열로 변환
-            age_range_json = json.dumps(item.get('age_range', []), ensure_ascii=False)
-            
-            cursor.execute('''
-                INSERT INTO welfare_policies 
-                (title, url, region, age_range, application_period, conditions, benefits)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                item.get('title', ''),
-                item.get('url', ''),
-                region,
-                age_range_json,
-                item.get('application_period', ''),
-                item.get('conditions', ''),
-                item.get('benefits', '')
-            ))
+            # 실제 임포트와 같은 정규화(나이 하한/상한, 지역 코드, 신청기간 날짜)와 url 기준 upsert
+            row = normalize_policy(item, region)
+            cursor.execute(UPSERT_SQL, policy_values(row, CURRENT_COLUMNS))
             success_count += 1
             
         except Exception as e:
@@ -91,19 +75,18 @@ def test_data_retrieval(conn):
     
     # 샘플 데이터 조회
     cursor.execute('''
-        SELECT title, region, age_range, application_period 
+        SELECT title, region, age_min, age_max, application_period, apply_start, apply_end 
         FROM welfare_policies 
         LIMIT 3
     ''')
     samples = cursor.fetchall()
     print("\n📋 샘플 데이터:")
     for sample in samples:
-        title, region, age_range, period = sample
-        age_list = json.loads(age_range) if age_range else []
+        title, region, age_min, age_max, period, apply_start, apply_end = sample
         print(f"   제목: {title}")
         print(f"   지역: {region}")
-        print(f"   연령: {age_list}")
-        print(f"   기간: {period}")
+        print(f"   연령: {age_min}~{age_max}")
+        print(f"   기간: {period} ({apply_start} ~ {apply_end})")
         print()
 
 def validate_data_structure(data: List[Dict[str, Any]], region: str) -> Dict[str, Any]:
@@ -144,8 +127,181 @@ def validate_data_structure(data: List[Dict[str, Any]], region: str) -> Dict[str
     
     return validation_result
 
+REQUIRED_FIELDS = ['title', 'url', 'region', 'age_range', 'application_period', 'conditions', 'benefits']
+
+def iter_records(filename: str, buffer_size: int = 1 << 16) -> Iterator[Tuple[int, Any]]:
+    """JSONL(한 줄씩) / JSON 배열(조금씩 읽으며 항목 단위로 디코드) → (레코드 번호, 레코드)
+    디코드할 수 없는 레코드는 (번호, JSONDecodeError)로 넘겨서 보고서에 기록"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        if filename.endswith('.jsonl'):
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield number, e
+            return
+        
+        decoder = json.JSONDecoder()
+        buffer = f.read(buffer_size).lstrip()
+        if not buffer.startswith('['):
+            yield 1, json.JSONDecodeError("JSON 배열이 아님", buffer[:20], 0)
+            return
+        buffer = buffer[1:]
+        number = 0
+        eof = False
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if eof:
+                    yield number + 1, e
+                    return
+                # 레코드가 버퍼 경계에 걸림 → 더 읽고 다시 시도
+                more = f.read(buffer_size)
+                eof = not more
+                buffer += more
+                continue
+            number += 1
+            yield number, record
+            buffer = buffer[end:]
+
+def check_record(item: Any, region: str) -> List[str]:
+    """레코드 하나의 필드 규칙 검사 (문제 목록, 없으면 빈 리스트)"""
+    if not isinstance(item, dict):
+        return [f"레코드가 객체가 아님 ({type(item).__name__})"]
+    
+    errors = [f"{field} 필드 누락" for field in REQUIRED_FIELDS if field not in item]
+    if 'age_range' in item and not isinstance(item['age_range'], list):
+        errors.append("age_range가 리스트가 아님")
+    elif any(not isinstance(age, int) or not 0 <= age <= 120 for age in item.get('age_range') or []):
+        errors.append("age_range에 0~120 정수가 아닌 값이 있음")
+    if 'region' in item and not isinstance(item['region'], (str, list)):
+        errors.append("region 타입 오류")
+    for field in ('title', 'url', 'application_period', 'conditions', 'benefits'):
+        if field in item and item[field] is not None and not isinstance(item[field], str):
+            errors.append(f"{field}가 문자열이 아님")
+    if errors:
+        return errors
+    
+    row = normalize_policy(item, region)
+    if not row['title']:
+        errors.append("제목이 비어 있음")
+    if not row['url'] or not row['url'].startswith(('http://', 'https://')):
+        errors.append("url이 http(s) 주소가 아님")
+    if row['region'] not in REGION_NAMES:
+        errors.append(f"알 수 없는 지역: {row['region']}")
+    if row['application_period'] and row['apply_start'] is None and any(c.isdigit() for c in row['application_period']):
+        errors.append(f"신청기간 날짜를 읽을 수 없음: {row['application_period'][:40]}")
+    return errors
+
+_worker_conn = None
+
+def _check_chunk(args) -> Tuple[int, List[Dict[str, Any]]]:
+    """워커 프로세스: 청크의 필드 규칙 검사 + 실제 스키마(메모리 DB)에 upsert 시도 후 롤백"""
+    global _worker_conn
+    if _worker_conn is None:
+        _worker_conn = create_test_database()
+    
+    filename, region, records = args
+    problems = []
+    cursor = _worker_conn.cursor()
+    cursor.execute('BEGIN')
+    for number, item in records:
+        if isinstance(item, json.JSONDecodeError):
+            errors = [f"JSON 파싱 실패: {item.msg} (위치 {item.pos})"]
+        else:
+            try:
+                errors = check_record(item, region)
+                if not errors:
+                    cursor.execute(UPSERT_SQL, policy_values(normalize_policy(item, region), CURRENT_COLUMNS))
+            except Exception as e:
+                errors = [f"DB 삽입 실패: {e}"]
+        if errors:
+            title = item.get('title') if isinstance(item, dict) else None
+            problems.append({'file': filename, 'record': number, 'title': title, 'errors': errors})
+    _worker_conn.rollback()  # 검사만 하므로 메모리 DB는 매번 비워 둠
+    return len(records), problems
+
+def _region_for(filename: str) -> Any:
+    """crawling/seoul.json처럼 파일 이름이 지역이면 그 지역, 아니면 레코드의 region 사용"""
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return name if name in REGION_NAMES else None
+
+def _iter_chunks(filenames: List[str], chunk_size: int):
+    for filename in filenames:
+        region = _region_for(filename)
+        chunk = []
+        for number, item in iter_records(filename):
+            chunk.append((number, item))
+            if len(chunk) >= chunk_size:
+                yield filename, region, chunk
+                chunk = []
+        if chunk:
+            yield filename, region, chunk
+
+def stream_validate(filenames: List[str], report_path: str, workers: int = None,
+                    chunk_size: int = 1000) -> Dict[str, int]:
+    """파일들을 청크 단위로 병렬 검사하고 레코드별 오류를 JSONL로 저장
+    (진행 중인 청크는 워커 수의 2배까지만 두어 메모리 일정)"""
+    workers = workers or os.cpu_count() or 1
+    summary = {'records': 0, 'invalid': 0}
+    
+    with open(report_path, 'w', encoding='utf-8') as report, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        
+        def drain(limit):
+            while len(pending) > limit:
+                checked, problems = pending.pop(0).result()
+                summary['records'] += checked
+                summary['invalid'] += len(problems)
+                for problem in problems:
+                    report.write(json.dumps(problem, ensure_ascii=False) + '\n')
+        
+        for chunk in _iter_chunks(filenames, chunk_size):
+            pending.append(pool.submit(_check_chunk, chunk))
+            drain(workers * 2)
+        drain(0)
+    
+    return summary
+
+def run_stream_mode(args):
+    """--stream: 병렬 스트리밍 검사 후 요약 출력, 오류가 있으면 종료 코드 1"""
+    filenames = args.files or [f"crawling/{region}.json" for region in ('gyeonggi', 'incheon', 'seoul')]
+    missing = [filename for filename in filenames if not os.path.exists(filename)]
+    if missing:
+        print(f"❌ 파일이 없습니다: {', '.join(missing)}")
+        return 2
+    
+    print(f"🔍 스트리밍 검사 시작: {len(filenames)}개 파일")
+    started = time.monotonic()
+    summary = stream_validate(filenames, args.report, args.workers, args.chunk_size)
+    elapsed = time.monotonic() - started
+    
+    print(f"📊 {summary['records']}개 레코드 검사, 문제 {summary['invalid']}개 ({elapsed:.1f}초)")
+    if summary['invalid']:
+        print(f"⚠️ 레코드별 오류: {args.report}")
+        return 1
+    print("🎉 모든 데이터가 DB와 호환됩니다!")
+    return 0
+
 def main():
     """메인 테스트 함수"""
+    parser = argparse.ArgumentParser(description="크롤링 데이터 DB 호환성 검사")
+    parser.add_argument('files', nargs='*', help="검사할 JSON/JSONL 파일 (기본: crawling/<지역>.json)")
+    parser.add_argument('--stream', action='store_true', help="스트리밍 병렬 검사 (레코드별 오류 보고서 저장)")
+    parser.add_argument('--report', default='compatibility_errors.jsonl', help="--stream 오류 보고서 경로")
+    parser.add_argument('--workers', type=int, default=None, help="검사 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="워커에 한 번에 넘길 레코드 수")
+    args = parser.parse_args()
+    
+    if args.stream:
+        sys.exit(run_stream_mode(args))
+    
     print("🔍 DB 호환성 테스트 시작\n")
     
     # JSON 파일들 로드
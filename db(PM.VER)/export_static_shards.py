@@ -0,0 +1,235 @@
+#"CDN용 정적 JSON 샤드 내보내기 도구"
+#하는 일:
+#DB 정책을 미리 나눈 정적 JSON 파일로 저장 (프론트엔드와 같이 Netlify/Vercel에 올리면 API 호출 없이 조회)
+#  App.js는 manifest.json에서 지역 샤드를 찾아 먼저 읽고, 없거나 실패하면 API로 조회
+#  region/<지역>.json                 /api/policies/region/<지역> 응답과 같은 필드
+#  region/<지역>/age-<하한>-<상한>.json  지역 + 나이대 (나이 정보 없는 정책은 제외, API 나이 검색과 같은 규칙)
+#  category/<카테고리>.json            카테고리별 정책
+#  manifest.json                      샤드 목록 + 정책 수 + 내용 해시(sha256, 캐시 무효화용)
+#샤드는 정책을 읽으면서 임시 파일에 바로 이어 씀 (지역 샤드는 지역이 바뀔 때 마무리, 메모리는 열린 파일만큼)
+#증분 내보내기: 내용 해시가 이전 manifest와 같은 샤드는 교체하지 않고, 없어진 샤드는 삭제
+#언제 사용: 임포트 후 배포 전에
+#예: python export_static_shards.py welfare_policies.db --out ../front/yu_hackathon/chatbot-ui/public/policies
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from welfare_db.policy_schema import age_overlaps, age_range_list
+
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 2  # 2: count를 policies 뒤에 씀 (샤드를 흘려 쓰기 위해)
+
+# 나이대 샤드 구간 (챗봇 나이 선택지 20~29세가 한 샤드에 들어가도록 10년 단위)
+AGE_BUCKETS = [(0, 19), (20, 29), (30, 39), (40, 100)]
+
+_SAFE_NAME = re.compile(r'[a-z0-9_-]+')
+
+
+def _encode(value) -> str:
+    """샤드 JSON 직렬화 (같은 데이터면 항상 같은 바이트 → 해시 비교 가능)"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _file_name(code: str) -> str:
+    """지역/카테고리 코드 → 파일 이름 (URL에 그대로 쓸 수 없는 코드는 해시 이름, 실제 경로는 manifest에)"""
+    if _SAFE_NAME.fullmatch(code):
+        return code
+    return 'x-' + hashlib.blake2b(code.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def load_policies(conn):
+    """(지역, 제목) 순서로 정책 행 읽기 → (정책 dict의 JSON 조각, 지역, 나이 하한, 상한, 카테고리)
+    정책마다 JSON을 한 번만 만들고 여러 샤드가 같은 조각을 이어 붙임"""
+    conn.row_factory = sqlite3.Row
+    cursor = conn.execute('''
+        SELECT p.id, p.title, p.url, p.region, p.age_min, p.age_max, p.application_period,
+               p.apply_start, p.apply_end, p.apply_status, p.conditions, p.benefits,
+               (SELECT GROUP_CONCAT(c.category) FROM policy_categories c WHERE c.policy_id = p.id) AS categories
+        FROM welfare_policies p
+        ORDER BY p.region, p.title
+    ''')
+    for row in cursor:
+        policy = dict(row)
+        policy['age_range'] = age_range_list(policy['age_min'], policy['age_max'])
+        policy['categories'] = policy['categories'].split(',') if policy['categories'] else []
+        yield _encode(policy), policy['region'], policy['age_min'], policy['age_max'], policy['categories']
+
+
+class ShardFile:
+    """샤드 하나를 임시 파일에 흘려 쓰기 (내용 해시/크기/정책 수를 같이 계산)"""
+
+    def __init__(self, out_dir: str, path: str, info: Dict[str, Any], header: Dict[str, Any]):
+        self.path = path
+        self.info = info
+        self.target = os.path.join(out_dir, path)
+        os.makedirs(os.path.dirname(self.target), exist_ok=True)
+        fd, self.temp = tempfile.mkstemp(dir=os.path.dirname(self.target), suffix='.tmp')
+        self.file = os.fdopen(fd, 'wb')
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+        self.count = 0
+        self._write(_encode(header)[:-1] + ',"policies":[')
+
+    def _write(self, text: str):
+        data = text.encode('utf-8')
+        self.file.write(data)
+        self.sha256.update(data)
+        self.bytes += len(data)
+
+    def add(self, fragment: str):
+        self._write(fragment if not self.count else ',' + fragment)
+        self.count += 1
+
+    def finish(self, previous: Dict[str, Any]) -> bool:
+        """마무리 후 이전 내용과 다르면 교체 (바뀌었으면 True)"""
+        self._write(f'],"count":{self.count}}}')
+        self.file.close()
+        if previous.get('sha256') == self.sha256.hexdigest() and os.path.exists(self.target):
+            os.remove(self.temp)
+            return False
+        os.replace(self.temp, self.target)
+        return True
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.temp):
+            os.remove(self.temp)
+
+    def entry(self) -> Dict[str, Any]:
+        return dict(self.info, count=self.count, bytes=self.bytes, sha256=self.sha256.hexdigest())
+
+
+def load_manifest(out_dir: str) -> Dict[str, Any]:
+    """이전 manifest (없거나 깨졌으면 빈 manifest → 전체 다시 쓰기)"""
+    try:
+        with open(os.path.join(out_dir, MANIFEST), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'shards': {}}
+
+
+def _write_file(path: str, data: bytes):
+    """임시 파일에 쓴 뒤 교체 (업로드 중간에 반쯤 쓴 파일이 보이지 않게)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        os.remove(tmp)
+        raise
+
+
+def export_shards(conn, out_dir: str) -> Dict[str, int]:
+    """정적 샤드 증분 내보내기 → {'written', 'unchanged', 'removed'} 개수"""
+    old_manifest = load_manifest(out_dir)
+    old_shards = old_manifest.get('shards', {})
+    stats = {'written': 0, 'unchanged': 0, 'removed': 0}
+
+    entries = {}
+    open_shards: Dict[str, ShardFile] = {}
+    policy_count = 0
+
+    def shard(path, info, header):
+        if path not in open_shards:
+            open_shards[path] = ShardFile(out_dir, path, info, header)
+        return open_shards[path]
+
+    def finish(paths):
+        for path in paths:
+            current = open_shards.pop(path)
+            changed = current.finish(old_shards.get(path, {}))
+            stats['written' if changed else 'unchanged'] += 1
+            entries[path] = current.entry()
+
+    try:
+        current_region = None
+        for fragment, region, age_min, age_max, categories in load_policies(conn):
+            if region != current_region:
+                # 정책이 지역순이라 지역이 바뀌면 이전 지역의 샤드는 다 쓴 것
+                finish([path for path in open_shards if path.startswith('region/')])
+                current_region = region
+            region_name = _file_name(region)
+            shard(f'region/{region_name}.json', {'kind': 'region', 'region': region},
+                  {'success': True, 'region': region}).add(fragment)
+            policy_count += 1
+            for low, high in AGE_BUCKETS:
+                if age_overlaps(age_min, age_max, low, high):
+                    shard(f'region/{region_name}/age-{low}-{high}.json',
+                          {'kind': 'region_age', 'region': region, 'age_min': low, 'age_max': high},
+                          {'success': True, 'region': region, 'age_min': low, 'age_max': high}).add(fragment)
+            for category in categories:
+                shard(f'category/{_file_name(category)}.json', {'kind': 'category', 'category': category},
+                      {'success': True, 'category': category}).add(fragment)
+        finish(sorted(open_shards))
+    finally:
+        for unfinished in open_shards.values():
+            unfinished.discard()
+    entries = dict(sorted(entries.items()))
+
+    # 이전 manifest에만 있는 샤드 삭제 (manifest에 없는 파일은 건드리지 않음)
+    for path in old_shards:
+        if path not in entries:
+            try:
+                os.remove(os.path.join(out_dir, path))
+                stats['removed'] += 1
+            except FileNotFoundError:
+                pass
+            try:
+                os.rmdir(os.path.dirname(os.path.join(out_dir, path)))  # 사라진 지역의 나이대 폴더
+            except OSError:
+                pass  # 다른 샤드가 남아 있는 폴더
+
+    # 샤드가 하나도 안 바뀌었으면 manifest도 그대로 (CDN 캐시 유지)
+    if stats['written'] or stats['removed'] or old_shards != entries:
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'policy_count': policy_count,
+            'age_buckets': [[low, high] for low, high in AGE_BUCKETS],
+            'shards': entries,
+        }
+        _write_file(os.path.join(out_dir, MANIFEST), json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CDN용 정적 JSON 샤드 내보내기")
+    parser.add_argument('db', nargs='?', default='welfare_policies.db', help="정책 DB 경로")
+    parser.add_argument('--out', default='static_policies',
+                        help="출력 폴더 (프론트엔드 public/ 아래로 지정하면 빌드에 같이 포함됨)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ DB 파일이 없습니다: {args.db}")
+        sys.exit(1)
+
+    print(f"📦 정적 샤드 내보내기: {args.db} → {args.out}")
+    started = time.monotonic()
+    conn = sqlite3.connect(args.db)
+    try:
+        stats = export_shards(conn, args.out)
+    except Exception as e:
+        print(f"❌ 내보내기 실패: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+    print(f"✅ 새로 씀 {stats['written']}개, 그대로 {stats['unchanged']}개, 삭제 {stats['removed']}개 "
+          f"({time.monotonic() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 #지역별 정책 검색 (경기, 인천, 서울)
 #키워드로 정책 찾기 (예: "월세", "청년")
 #연령대별 정책 검색
+#카테고리별 정책 검색 (주거, 일자리, 금융 ...)
 #데이터베이스 통계 보기
 #언제 사용: 저장된 정책 정보를 찾거나 확인할 때
 
@@ -12,18 +13,27 @@
 
 
 import sqlite3
-import json
 from typing import List, Dict, Any
 
+from welfare_db.migrations import migrate
+from welfare_db.policy_schema import CATEGORY_LABELS
+
 def connect_database(db_path: str = "welfare_policies.db"):
     """데이터베이스 연결"""
     try:
         conn = sqlite3.connect(db_path)
+        migrate(conn, verbose=False)  # 예전 스키마 DB면 통합 스키마로 업그레이드
         return conn
     except Exception as e:
         print(f"❌ 데이터베이스 연결 실패: {e}")
         return None
 
+def format_age(age_min, age_max) -> str:
+    """나이 하한/상한 표시 (NULL은 제한 없음)"""
+    if age_min is None and age_max is None:
+        return "제한 없음"
+    return f"{age_min if age_min is not None else ''}~{age_max if age_max is not None else ''}세"
+
 def get_database_info(conn):
     """데이터베이스 기본 정보 조회"""
     cursor = conn.cursor()
@@ -52,7 +62,7 @@ def search_policies_by_region(conn, region: str):
     cursor = conn.cursor()
     
     cursor.execute('''
-        SELECT title, application_period, age_range 
+        SELECT title, application_period, age_min, age_max 
         FROM welfare_policies 
         WHERE region = ? 
         ORDER BY title
@@ -60,11 +70,10 @@ def search_policies_by_region(conn, region: str):
     
     policies = cursor.fetchall()
     print(f"\n🔍 {region} 지역 정책 ({len(policies)}개):")
-    for i, (title, period, age_range) in enumerate(policies, 1):
-        age_list = json.loads(age_range) if age_range else []
+    for i, (title, period, age_min, age_max) in enumerate(policies, 1):
         print(f"   {i}. {title}")
         print(f"      기간: {period}")
-        print(f"      연령: {age_list}")
+        print(f"      연령: {format_age(age_min, age_max)}")
         print()
 
 def search_policies_by_keyword(conn, keyword: str):
@@ -90,22 +99,39 @@ def search_policies_by_age(conn, age: int):
     """특정 연령대 정책 검색"""
     cursor = conn.cursor()
     
+    # 나이 정보가 없는(NULL) 정책은 제외 (API 나이 검색/정적 샤드와 같은 규칙, policy_schema.age_overlaps)
     cursor.execute('''
-        SELECT title, region, age_range, application_period 
+        SELECT title, region, age_min, age_max, application_period 
         FROM welfare_policies 
-        WHERE age_range LIKE ?
+        WHERE age_min <= ? AND age_max >= ?
         ORDER BY region, title
-    ''', (f'%{age}%',))
+    ''', (age, age))
     
     policies = cursor.fetchall()
     print(f"\n🔍 {age}세 대상 정책 ({len(policies)}개):")
-    for i, (title, region, age_range, period) in enumerate(policies, 1):
-        age_list = json.loads(age_range) if age_range else []
+    for i, (title, region, age_min, age_max, period) in enumerate(policies, 1):
         print(f"   {i}. {title} ({region})")
-        print(f"      연령: {age_list}")
+        print(f"      연령: {format_age(age_min, age_max)}")
         print(f"      기간: {period}")
         print()
 
+def search_policies_by_category(conn, category: str):
+    """카테고리 태그로 정책 검색 (housing, employment, finance, ...)"""
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT p.title, p.region, p.application_period 
+        FROM policy_categories c 
+        JOIN welfare_policies p ON p.id = c.policy_id 
+        WHERE c.category = ? 
+        ORDER BY p.region, p.title
+    ''', (category,))
+    
+    policies = cursor.fetchall()
+    print(f"\n🔍 {CATEGORY_LABELS.get(category, category)} 정책 ({len(policies)}개):")
+    for i, (title, region, period) in enumerate(policies, 1):
+        print(f"   {i}. {title} ({region}) - {period}")
+
 def get_recent_policies(conn, limit: int = 10):
     """최근 추가된 정책 조회"""
     cursor = conn.cursor()
@@ -127,7 +153,7 @@ def export_sample_data(conn, limit: int = 5):
     cursor = conn.cursor()
     
     cursor.execute('''
-        SELECT title, region, age_range, application_period, conditions, benefits 
+        SELECT title, region, age_min, age_max, application_period, conditions, benefits 
         FROM welfare_policies 
         ORDER BY RANDOM() 
         LIMIT ?
@@ -135,11 +161,10 @@ def export_sample_data(conn, limit: int = 5):
     
     policies = cursor.fetchall()
     print(f"\n📋 샘플 데이터 ({len(policies)}개):")
-    for i, (title, region, age_range, period, conditions, benefits) in enumerate(policies, 1):
-        age_list = json.loads(age_range) if age_range else []
+    for i, (title, region, age_min, age_max, period, conditions, benefits) in enumerate(policies, 1):
         print(f"\n   {i}. {title}")
         print(f"      지역: {region}")
-        print(f"      연령: {age_list}")
+        print(f"      연령: {format_age(age_min, age_max)}")
         print(f"      기간: {period}")
         print(f"      조건: {conditions[:100]}...")
         print(f"      혜택: {benefits[:100]}...")
@@ -169,6 +194,9 @@ def main():
         # 연령대 검색
         search_policies_by_age(conn, 20)
         
+        # 카테고리 검색
+        search_policies_by_category(conn, "housing")
+        
         # 최근 정책
         get_recent_policies(conn, 5)
         
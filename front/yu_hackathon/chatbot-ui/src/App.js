@@ -83,6 +83,45 @@ function PoliciesSummary({ count, onToggle, isOpen }) {
   );
 }
 
+// 정적 정책 샤드 (db(PM.VER)/export_static_shards.py --out public/policies 로 만든 파일, CDN에서 바로 받음)
+const STATIC_POLICIES_URL = `${process.env.PUBLIC_URL || ""}/policies`;
+let manifestPromise = null;
+
+// manifest.json은 한 번 받아 두고 재사용 (실패하면 다음 호출 때 다시 시도)
+function loadManifest() {
+  if (!manifestPromise) {
+    manifestPromise = fetch(`${STATIC_POLICIES_URL}/manifest.json`, { cache: "no-cache" })
+      .then((res) => {
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json();
+      })
+      .catch((err) => {
+        manifestPromise = null;
+        throw err;
+      });
+  }
+  return manifestPromise;
+}
+
+// 지역 샤드 → /api/policies/region/<지역> 응답과 같은 필드 (샤드가 없거나 못 받으면 null → API로 조회)
+async function fetchRegionShard(dbRegion) {
+  try {
+    const manifest = await loadManifest();
+    const path = Object.keys(manifest.shards || {}).find((shardPath) => {
+      const info = manifest.shards[shardPath];
+      return info.kind === "region" && info.region === dbRegion;
+    });
+    if (!path) return null;
+    // 내용 해시를 쿼리로 붙여서 샤드가 바뀌었을 때만 새로 받음
+    const version = manifest.shards[path].sha256.slice(0, 12);
+    const res = await fetch(`${STATIC_POLICIES_URL}/${path}?v=${version}`);
+    return res.ok ? await res.json() : null;
+  } catch (err) {
+    console.warn("정적 샤드를 쓸 수 없어 API로 조회합니다:", err);
+    return null;
+  }
+}
+
 function App() {
   const regionMap = { 서울: "seoul", 경기: "gyeonggi", 인천: "incheon" };
 
@@ -104,6 +143,8 @@ function App() {
 
   const [policies, setPolicies] = useState([]);
   const [filteredPolicies, setFilteredPolicies] = useState([]);
+  // 서버 대화 세션 (지역으로 찾은 후보를 서버가 들고 있다가 나이 선택 시 그 안에서만 좁힘)
+  const [sessionId, setSessionId] = useState("");
 
   const [showDetails, setShowDetails] = useState(false);
   const [ageDropdownExpanded, setAgeDropdownExpanded] = useState(false);
@@ -209,95 +250,68 @@ function App() {
     }
   };
 
-  // Watsonx.ai API 호출 함수
-  const sendMessageToAI = async (userMessage) => {
-    // 임시로 간단한 AI 응답 사용 (Watsonx.ai API 문제 해결 전까지)
-    console.log("임시 AI 응답 사용 중...");
-    return getSimpleAIResponse(userMessage);
-    
-    /* Watsonx.ai API 코드 (현재 비활성화)
-    const IBM_API_KEY = "kYt1RUcGM7Z2ABr5562ECaO8I5wSQ3UPU6pAYHiWy3C7";
-    
-    try {
-      console.log("1. API 토큰 요청 시작...");
-      
-      // Access Token 요청
-      const tokenResponse = await fetch("https://iam.cloud.ibm.com/identity/token", {
-        method: "POST",
-        headers: { "Content-Type": "application/x-www-form-urlencoded" },
-        body: `grant_type=urn:ibm:params:oauth:grant-type:apikey&apikey=${IBM_API_KEY}`
-      });
-      
-      console.log("2. 토큰 응답 상태:", tokenResponse.status);
-      
-      if (!tokenResponse.ok) {
-        const errorText = await tokenResponse.text();
-        console.error("토큰 요청 실패:", errorText);
-        return getSimpleAIResponse(userMessage);
-      }
-      
-      const tokenData = await tokenResponse.json();
-      console.log("3. 토큰 데이터:", tokenData);
-      
-      if (!tokenData.access_token) {
-        console.error("액세스 토큰이 없습니다:", tokenData);
-        return getSimpleAIResponse(userMessage);
-      }
-      
-      const accessToken = tokenData.access_token;
-      console.log("4. 액세스 토큰 획득 성공");
+  // /api/chat/stream(SSE)을 읽으면서 생성되는 텍스트를 onText로 바로 넘김 → 최종 텍스트 (생성 실패면 null)
+  const streamChat = async (userMessage, onText) => {
+    const API_BASE_URL = process.env.REACT_APP_API_URL || 'https://web-production-a9d2.up.railway.app';
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ message: userMessage })
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP ${response.status}`);
+    }
 
-      // Watsonx.ai 모델 호출
-      console.log("5. Watsonx.ai API 호출 시작...");
-      
-      const requestBody = {
-        input: `사용자 질문: "${userMessage}"\n\n위 질문을 분석해서 다음 중 어떤 정보가 필요한지 파악하고, 간단하고 친근한 톤으로 응답해주세요:\n1. 지역 정보 (서울, 경기, 인천)\n2. 나이 정보\n3. 관심 있는 지원금/정책 키워드\n\n만약 모든 정보가 있다면 "정보를 찾아드릴게요!"라고 응답하고, 부족한 정보가 있다면 무엇이 더 필요한지 물어보세요.`,
-        parameters: {
-          decoding_method: "sample",
-          max_new_tokens: 200,
-          temperature: 0.7,
-          top_p: 1,
-          top_k: 50,
-          repetition_penalty: 1
-        }
-      };
-      
-      console.log("6. 요청 본문:", requestBody);
-      
-      const response = await fetch(
-        "https://us-south.ml.cloud.ibm.com/ml/v4/deployments/14d914db-7824-400e-a29c-0fb60b26a8c1/text/generation?version=2021-05-01",
-        {
-          method: "POST",
-          headers: {
-            "Authorization": "Bearer " + accessToken,
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-          },
-          body: JSON.stringify(requestBody)
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let text = "";
+    let failed = false;
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      // SSE 이벤트는 빈 줄로 구분 ("event: 이름" + "data: JSON")
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let event = "message";
+        const dataLines = [];
+        block.split("\n").forEach((line) => {
+          if (line.startsWith("event:")) event = line.slice(6).trim();
+          else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim());
+        });
+        if (dataLines.length === 0) continue; // ": connected" 같은 주석 줄
+        const payload = JSON.parse(dataLines.join("\n"));
+        if (event === "token") {
+          text += payload.text;
+          onText(text);
+        } else if (event === "error" && payload.stage === "llm") {
+          failed = true;
         }
-      );
+      }
+    }
+    return failed && !text ? null : text;
+  };
 
-      console.log("7. Watsonx.ai 응답 상태:", response.status);
-      
-      if (!response.ok) {
-        const errorText = await response.text();
-        console.error("Watsonx.ai API 호출 실패:", response.status, errorText);
-        return getSimpleAIResponse(userMessage);
+  // Watsonx.ai 응답 (백엔드 /api/chat/stream이 토큰/키를 관리, 실패하면 간단한 응답 사용)
+  const sendMessageToAI = async (userMessage, onText = () => {}) => {
+    const simpleResult = getSimpleAIResponse(userMessage);
+    
+    try {
+      const text = await streamChat(userMessage, onText);
+      if (!text) {
+        console.log("AI 응답 사용 불가, 간단한 응답 사용");
+        return simpleResult;
       }
       
-      const data = await response.json();
-      console.log("8. Watsonx.ai 응답 데이터:", data);
-      
-      const result = data.results?.[0]?.generated_text || getSimpleAIResponse(userMessage);
-      console.log("9. 최종 결과:", result);
-      
-      return result;
+      // 정책 검색 여부/지역은 간단한 응답 분석 결과를 그대로 사용
+      return { ...simpleResult, response: text };
     } catch (error) {
       console.error("AI API 호출 중 예외 발생:", error);
-      console.error("에러 스택:", error.stack);
-      return getSimpleAIResponse(userMessage);
+      return simpleResult;
     }
-    */
   };
 
   const handleSendMessage = async () => {
@@ -320,8 +334,20 @@ function App() {
         { type: "bot", text: "생각 중...", time: formattedTime(new Date()) },
       ]);
 
+      // 생성되는 대로 "생각 중..." 메시지 자리에 이어서 보여 줌
+      const showPartial = (text) => {
+        setMessages((prev) => {
+          const newMessages = [...prev];
+          newMessages[newMessages.length - 1] = {
+            ...newMessages[newMessages.length - 1],
+            text
+          };
+          return newMessages;
+        });
+      };
+
       try {
-        const aiResult = await sendMessageToAI(userInput);
+        const aiResult = await sendMessageToAI(userInput, showPartial);
         
         // "생각 중..." 메시지를 AI 응답으로 교체
         setMessages((prev) => {
@@ -374,23 +400,26 @@ function App() {
         }
       ]);
 
-      // 먼저 지역별 정책을 가져오기
-      const API_BASE_URL = process.env.REACT_APP_API_URL || 'https://web-production-a9d2.up.railway.app';
-  const apiUrl = `${API_BASE_URL}/api/policies/region/${dbRegion}`;
-      console.log("API 호출 URL:", apiUrl);
-      
-      const response = await fetch(apiUrl);
-      
-      console.log("API 응답 상태:", response.status);
-      console.log("API 응답 헤더:", response.headers);
-      
-      if (!response.ok) {
-        const errorText = await response.text();
-        console.error("API 오류 응답:", errorText);
-        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      // 먼저 지역별 정책을 가져오기 (정적 샤드가 있으면 CDN에서, 없으면 API)
+      let data = await fetchRegionShard(dbRegion);
+      if (!data) {
+        const API_BASE_URL = process.env.REACT_APP_API_URL || 'https://web-production-a9d2.up.railway.app';
+        const apiUrl = `${API_BASE_URL}/api/policies/region/${dbRegion}`;
+        console.log("API 호출 URL:", apiUrl);
+        
+        const response = await fetch(apiUrl);
+        
+        console.log("API 응답 상태:", response.status);
+        console.log("API 응답 헤더:", response.headers);
+        
+        if (!response.ok) {
+          const errorText = await response.text();
+          console.error("API 오류 응답:", errorText);
+          throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        
+        data = await response.json();
       }
-      
-      const data = await response.json();
       console.log("정책 검색 결과:", data);
       console.log("검색된 정책 수:", data.policies ? data.policies.length : 0);
       
@@ -542,17 +571,30 @@ function App() {
 
     const dbRegion = regionMap[region];
     const API_BASE_URL = process.env.REACT_APP_API_URL || 'https://web-production-a9d2.up.railway.app';
-            fetch(`${API_BASE_URL}/api/policies/region/${dbRegion}`)
+    fetch(`${API_BASE_URL}/api/chat/session`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ region: dbRegion })
+    })
       .then((res) => res.json())
       .then((data) => {
         if (data.success && Array.isArray(data.policies)) {
+          setSessionId(data.session_id);
           setPolicies(data.policies);
           setFilteredPolicies([]);
           setSelectedAge("");
           setShowDetails(false);
         }
       })
-      .catch((err) => console.error("API 호출 실패:", err));
+      .catch((err) => {
+        console.error("API 호출 실패:", err);
+        // 세션을 못 만들면 정적 지역 샤드를 받아 두고 나이는 브라우저에서 거름
+        fetchRegionShard(dbRegion).then((shard) => {
+          if (shard && Array.isArray(shard.policies)) {
+            setPolicies(shard.policies);
+          }
+        });
+      });
 
     setTimeout(() => setShowUserMessage(true), 300);
     setTimeout(() => {
@@ -571,12 +613,38 @@ function App() {
       return;
     }
 
-    const filtered = policies.filter((p) => {
-      if (!p.age_range || p.age_range.length === 0) return true;
-      return p.age_range.includes(Number(age));
-    });
+    // 세션이 없거나 만료됐으면 받아 둔 지역 정책을 브라우저에서 거름
+    // (나이 정보 없는 정책은 제외 - API 나이 검색/정적 나이대 샤드와 같은 규칙)
+    const filterLocally = () => {
+      const filtered = policies.filter(
+        (p) => Array.isArray(p.age_range) && p.age_range.includes(Number(age))
+      );
+      setFilteredPolicies(filtered);
+    };
+    if (!sessionId) {
+      filterLocally();
+      return;
+    }
 
-    setFilteredPolicies(filtered);
+    const API_BASE_URL = process.env.REACT_APP_API_URL || 'https://web-production-a9d2.up.railway.app';
+    fetch(`${API_BASE_URL}/api/chat/session/${sessionId}/refine`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ age: Number(age) })
+    })
+      .then((res) => res.json())
+      .then((data) => {
+        if (data.success && Array.isArray(data.policies)) {
+          setFilteredPolicies(data.policies);
+        } else {
+          setSessionId("");
+          filterLocally();
+        }
+      })
+      .catch((err) => {
+        console.error("세션 조건 좁히기 실패:", err);
+        filterLocally();
+      });
   };
 
   const toggleDetails = () => setShowDetails((prev) => !prev);
@@ -593,6 +661,7 @@ function App() {
     setSelectedAge("");
     setPolicies([]);
     setFilteredPolicies([]);
+    setSessionId("");
     setRegionSelectedAt(null);
     setAgeDropdownAt(null);
     setShowDetails(false);
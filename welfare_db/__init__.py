@@ -0,0 +1,6 @@
+#"정책 DB 공용 패키지"
+#하는 일:
+#크롤러 / DB 임포트·검증 도구 / API 서버가 같이 쓰는 정책 스키마 규칙, 마이그레이션, upsert 경로,
+#API용 스냅샷, 거의 중복 찾기를 한 곳에 모음 (폴더마다 sys.path를 고치지 않고 import)
+#언제 사용: 저장소 루트에서 pip install -e . 한 번 (테스트는 pytest가 루트를 import 경로에 넣음)
+#  예: from welfare_db.policy_schema import region_code
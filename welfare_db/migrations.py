@@ -0,0 +1,372 @@
+#"DB 스키마 버전 관리 도구"
+#하는 일:
+#schema_migrations 테이블에 적용된 버전 기록, 안 된 마이그레이션만 순서대로 적용
+#예전 스키마 3종(create_database의 age_range JSON / improved_import의 age_min·age_max /
+#DB/import.py의 policies 테이블)을 통합 스키마로 배치 단위 변환 (중간에 끊겨도 이어서 진행)
+#임포터가 쓰는 그림자 테이블은 현재 스키마를 그대로 복제해서 만듦 (인덱스 이름은 교체해도 그대로)
+#이미 배포된 마이그레이션은 고치지 않음 - 스키마가 바뀌면 새 버전을 추가
+#언제 사용: 예전 DB 파일을 업그레이드할 때 (python -m welfare_db.migrations <DB 경로>)
+#create_database.py / improved_import / API 서버도 시작할 때 자동으로 실행
+
+import argparse
+import re
+import sqlite3
+from typing import Callable, List, Tuple
+
+from .policy_schema import POLICY_COLUMNS, categorize, normalize_policy, parse_period, policy_values
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = []
+
+
+def migration(version: int, name: str):
+    """마이그레이션 등록 (버전 순서대로 적용됨)"""
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+
+def table_exists(conn, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def current_version(conn) -> int:
+    """적용된 마지막 스키마 버전 (버전 관리 전 DB는 0)"""
+    if not table_exists(conn, 'schema_migrations'):
+        return 0
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_migrations').fetchone()[0]
+
+
+def migrate(conn, batch_size: int = 1000, verbose: bool = True) -> int:
+    """안 된 마이그레이션 적용 후 최종 버전 반환"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    version = current_version(conn)
+    for target, name, func in MIGRATIONS:
+        if target <= version:
+            continue
+        if verbose:
+            print(f"🔧 마이그레이션 {target}: {name}")
+        # 각 마이그레이션은 배치마다 커밋할 수 있고, 마지막 단계는 열린 트랜잭션으로 남겨서
+        # 버전 기록과 함께 커밋됨 (중간에 죽으면 다음 실행에서 같은 버전부터 다시)
+        func(conn, batch_size, verbose)
+        conn.execute('INSERT INTO schema_migrations (version, name) VALUES (?, ?)', (target, name))
+        conn.commit()
+        version = target
+    return version
+
+
+def _begin(conn):
+    if not conn.in_transaction:
+        conn.execute('BEGIN')
+
+
+@migration(1, "통합 정책 테이블 (정수 나이, 지역 코드, 신청기간 날짜)")
+def _unify_policy_tables(conn, batch_size, verbose):
+    sources = [name for name in ('welfare_policies', 'policies') if table_exists(conn, name)]
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS welfare_policies_v1 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            url TEXT,                    -- 없으면 NULL (유니크 인덱스)
+            region TEXT NOT NULL,        -- 지역 코드 (seoul/incheon/gyeonggi, 모르면 unknown)
+            age_min INTEGER,             -- 나이 하한 (NULL = 제한/정보 없음)
+            age_max INTEGER,             -- 나이 상한 (NULL = 제한/정보 없음)
+            application_period TEXT,     -- 신청기간 원문
+            apply_start TEXT,            -- 신청 시작일 YYYY-MM-DD (못 읽으면 NULL)
+            apply_end TEXT,              -- 신청 마감일 YYYY-MM-DD (못 읽으면 NULL)
+            conditions TEXT,
+            benefits TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_v1_url ON welfare_policies_v1(url);
+        CREATE TABLE IF NOT EXISTS migration_progress (
+            source TEXT PRIMARY KEY,
+            last_rowid INTEGER NOT NULL
+        );
+    ''')
+
+    columns = ', '.join(POLICY_COLUMNS)
+    placeholders = ', '.join('?' for _ in POLICY_COLUMNS)
+    updates = ', '.join(f'{column} = excluded.{column}' for column in POLICY_COLUMNS if column != 'url')
+    upsert = f'''
+        INSERT INTO welfare_policies_v1 (id, {columns}, created_at, updated_at)
+        VALUES (?, {placeholders}, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))
+        ON CONFLICT(url) DO UPDATE SET {updates}, updated_at = excluded.updated_at
+    '''
+
+    for index, source in enumerate(sources):
+        # 첫 번째 테이블은 id를 그대로 유지 (API 응답의 id가 바뀌지 않도록)
+        keep_id = index == 0
+        row = conn.execute('SELECT last_rowid FROM migration_progress WHERE source = ?', (source,)).fetchone()
+        last_rowid = row[0] if row else 0
+        copied = 0
+
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        while True:
+            rows = cursor.execute(
+                f'SELECT rowid AS _rowid, * FROM {source} WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                (last_rowid, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+
+            values = []
+            for row in rows:
+                item = dict(row)
+                normalized = normalize_policy(item)
+                values.append((item['_rowid'] if keep_id else None,) + policy_values(normalized)
+                              + (item.get('created_at'), item.get('updated_at')))
+            last_rowid = rows[-1]['_rowid']
+
+            # 배치 삽입과 진행 위치를 한 트랜잭션으로 커밋
+            _begin(conn)
+            conn.executemany(upsert, values)
+            conn.execute('INSERT OR REPLACE INTO migration_progress (source, last_rowid) VALUES (?, ?)',
+                         (source, last_rowid))
+            conn.commit()
+            copied += len(rows)
+            if verbose:
+                print(f"   {source}: {copied}개 변환")
+
+    # 예전 테이블을 지우고 새 테이블로 교체 (버전 기록과 같은 트랜잭션)
+    _begin(conn)
+    for source in sources:
+        conn.execute(f'DROP TABLE {source}')
+    conn.execute('DROP TABLE migration_progress')
+    conn.execute('DROP INDEX idx_v1_url')
+    conn.execute('ALTER TABLE welfare_policies_v1 RENAME TO welfare_policies')
+    conn.execute('CREATE UNIQUE INDEX idx_url ON welfare_policies(url)')
+    # 증분 크롤링 상태 테이블 (URL별 마지막 정규화 콘텐츠 해시)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            url TEXT PRIMARY KEY,
+            region TEXT,
+            content_hash TEXT,
+            status TEXT NOT NULL DEFAULT 'active',  -- active / tombstoned
+            first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            tombstoned_at TIMESTAMP
+        )
+    ''')
+
+
+@migration(2, "카테고리 태그 테이블")
+def _add_categories(conn, batch_size, verbose):
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS policy_categories (
+            category TEXT NOT NULL,
+            policy_id INTEGER NOT NULL,
+            PRIMARY KEY (category, policy_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_category_policy ON policy_categories(policy_id);
+    ''')
+
+    # 기존 정책 태그 채우기 (INSERT OR IGNORE라 중간에 끊겨도 처음부터 다시 하면 됨)
+    last_id = 0
+    tagged = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, title, conditions, benefits FROM welfare_policies
+            WHERE id > ? ORDER BY id LIMIT ?
+        ''', (last_id, batch_size)).fetchall()
+        if not rows:
+            break
+        _begin(conn)
+        conn.executemany(
+            'INSERT OR IGNORE INTO policy_categories (category, policy_id) VALUES (?, ?)',
+            [(category, policy_id) for policy_id, title, conditions, benefits in rows
+             for category in categorize(title, conditions, benefits)]
+        )
+        conn.commit()
+        last_id = rows[-1][0]
+        tagged += len(rows)
+        if verbose:
+            print(f"   카테고리: {tagged}개 정책")
+
+
+@migration(3, "API 조회용 커버링 인덱스")
+def _add_covering_indexes(conn, batch_size, verbose):
+    _begin(conn)
+    # 지역 목록/지역별 개수/지역별 제목순 목록은 인덱스만 읽음
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_region_title ON welfare_policies(region, title)')
+    # 나이 조건 검색 (나이 + 지역 필터까지 인덱스에서 처리)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_age_region ON welfare_policies(age_min, age_max, region)')
+
+
+@migration(4, "신청기간 상태(날짜/상시/미정)와 날짜 인덱스")
+def _add_apply_status(conn, batch_size, verbose):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(welfare_policies)')]
+    if 'apply_status' not in columns:
+        conn.execute("ALTER TABLE welfare_policies ADD COLUMN apply_status TEXT NOT NULL DEFAULT 'unknown'")
+        conn.commit()
+
+    # 기존 행 신청기간 다시 파싱 (잘못된 날짜 검사/상시 접수 판별이 추가됨)
+    last_id = 0
+    parsed = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, application_period FROM welfare_policies
+            WHERE id > ? ORDER BY id LIMIT ?
+        ''', (last_id, batch_size)).fetchall()
+        if not rows:
+            break
+        _begin(conn)
+        conn.executemany(
+            'UPDATE welfare_policies SET apply_start = ?, apply_end = ?, apply_status = ? WHERE id = ?',
+            [parse_period(period) + (policy_id,) for policy_id, period in rows]
+        )
+        conn.commit()
+        last_id = rows[-1][0]
+        parsed += len(rows)
+        if verbose:
+            print(f"   신청기간: {parsed}개 정책")
+
+    _begin(conn)
+    # 지금 신청 가능/마감 임박: apply_end 범위 스캔 (apply_start 조건도 인덱스 안에서 확인)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_apply_end ON welfare_policies(apply_end, apply_start)')
+    # 신청 예정: apply_start 범위 스캔
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_apply_start ON welfare_policies(apply_start)')
+    # 상시 접수 정책
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_apply_status ON welfare_policies(apply_status)')
+
+
+
+@migration(5, "증분 데이터 검증 결과/지표/보고서 기록 테이블")
+def _add_validation_tables(conn, batch_size, verbose):
+    _begin(conn)
+    # 마지막 검증 이후 바뀐 정책만 찾기
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_updated_at ON welfare_policies(updated_at)')
+    # 정책별 마지막 검증 결과 (지표 키는 다음 검증 때 이전 기여분을 빼는 데 사용)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS validation_results (
+            policy_id INTEGER PRIMARY KEY,
+            validated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            issues TEXT NOT NULL,          -- 문제 코드 JSON 리스트 (문제 없으면 [])
+            metric_keys TEXT NOT NULL,     -- 이 정책이 더한 지표 키 JSON 리스트
+            title_hash BLOB,
+            url_hash BLOB,
+            signature BLOB,                -- MinHash 서명 (거의 중복 검사)
+            near_duplicate_of INTEGER      -- 거의 같은 더 앞선 정책 id
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_validation_title ON validation_results(title_hash)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_validation_url ON validation_results(url_hash)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_validation_near ON validation_results(near_duplicate_of)')
+    # MinHash LSH 버킷 (band 키 → 정책)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS validation_bands (
+            band_key INTEGER NOT NULL,
+            policy_id INTEGER NOT NULL,
+            PRIMARY KEY (band_key, policy_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_validation_bands_policy ON validation_bands(policy_id)')
+    # 전체 지표 누적값 (검증할 때마다 바뀐 정책의 증감만 반영)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS validation_metrics (
+            metric TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''')
+    # 검증 실행 기록 (실행마다 보고서 버전 하나)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS validation_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TIMESTAMP NOT NULL,
+            finished_at TIMESTAMP,
+            watermark TIMESTAMP NOT NULL,  -- 다음 실행은 updated_at >= watermark인 정책만 검사
+            table_root INTEGER,            -- welfare_policies 루트 페이지 (테이블이 교체되면 전체 재검사)
+            checked_rows INTEGER NOT NULL DEFAULT 0,
+            removed_rows INTEGER NOT NULL DEFAULT 0,
+            report TEXT                    -- 보고서 JSON
+        )
+    ''')
+
+
+@migration(6, "그림자 테이블 교체로 바뀐 인덱스 이름(_b) 원래대로")
+def _restore_index_names(conn, batch_size, verbose):
+    # 예전 임포터는 교체할 때마다 인덱스 이름에 _b를 붙였다 뗐다 함 (이제는 같은 이름 유지)
+    _begin(conn)
+    rows = conn.execute(
+        "SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        "AND tbl_name IN ('welfare_policies', 'policy_categories')"
+    ).fetchall()
+    for name, table, sql in rows:
+        if not name.endswith('_b'):
+            continue
+        conn.execute(f'DROP INDEX {name}')
+        conn.execute(_CREATE_INDEX.sub(lambda m: f'{m.group(1)} {name[:-2]} ON {table}', sql, count=1))
+
+
+@migration(7, "데이터 세대 번호 (API 스냅샷이 DB와 같은 데이터인지 비교)")
+def _add_data_generation(conn, batch_size, verbose):
+    _begin(conn)
+    # 임포터가 정책/카테고리를 바꾸는 트랜잭션마다 generation을 올림 (policy_snapshot.bump_generation)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO data_meta (key, value) VALUES ('generation', 1)")
+
+
+_CREATE_TABLE = re.compile(r'^CREATE TABLE\s+("?)\w+\1', re.I)
+_CREATE_INDEX = re.compile(r'^(CREATE\s+(?:UNIQUE\s+)?INDEX)\s+("?)(\w+)\2\s+ON\s+("?)\w+\4', re.I)
+
+
+def clone_table(conn, source: str, target: str):
+    """source 테이블과 같은 스키마의 빈 테이블 생성 (인덱스 제외)"""
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (source,)).fetchone()[0]
+    conn.execute(_CREATE_TABLE.sub(f'CREATE TABLE {target}', sql, count=1))
+
+
+def move_indexes(conn, source: str, target: str):
+    """source 테이블의 인덱스를 같은 이름으로 target에 다시 만들고 source 쪽은 삭제
+    (인덱스 이름은 DB 전체에서 유일해야 하므로 교체 트랜잭션 안에서 호출)"""
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (source,)
+    ).fetchall()
+    for name, sql in rows:
+        conn.execute(f'DROP INDEX {name}')
+        conn.execute(_CREATE_INDEX.sub(lambda m: f'{m.group(1)} {name} ON {target}', sql, count=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB 스키마 마이그레이션")
+    parser.add_argument('db_paths', nargs='+', help="업그레이드할 DB 파일")
+    parser.add_argument('--batch-size', type=int, default=1000, help="한 번에 변환할 행 수")
+    args = parser.parse_args()
+
+    for db_path in args.db_paths:
+        conn = sqlite3.connect(db_path)
+        try:
+            before = current_version(conn)
+            after = migrate(conn, args.batch_size)
+            if before == after:
+                print(f"✅ {db_path}: 이미 최신 버전 ({after})")
+            else:
+                print(f"✅ {db_path}: 버전 {before} → {after}")
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ {db_path} 마이그레이션 실패: {e}")
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#"비슷한 정책(거의 중복) 찾기 도구"
+#하는 일:
+#제목+조건+혜택 글자 3-gram → MinHash 서명 (한 번 해시로 여러 칸을 채우는 one-permutation 방식)
+#서명을 band로 나눠 LSH 버킷에 넣고, 같은 버킷에 걸린 후보만 서명 일치율로 확인
+#→ 정책 수에 거의 비례하는 시간으로, 다른 페이지에서 다시 크롤링된 같은 사업 / 제목만 조금 바뀐 정책을 찾음
+#언제 사용: 데이터 검증 보고서(data_validator), 임포트할 때 거의 중복인 정책 건너뛰기(improved_import)
+
+import hashlib
+import re
+import zlib
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.8
+
+_NOISE = re.compile(r'[\s\W_]+')
+_EMPTY = 0xFFFFFFFF
+_MIX = 0x9E3779B1
+
+
+def policy_text(title: Optional[str], conditions: Optional[str], benefits: Optional[str]) -> str:
+    """비교에 쓸 정책 텍스트 (제목 + 조건 + 혜택)"""
+    return ' '.join(text for text in (title, conditions, benefits) if text)
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """공백/기호를 뺀 소문자 텍스트의 글자 size-gram (UTF-16 바이트 조각)"""
+    text = _NOISE.sub('', (text or '').lower())
+    if not text:
+        return set()
+    data = text.encode('utf-16-le')
+    width = size * 2
+    if len(data) <= width:
+        return {data}
+    return {data[i:i + width] for i in range(0, len(data) - width + 2, 2)}
+
+
+class NearDuplicateIndex:
+    """MinHash + LSH 색인 (add로 넣으면서 이미 넣은 정책 중 거의 같은 것을 찾음)"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 3, max_bucket: int = 20):
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands로 나누어떨어져야 합니다")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # 버킷마다 비교 대상은 max_bucket개까지만 (상투적인 문구가 많아도 정책 하나당 비교 횟수가 일정)
+        self.max_bucket = max_bucket
+        self.signatures: Dict[Hashable, array] = {}
+        self.buckets: Dict[int, List[Hashable]] = {}
+
+    def signature(self, text: str) -> Optional[array]:
+        """one-permutation MinHash 서명 (텍스트가 비면 None)
+        해시 하나로 칸을 고르고 칸마다 최솟값을 유지, 빈 칸은 오른쪽 칸 값을 돌려서 채움"""
+        bins = [_EMPTY] * self.num_perm
+        for shingle in shingles(text, self.shingle_size):
+            value = (zlib.crc32(shingle) * _MIX) & 0xFFFFFFFF
+            slot = value % self.num_perm
+            if value < bins[slot]:
+                bins[slot] = value
+        filled = [slot for slot, value in enumerate(bins) if value != _EMPTY]
+        if not filled:
+            return None
+
+        if len(filled) < self.num_perm:
+            original = bins[:]
+            for slot in range(self.num_perm):
+                if original[slot] != _EMPTY:
+                    continue
+                distance = 1
+                while original[(slot + distance) % self.num_perm] == _EMPTY:
+                    distance += 1
+                source = original[(slot + distance) % self.num_perm]
+                bins[slot] = (source + distance * _MIX) & 0xFFFFFFFE  # 빈 칸 표시값(_EMPTY)이 되지 않게
+        return array('I', bins)
+
+    def similarity(self, first: array, second: array) -> float:
+        """서명 일치율 (자카드 유사도 추정치)"""
+        return sum(a == b for a, b in zip(first, second)) / self.num_perm
+
+    def band_keys(self, signature: array) -> List[int]:
+        """band별 버킷 키 (프로세스가 달라도 같은 값이라 DB에 저장 가능, SQLite INTEGER 범위)"""
+        return [
+            int.from_bytes(hashlib.blake2b(
+                bytes([band]) + signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8
+            ).digest(), 'little', signed=True)
+            for band in range(self.bands)
+        ]
+
+    def find(self, signature: array) -> Optional[Tuple[Hashable, float]]:
+        """이미 넣은 정책 중 threshold 이상 비슷한 첫 번째 (키, 유사도)"""
+        checked = set()
+        for band_key in self.band_keys(signature):
+            for key in self.buckets.get(band_key, ()):
+                if key in checked:
+                    continue
+                checked.add(key)
+                score = self.similarity(signature, self.signatures[key])
+                if score >= self.threshold:
+                    return key, score
+        return None
+
+    def insert(self, key: Hashable, signature: array):
+        self.signatures[key] = signature
+        for band_key in self.band_keys(signature):
+            bucket = self.buckets.setdefault(band_key, [])
+            if len(bucket) < self.max_bucket:
+                bucket.append(key)
+
+    def add(self, key: Hashable, text: str, keep_duplicates: bool = True) -> Optional[Tuple[Hashable, float]]:
+        """정책 추가 후 거의 같은 기존 정책 (키, 유사도) 반환
+        keep_duplicates=False면 중복으로 판정된 정책은 색인에 넣지 않음 (임포트 중복 제거용)"""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        match = self.find(signature)
+        if match is None or keep_duplicates:
+            self.insert(key, signature)
+        return match
+
+    def __len__(self):
+        return len(self.signatures)
+
+
+def duplicate_groups(links: Dict[Hashable, Hashable]) -> List[List[Hashable]]:
+    """{중복 키: 먼저 넣은 비슷한 키} → 묶음 목록 (맨 앞이 처음 넣은 정책, 큰 묶음부터)"""
+    def root(key):
+        while key in links:
+            key = links[key]
+        return key
+
+    groups: Dict[Hashable, List[Hashable]] = {}
+    for key in links:
+        groups.setdefault(root(key), []).append(key)
+    return sorted(([first] + members for first, members in groups.items()), key=len, reverse=True)
+
+
+def find_near_duplicate_groups(items: Iterable[Tuple[Hashable, str]],
+                               threshold: float = DEFAULT_THRESHOLD) -> List[List[Hashable]]:
+    """(키, 텍스트)들 → 거의 중복인 정책 묶음"""
+    index = NearDuplicateIndex(threshold)
+    links = {}
+    for key, text in items:
+        match = index.add(key, text)
+        if match:
+            links[key] = match[0]
+    return duplicate_groups(links)
@@ -0,0 +1,166 @@
+#"정책 데이터 정규화 도구" (모든 임포터/마이그레이션이 같은 규칙으로 행을 만듦)
+#하는 일:
+#크롤러/예전 DB 행 → 통합 스키마 행 변환
+#  age_range 리스트 / age_min·age_max(-1) → 정수 나이 하한·상한 (모르면 NULL)
+#  '서울' / ['인천광역시'] / '경기도, 인천' → 지역 코드 (seoul/incheon/gyeonggi, 모르는 지역은 unknown)
+#  '2025.05.01~2025.05.21' → apply_start/apply_end 날짜 (YYYY-MM-DD) + apply_status (dated/always/unknown)
+#  제목/조건/혜택 키워드 → 카테고리 태그 (housing, employment, ...)
+#언제 사용: DB에 정책을 넣기 전에 (policy_store.py, improved_import, migrations.py)
+#  지역 코드 규칙은 크롤러(improved_crawling)와 챗봇 의도 분석(B_backend/intent.py)도 여기서 가져다 씀
+
+import json
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+# 지역 이름(크롤러 지역명/공식 명칭) → DB 지역 코드
+REGION_CODES = {
+    '서울': 'seoul', '서울시': 'seoul', '서울특별시': 'seoul',
+    '인천': 'incheon', '인천시': 'incheon', '인천광역시': 'incheon',
+    '경기': 'gyeonggi', '경기도': 'gyeonggi',
+}
+# 지역 코드 → 화면 표시용 이름
+REGION_NAMES = {'seoul': '서울', 'incheon': '인천', 'gyeonggi': '경기'}
+UNKNOWN_REGION = 'unknown'
+
+# 카테고리 코드 → 키워드 (제목/조건/혜택 중 하나라도 포함하면 태그)
+CATEGORY_KEYWORDS = {
+    'housing': ['월세', '전세', '주거', '주택', '임대', '보증금'],
+    'employment': ['취업', '일자리', '구직', '채용', '인턴', '면접'],
+    'finance': ['대출', '적금', '저축', '통장', '자산', '금융', '이자'],
+    'education': ['교육', '학자금', '장학', '강좌', '훈련', '자격증'],
+    'health': ['의료', '건강', '병원', '심리', '상담', '치료'],
+    'startup': ['창업', '스타트업', '사업자'],
+    'culture': ['문화', '여가', '예술', '공연', '여행'],
+    'living': ['생활', '생계', '수당', '바우처', '교통'],
+}
+
+# 카테고리 코드 → 화면 표시용 이름
+CATEGORY_LABELS = {
+    'housing': '주거', 'employment': '일자리', 'finance': '금융', 'education': '교육',
+    'health': '건강', 'startup': '창업', 'culture': '문화', 'living': '생활',
+}
+
+# 신청기간 상태: 날짜 있음 / 상시 접수 / 알 수 없음(미정 등)
+APPLY_DATED = 'dated'
+APPLY_ALWAYS = 'always'
+APPLY_UNKNOWN = 'unknown'
+ALWAYS_OPEN_KEYWORDS = ('상시', '연중', '수시', '예산 소진', '선착순 마감')
+
+_DATE = r'(\d{4})\s*[.\-/]\s*(\d{1,2})\s*[.\-/]\s*(\d{1,2})'
+_PERIOD = re.compile(_DATE + r'\s*\.?\s*[~\-]\s*' + _DATE)
+
+
+def region_code(region) -> str:
+    """지역 이름/코드/리스트 → 지역 코드 (여러 지역이면 첫 번째, 모르는 지역은 unknown)"""
+    if isinstance(region, list):
+        region = region[0] if region else ''
+    region = str(region or '').split(',')[0].strip()
+    if region.lower() in REGION_NAMES:
+        return region.lower()
+    return REGION_CODES.get(region, UNKNOWN_REGION)
+
+
+def age_bounds(item: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """age_range 리스트(또는 JSON 문자열) / age_min·age_max → (하한, 상한), 정보 없으면 NULL"""
+    age_range = item.get('age_range')
+    if isinstance(age_range, str):
+        age_range = json.loads(age_range) if age_range.strip() else []
+    if age_range:
+        ages = [int(age) for age in age_range]
+        return min(ages), max(ages)
+
+    age_min, age_max = item.get('age_min'), item.get('age_max')
+    # 예전 스키마는 -1을 "정보 없음"으로 씀
+    age_min = None if age_min is None or age_min < 0 else int(age_min)
+    age_max = None if age_max is None or age_max < 0 else int(age_max)
+    return age_min, age_max
+
+
+def parse_period(text: Optional[str]) -> Tuple[Optional[str], Optional[str], str]:
+    """'2025.05.01~2025.05.21' → ('2025-05-01', '2025-05-21', 'dated')
+    '상시 접수' → (None, None, 'always'), '미정'/못 읽음 → (None, None, 'unknown')"""
+    text = text or ''
+    match = _PERIOD.search(text)
+    if match:
+        numbers = [int(value) for value in match.groups()]
+        try:
+            start = date(*numbers[:3])
+            end = date(*numbers[3:])
+        except ValueError:
+            start = end = None  # 2025.13.01 같은 잘못된 날짜
+        if start and end and start <= end:
+            return start.isoformat(), end.isoformat(), APPLY_DATED
+    if any(keyword in text for keyword in ALWAYS_OPEN_KEYWORDS):
+        return None, None, APPLY_ALWAYS
+    return None, None, APPLY_UNKNOWN
+
+
+def categorize(*texts: Optional[str]) -> List[str]:
+    """키워드 기반 카테고리 태그"""
+    text = ' '.join(t for t in texts if t)
+    return [category for category, keywords in CATEGORY_KEYWORDS.items()
+            if any(keyword in text for keyword in keywords)]
+
+
+def normalize_policy(item: Dict[str, Any], region: Optional[str] = None) -> Dict[str, Any]:
+    """크롤러 레코드/예전 DB 행 → 통합 스키마 행 (region을 주면 item의 지역 대신 사용)"""
+    age_min, age_max = age_bounds(item)
+    period = (item.get('application_period') or '').strip()
+    apply_start, apply_end, apply_status = parse_period(period)
+    title = (item.get('title') or '').strip()
+    conditions = (item.get('conditions') or '').strip()
+    benefits = (item.get('benefits') or '').strip()
+
+    return {
+        'title': title,
+        'url': (item.get('url') or '').strip() or None,  # 빈 URL은 NULL (유니크 인덱스에서 서로 겹치지 않음)
+        'region': region_code(region if region is not None else item.get('region')),
+        'age_min': age_min,
+        'age_max': age_max,
+        'application_period': period,
+        'apply_start': apply_start,
+        'apply_end': apply_end,
+        'apply_status': apply_status,
+        'conditions': conditions,
+        'benefits': benefits,
+        'categories': categorize(title, conditions, benefits),
+    }
+
+
+# 마이그레이션 1이 만든 컬럼 (마이그레이션 1이 이 목록으로 행을 옮기므로 바꾸지 말 것)
+POLICY_COLUMNS = ('title', 'url', 'region', 'age_min', 'age_max', 'application_period',
+                  'apply_start', 'apply_end', 'conditions', 'benefits')
+# 이후 마이그레이션에서 추가된 컬럼 (4: apply_status) - 새 컬럼은 여기에 붙이고 마이그레이션으로 채움
+ADDED_COLUMNS = ('apply_status',)
+# 임포터가 쓰는 현재 스키마 컬럼
+CURRENT_COLUMNS = POLICY_COLUMNS + ADDED_COLUMNS
+
+
+def policy_values(row: Dict[str, Any], columns: Tuple[str, ...] = POLICY_COLUMNS) -> tuple:
+    """normalize_policy 결과 → columns 순서의 값 (임포터는 CURRENT_COLUMNS를 넘김)"""
+    return tuple(row[column] for column in columns)
+
+
+def age_overlaps(age_min: Optional[int], age_max: Optional[int], low: int, high: int) -> bool:
+    """정책 나이 범위가 [low, high]와 겹치는지 - 나이 정보가 없는(NULL) 정책은 나이 검색에서 제외
+    (API age 검색 SQL, 스냅샷/세션 조건 좁히기, 정적 샤드, query_database가 모두 이 규칙)"""
+    return age_min is not None and age_max is not None and age_min <= high and age_max >= low
+
+
+def age_range_list(age_min: Optional[int], age_max: Optional[int]) -> List[int]:
+    """하한/상한 → 예전 API 형식의 나이 리스트 (정보 없으면 빈 리스트)"""
+    if age_min is None and age_max is None:
+        return []
+    return list(range(age_min or 0, (age_max if age_max is not None else 99) + 1))
+
+
+def replace_categories(cursor, categories_by_id: Dict[int, List[str]], table: str = 'policy_categories'):
+    """정책별 카테고리 태그 교체"""
+    if not categories_by_id:
+        return
+    cursor.executemany(f'DELETE FROM {table} WHERE policy_id = ?', [(pid,) for pid in categories_by_id])
+    cursor.executemany(
+        f'INSERT OR IGNORE INTO {table} (category, policy_id) VALUES (?, ?)',
+        [(category, pid) for pid, categories in categories_by_id.items() for category in categories]
+    )
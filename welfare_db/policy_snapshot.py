@@ -0,0 +1,353 @@
+#"API용 읽기 전용 정책 스냅샷 파일" (열 단위 저장, mmap으로 바로 읽음)
+#하는 일:
+#임포트가 끝난 DB를 (지역, 제목) 순서로 한 번 읽어서 열 단위 바이너리 파일로 저장
+#API 워커는 파일을 mmap으로 열고(수 ms) 필요한 열만 보고 필터링, 결과 행만 dict로 만듦
+#스냅샷이 최신인지는 파일 시각이 아니라 데이터 세대 번호로 판단
+#  임포터가 정책을 바꾸는 트랜잭션에서 data_meta의 generation을 올림 (bump_generation)
+#  스냅샷 헤더의 세대 번호가 DB와 다르면 API가 다시 만듦 (검증 도구/체크포인트의 쓰기는 영향 없음)
+#언제 사용: 임포트 직후 (improved_import / create_database가 자동 생성), 기존 DB는 python -m welfare_db.policy_snapshot <DB 경로>
+#
+#파일 구조 (리틀 엔디언, 섹션 시작은 8바이트 정렬):
+#  헤더      magic 'WPSNAP' + 버전(H) | 행 수(I) | 섹션 수(I) | 데이터 세대 번호(Q)
+#  섹션 표   섹션마다 이름(32s) | 배열 타입코드(c, 7바이트 패딩) | 시작 위치(Q) | 바이트 길이(Q)
+#  섹션
+#    meta            JSON: 지역/카테고리/신청상태 사전, 지역별 행 범위, 생성 시각
+#    id              q  정책 id
+#    region          H  지역 사전 번호 (행이 지역순이라 지역 필터는 meta의 행 범위로 바로 찾음)
+#    age_min/max     h  나이 하한/상한 (-1 = NULL)
+#    apply_start/end i  신청 시작/마감일 YYYYMMDD (0 = NULL)
+#    apply_status    B  신청상태 사전 번호
+#    categories      I  카테고리 비트마스크 (비트 i = 카테고리 사전 i번)
+#    <필드>_offsets  Q  문자열 필드별 시작 위치 (행 수 + 1개, strings 섹션 기준)
+#    strings         B  모든 문자열을 필드별로 이어 붙인 UTF-8 덩어리 (title → url → ... 순서)
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from .policy_schema import APPLY_ALWAYS, APPLY_DATED, APPLY_UNKNOWN, CATEGORY_KEYWORDS, age_range_list
+
+MAGIC = b'WPSNAP'
+VERSION = 2
+STRING_FIELDS = ('title', 'url', 'application_period', 'conditions', 'benefits')
+# 키워드 검색 대상 (API의 title/benefits/conditions LIKE 검색과 같은 필드)
+KEYWORD_FIELDS = ('title', 'benefits', 'conditions')
+
+MAX_REGIONS = 0xFFFF  # region 열이 H(2바이트) 사전 번호
+
+_HEADER = struct.Struct('<6sHIIQ')
+_SECTION = struct.Struct('<32sc7xQQ')
+
+
+def snapshot_path(db_path: str) -> str:
+    """DB 파일 옆의 스냅샷 경로 (welfare_policies.db → welfare_policies.snapshot)"""
+    return os.path.splitext(db_path)[0] + '.snapshot'
+
+
+def data_generation(conn) -> int:
+    """DB의 데이터 세대 번호 (data_meta 테이블이 없는 예전 DB는 0)"""
+    try:
+        row = conn.execute("SELECT value FROM data_meta WHERE key = 'generation'").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+def bump_generation(conn):
+    """정책 데이터를 바꾼 트랜잭션 안에서 호출 (커밋되면 이전 스냅샷은 낡은 것이 됨)"""
+    conn.execute("UPDATE data_meta SET value = value + 1 WHERE key = 'generation'")
+
+
+def snapshot_generation(path: str) -> Optional[int]:
+    """스냅샷 파일 헤더의 데이터 세대 번호 (파일이 없거나 다른 형식이면 None)"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+    magic, version, _, _, generation = _HEADER.unpack(header)
+    return generation if magic == MAGIC and version == VERSION else None
+
+
+def _date_number(value: Optional[str]) -> int:
+    return int(value.replace('-', '')) if value else 0
+
+
+def _date_text(value: int) -> Optional[str]:
+    if not value:
+        return None
+    text = str(value)
+    return f"{text[:4]}-{text[4:6]}-{text[6:]}"
+
+
+def write_snapshot(conn, path: str) -> int:
+    """DB → 스냅샷 파일 (임시 파일에 쓴 뒤 교체하므로 열어 둔 API 워커는 이전 파일을 계속 읽음)"""
+    if sys.byteorder != 'little':
+        raise RuntimeError("스냅샷은 리틀 엔디언 환경에서만 만들 수 있습니다")
+
+    categories = sorted(CATEGORY_KEYWORDS)  # API의 GROUP_CONCAT(인덱스 순서)과 같은 알파벳 순
+    statuses = [APPLY_DATED, APPLY_ALWAYS, APPLY_UNKNOWN]
+    regions: List[str] = []
+    region_ranges: Dict[str, List[int]] = {}
+    columns = {
+        'id': array('q'), 'region': array('H'), 'age_min': array('h'), 'age_max': array('h'),
+        'apply_start': array('i'), 'apply_end': array('i'), 'apply_status': array('B'),
+        'categories': array('I'),
+    }
+    offsets = {field: array('Q', [0]) for field in STRING_FIELDS}
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        # 문자열은 필드별 임시 파일로 흘려 쓰고 마지막에 하나로 합침 (메모리는 숫자 열만큼만)
+        blobs = {field: open(os.path.join(tmp, field), 'wb') for field in STRING_FIELDS}
+        # 세대 번호와 정책 행을 한 읽기 트랜잭션에서 읽음 (그 사이 커밋된 임포트가 섞이지 않도록)
+        began = not conn.in_transaction
+        if began:
+            conn.execute('BEGIN')
+        try:
+            generation = data_generation(conn)
+            # idx_region_title 순서로 읽음 (API의 ORDER BY region, title과 같은 순서)
+            cursor = conn.execute('''
+                SELECT p.id, p.region, p.age_min, p.age_max, p.apply_start, p.apply_end, p.apply_status,
+                       (SELECT GROUP_CONCAT(c.category) FROM policy_categories c WHERE c.policy_id = p.id),
+                       p.title, p.url, p.application_period, p.conditions, p.benefits
+                FROM welfare_policies p
+                ORDER BY p.region, p.title
+            ''')
+            row_number = 0
+            for row in cursor:
+                policy_id, region, age_min, age_max, apply_start, apply_end, status, tags = row[:8]
+                if region not in region_ranges:
+                    if len(regions) == MAX_REGIONS:
+                        raise ValueError(f"지역이 {MAX_REGIONS}개를 넘어 스냅샷에 담을 수 없습니다")
+                    regions.append(region)
+                    region_ranges[region] = [row_number, row_number]
+                region_ranges[region][1] = row_number + 1
+
+                columns['id'].append(policy_id)
+                columns['region'].append(len(regions) - 1)  # 지역순으로 읽으므로 항상 마지막에 추가한 지역
+                columns['age_min'].append(-1 if age_min is None else age_min)
+                columns['age_max'].append(-1 if age_max is None else age_max)
+                columns['apply_start'].append(_date_number(apply_start))
+                columns['apply_end'].append(_date_number(apply_end))
+                columns['apply_status'].append(statuses.index(status) if status in statuses else 2)
+                mask = 0
+                for tag in (tags or '').split(','):
+                    if tag in categories:
+                        mask |= 1 << categories.index(tag)
+                columns['categories'].append(mask)
+
+                for field, value in zip(STRING_FIELDS, row[8:]):
+                    data = (value or '').encode('utf-8')
+                    blobs[field].write(data)
+                    offsets[field].append(offsets[field][-1] + len(data))
+                row_number += 1
+        finally:
+            if began:
+                conn.rollback()  # 읽기만 했으므로 그냥 끝냄
+            for blob in blobs.values():
+                blob.close()
+
+        # 필드별 offset을 strings 섹션 전체 기준으로 옮김
+        base = 0
+        for field in STRING_FIELDS:
+            size = offsets[field][-1]
+            if base:
+                offsets[field] = array('Q', (offset + base for offset in offsets[field]))
+            base += size
+
+        meta = {
+            'regions': regions,
+            'region_ranges': region_ranges,
+            'categories': categories,
+            'apply_statuses': statuses,
+            'string_fields': list(STRING_FIELDS),
+            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        sections = [('meta', 'B', json.dumps(meta, ensure_ascii=False).encode('utf-8'))]
+        sections += [(name, values.typecode, values) for name, values in columns.items()]
+        sections += [(f'{field}_offsets', 'Q', offsets[field]) for field in STRING_FIELDS]
+
+        # 섹션 위치 계산 (strings는 마지막, 임시 파일들을 그대로 이어 붙임)
+        position = _HEADER.size + _SECTION.size * (len(sections) + 1)
+        table = []
+        for name, typecode, values in sections:
+            position = (position + 7) & ~7
+            length = len(values) * (values.itemsize if isinstance(values, array) else 1)
+            table.append((name, typecode, position, length))
+            position += length
+        position = (position + 7) & ~7
+        table.append(('strings', 'B', position, base))
+
+        temp_path = os.path.join(tmp, 'snapshot')
+        with open(temp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, row_number, len(table), generation))
+            for name, typecode, start, length in table:
+                f.write(_SECTION.pack(name.encode('ascii'), typecode.encode('ascii'), start, length))
+            for (name, typecode, values), (_, _, start, _) in zip(sections, table):
+                f.write(b'\0' * (start - f.tell()))
+                f.write(values.tobytes() if isinstance(values, array) else values)
+            f.write(b'\0' * (table[-1][2] - f.tell()))
+            for field in STRING_FIELDS:
+                with open(os.path.join(tmp, field), 'rb') as blob:
+                    shutil.copyfileobj(blob, f, 1 << 20)
+        os.replace(temp_path, path)
+    return row_number
+
+
+class PolicySnapshot:
+    """mmap으로 연 스냅샷 (필터는 필요한 열만 읽고, 결과 행만 dict로 만듦)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, self.rows, section_count, self.generation = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"스냅샷 형식이 아닙니다: {path}")
+
+        self.columns = {}
+        for number in range(section_count):
+            name, typecode, start, length = _SECTION.unpack_from(view, _HEADER.size + _SECTION.size * number)
+            section = view[start:start + length]
+            typecode = typecode.decode('ascii')
+            if name.rstrip(b'\0') == b'strings':
+                self._strings_start = start
+            self.columns[name.rstrip(b'\0').decode('ascii')] = section.cast(typecode) if typecode != 'B' else section
+
+        self.meta = json.loads(bytes(self.columns.pop('meta')))
+        self.strings = self.columns.pop('strings')
+        self.offsets = {field: self.columns.pop(f'{field}_offsets') for field in self.meta['string_fields']}
+
+    def close(self):
+        self.columns = self.offsets = self.strings = None
+        self._mmap.close()
+
+    def _text(self, field: str, row: int) -> str:
+        offsets = self.offsets[field]
+        return str(self.strings[offsets[row]:offsets[row + 1]], 'utf-8')
+
+    def policy(self, row: int) -> Dict[str, Any]:
+        """행 번호 → API 응답과 같은 모양의 정책 dict"""
+        columns = self.columns
+        age_min = columns['age_min'][row]
+        age_max = columns['age_max'][row]
+        age_min = None if age_min < 0 else age_min
+        age_max = None if age_max < 0 else age_max
+        mask = columns['categories'][row]
+        url = self._text('url', row)
+        return {
+            'id': columns['id'][row],
+            'title': self._text('title', row),
+            'url': url or None,
+            'region': self.meta['regions'][columns['region'][row]],
+            'age_min': age_min,
+            'age_max': age_max,
+            'application_period': self._text('application_period', row),
+            'apply_start': _date_text(columns['apply_start'][row]),
+            'apply_end': _date_text(columns['apply_end'][row]),
+            'apply_status': self.meta['apply_statuses'][columns['apply_status'][row]],
+            'conditions': self._text('conditions', row),
+            'benefits': self._text('benefits', row),
+            'categories': [name for bit, name in enumerate(self.meta['categories']) if mask >> bit & 1],
+            'age_range': age_range_list(age_min, age_max),
+        }
+
+    def policies(self, rows: Iterable[int]) -> List[Dict[str, Any]]:
+        return [self.policy(row) for row in rows]
+
+    def _keyword_rows(self, keyword: str, rows: range) -> set:
+        """키워드가 들어 있는 행 (필드별 문자열 구간에서 바이트 검색 → offset으로 행 찾기)"""
+        needle = keyword.encode('utf-8')
+        found = set()
+        haystack = self._mmap
+        strings_start = self._strings_start
+        for field in KEYWORD_FIELDS:
+            offsets = self.offsets[field]
+            end = strings_start + offsets[rows.stop]
+            position = haystack.find(needle, strings_start + offsets[rows.start], end)
+            while position != -1:
+                row = bisect.bisect_right(offsets, position - strings_start, rows.start, rows.stop + 1) - 1
+                # 필드 경계에 걸친 일치는 제외
+                if position + len(needle) - strings_start <= offsets[row + 1]:
+                    found.add(row)
+                    position = haystack.find(needle, strings_start + offsets[row + 1], end)
+                else:
+                    position = haystack.find(needle, position + 1, end)
+        return found
+
+    def _row_has_keyword(self, needle: bytes, row: int) -> bool:
+        """행 하나의 제목/혜택/조건에 키워드가 있는지"""
+        strings_start = self._strings_start
+        for field in KEYWORD_FIELDS:
+            offsets = self.offsets[field]
+            if self._mmap.find(needle, strings_start + offsets[row], strings_start + offsets[row + 1]) != -1:
+                return True
+        return False
+
+    def filter(self, region: Optional[str] = None, age: Optional[int] = None, category: Optional[str] = None,
+               keyword: Optional[str] = None, age_to: Optional[int] = None) -> List[int]:
+        """조건에 맞는 행 번호 (지역, 제목 순서), age_to를 주면 [age, age_to]와 나이 범위가 겹치는 정책"""
+        if region:
+            bounds = self.meta['region_ranges'].get(region)
+            if not bounds:
+                return []
+            rows = range(*bounds)
+        else:
+            rows = range(self.rows)
+
+        candidates: Iterable[int] = sorted(self._keyword_rows(keyword, rows)) if keyword else rows
+        return self.narrow(candidates, age=age, category=category, age_to=age_to)
+
+    def narrow(self, rows: Iterable[int], age: Optional[int] = None, category: Optional[str] = None,
+               keyword: Optional[str] = None, age_to: Optional[int] = None) -> List[int]:
+        """이미 고른 행 번호 중 조건에 맞는 것만 (순서 유지, 대화 세션의 후보 좁히기)"""
+        candidates = rows
+        if keyword:
+            needle = keyword.encode('utf-8')
+            candidates = [row for row in candidates if self._row_has_keyword(needle, row)]
+        if age is not None:
+            age_min, age_max = self.columns['age_min'], self.columns['age_max']
+            upper = age if age_to is None else age_to
+            candidates = [row for row in candidates if 0 <= age_min[row] <= upper and age_max[row] >= age]
+        if category:
+            if category not in self.meta['categories']:
+                return []
+            bit = 1 << self.meta['categories'].index(category)
+            masks = self.columns['categories']
+            candidates = [row for row in candidates if masks[row] & bit]
+        return list(candidates)
+
+def main():
+    parser = argparse.ArgumentParser(description="DB → API용 정책 스냅샷 파일 생성")
+    parser.add_argument('db', help="정책 DB 경로")
+    parser.add_argument('--out', help="스냅샷 경로 (기본: DB 옆 <이름>.snapshot)")
+    args = parser.parse_args()
+
+    out = args.out or snapshot_path(args.db)
+    started = time.monotonic()
+    conn = sqlite3.connect(args.db)
+    try:
+        rows = write_snapshot(conn, out)
+    finally:
+        conn.close()
+    print(f"✅ 스냅샷 저장: {out} ({rows}개 정책, {os.path.getsize(out) / 1024 / 1024:.1f}MB, "
+          f"{time.monotonic() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#"정책 행 저장 도구" (임포터들이 같은 upsert 경로로 DB에 씀)
+#하는 일:
+#정책 레코드 정규화 → url 유니크 인덱스 + ON CONFLICT upsert (executemany 배치, 실패한 배치만 행 단위 재시도)
+#증분 크롤링 결과(바뀐 정책/사라진 정책)와 crawl_state를 한 트랜잭션으로 반영
+#정책을 바꾸는 트랜잭션마다 데이터 세대 번호를 올림 (API 스냅샷 갱신용)
+#언제 사용: create_database.py(JSON/JSONL/--changes 임포트), DB/import.py
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from .policy_schema import CURRENT_COLUMNS, normalize_policy, policy_values, region_code, replace_categories
+from .policy_snapshot import bump_generation
+
+# 임포트 동안만 쓰는 PRAGMA (끝나면 원래 값으로 복구)
+IMPORT_PRAGMAS = {
+    'synchronous': 'OFF',       # 트랜잭션마다 fsync 안 함 (중간에 죽으면 다시 임포트)
+    'cache_size': '-200000',    # 페이지 캐시 약 200MB (인덱스 갱신이 디스크로 덜 나감)
+    'temp_store': 'MEMORY',
+}
+
+
+@contextmanager
+def import_pragmas(conn):
+    """with 블록 안에서만 임포트용 PRAGMA 적용 (synchronous는 트랜잭션 안에서 못 바꾸므로 BEGIN 전에)"""
+    saved = {}
+    for name, value in IMPORT_PRAGMAS.items():
+        saved[name] = conn.execute(f'PRAGMA {name}').fetchone()[0]
+        conn.execute(f'PRAGMA {name} = {value}')
+    try:
+        yield conn
+    finally:
+        for name, value in saved.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+
+
+UPSERT_SQL = '''
+    INSERT INTO welfare_policies ({columns})
+    VALUES ({placeholders})
+    ON CONFLICT(url) DO UPDATE SET
+        {updates},
+        updated_at = CURRENT_TIMESTAMP
+'''.format(
+    columns=', '.join(CURRENT_COLUMNS),
+    placeholders=', '.join('?' for _ in CURRENT_COLUMNS),
+    updates=', '.join(f'{column} = excluded.{column}' for column in CURRENT_COLUMNS if column != 'url')
+)
+
+
+def _write_rows(cursor, rows: List[Dict[str, Any]]):
+    """정규화된 행 upsert + 카테고리 태그 교체"""
+    with_url = [row for row in rows if row['url']]
+    cursor.executemany(UPSERT_SQL, [policy_values(row, CURRENT_COLUMNS) for row in with_url])
+    
+    # upsert는 id를 돌려주지 않으므로 url 인덱스로 한 번에 조회
+    categories_by_id = {}
+    for start in range(0, len(with_url), 500):
+        chunk = with_url[start:start + 500]
+        placeholders = ', '.join('?' for _ in chunk)
+        ids = dict(cursor.execute(f'SELECT url, id FROM welfare_policies WHERE url IN ({placeholders})',
+                                  [row['url'] for row in chunk]))
+        for row in chunk:
+            categories_by_id[ids[row['url']]] = row['categories']
+    
+    # url 없는 정책은 중복 판단 없이 새로 삽입
+    for row in rows:
+        if not row['url']:
+            cursor.execute(UPSERT_SQL, policy_values(row, CURRENT_COLUMNS))
+            categories_by_id[cursor.lastrowid] = row['categories']
+    
+    replace_categories(cursor, categories_by_id)
+
+
+def _upsert_batch(cursor, rows: List[Dict[str, Any]]):
+    """배치 하나 executemany (실패하면 행 단위로 다시 넣어서 문제 행만 건너뜀) → (성공 수, 실패한 행)"""
+    cursor.execute('SAVEPOINT batch')
+    try:
+        _write_rows(cursor, rows)
+        cursor.execute('RELEASE batch')
+        return len(rows), []
+    except sqlite3.Error:
+        cursor.execute('ROLLBACK TO batch')
+        cursor.execute('RELEASE batch')
+    
+    success_count = 0
+    failed = []
+    for row in rows:
+        cursor.execute('SAVEPOINT single')
+        try:
+            _write_rows(cursor, [row])
+            cursor.execute('RELEASE single')
+            success_count += 1
+        except sqlite3.Error as e:
+            cursor.execute('ROLLBACK TO single')
+            cursor.execute('RELEASE single')
+            print(f"❌ 데이터 처리 실패: {e}")
+            print(f"   문제 데이터: {row['title'] or '제목 없음'}")
+            failed.append(row)
+    return success_count, failed
+
+
+def _insert_rows(cursor, data, region: str = None, batch_size: int = 5000, progress_every: int = 100000):
+    """정규화 + 배치 upsert (트랜잭션은 호출하는 쪽에서) → (성공 수, 실패 수, 실패한 url 집합)"""
+    success_count = 0
+    error_count = 0
+    failed_urls = set()
+    next_report = progress_every
+    started = time.monotonic()
+    batch = []
+    
+    def flush():
+        nonlocal success_count, error_count, next_report
+        success, failed = _upsert_batch(cursor, batch)
+        success_count += success
+        error_count += len(failed)
+        failed_urls.update(row['url'] for row in failed)
+        batch.clear()
+        done = success_count + error_count
+        if progress_every and done >= next_report:
+            rate = done / max(time.monotonic() - started, 1e-9)
+            print(f"   진행: {done:,}개 ({rate:,.0f}개/초)")
+            next_report = (done // progress_every + 1) * progress_every
+    
+    for item in data:
+        try:
+            batch.append(normalize_policy(item, region))
+        except Exception as e:
+            print(f"❌ 데이터 처리 실패: {e}")
+            print(f"   문제 데이터: {item.get('title', '제목 없음')}")
+            error_count += 1
+            failed_urls.add(item.get('url'))
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return success_count, error_count, failed_urls
+
+
+def insert_data_to_db(conn, data, region: str = None, batch_size: int = 5000, progress_every: int = 100000):
+    """데이터를 DB에 upsert (url 유니크 인덱스 + executemany 배치, 전체를 한 트랜잭션으로 커밋)
+    region을 주면 레코드의 지역 대신 사용"""
+    with import_pragmas(conn):
+        conn.execute('BEGIN')  # 배치별 SAVEPOINT가 각자 커밋되지 않도록 바깥 트랜잭션을 먼저 엶
+        try:
+            success_count, error_count, _ = _insert_rows(conn.cursor(), data, region, batch_size, progress_every)
+            bump_generation(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    
+    return success_count, error_count
+
+
+def apply_changes(conn, changes: List[Dict[str, Any]]):
+    """증분 크롤링 결과 반영 (바뀐 정책 upsert, 사라진 정책 tombstone, crawl_state 갱신)
+    정책 행과 crawl_state를 한 트랜잭션으로 커밋 (중간에 죽어도 해시와 정책 내용이 어긋나지 않음)"""
+    cursor = conn.cursor()
+    
+    changed = [item for item in changes if not item.get('deleted')]
+    removed = [item for item in changes if item.get('deleted')]
+    
+    # 지역별로 묶어서 기존 upsert 경로 재사용
+    by_region = {}
+    for item in changed:
+        by_region.setdefault(region_code(item.get('region')), []).append(item)
+    
+    success_count = 0
+    error_count = 0
+    with import_pragmas(conn):
+        conn.execute('BEGIN')
+        try:
+            for region, items in by_region.items():
+                success, error, failed_urls = _insert_rows(cursor, items, region)
+                success_count += success
+                error_count += error
+                
+                # 해시가 없는 레코드(크롤러 전체 출력 JSONL 등)와 저장에 실패한 정책은 crawl_state를 그대로 둠
+                # → 다음 증분 크롤링에서 다시 비교/추출
+                cursor.executemany('''
+                    INSERT INTO crawl_state (url, region, content_hash, status)
+                    VALUES (?, ?, ?, 'active')
+                    ON CONFLICT(url) DO UPDATE SET
+                        region = excluded.region,
+                        content_hash = excluded.content_hash,
+                        status = 'active',
+                        changed_at = CURRENT_TIMESTAMP,
+                        tombstoned_at = NULL
+                ''', [(item['url'], region, item['content_hash']) for item in items
+                      if item.get('url') and item.get('content_hash') and item['url'] not in failed_urls])
+            
+            for item in removed:
+                cursor.execute('''
+                    DELETE FROM policy_categories
+                    WHERE policy_id IN (SELECT id FROM welfare_policies WHERE url = ?)
+                ''', (item['url'],))
+                cursor.execute('DELETE FROM welfare_policies WHERE url = ?', (item['url'],))
+                cursor.execute('''
+                    UPDATE crawl_state
+                    SET status = 'tombstoned', tombstoned_at = CURRENT_TIMESTAMP
+                    WHERE url = ?
+                ''', (item['url'],))
+                print(f"   삭제(tombstone): {item['url']}")
+            
+            bump_generation(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return success_count, error_count, len(removed)
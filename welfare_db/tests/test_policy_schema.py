@@ -0,0 +1,17 @@
+# policy_schema.py 테스트: 크롤러 지역명 → DB 지역 코드 (크롤러/임포터/챗봇이 같은 규칙)
+import pytest
+
+from welfare_db.policy_schema import region_code
+
+
+@pytest.mark.parametrize('name, code', [
+    ('서울', 'seoul'), ('서울특별시', 'seoul'), ('인천광역시', 'incheon'), ('경기도', 'gyeonggi'),
+    (['인천', '경기'], 'incheon'), ('경기도, 서울', 'gyeonggi'), ('Seoul', 'seoul'), ('gyeonggi', 'gyeonggi'),
+])
+def test_region_code_aliases(name, code):
+    assert region_code(name) == code
+
+
+@pytest.mark.parametrize('name', ['', None, [], '미정', '부산', '서울 어딘가'])
+def test_unknown_region_is_not_passed_through(name):
+    assert region_code(name) == 'unknown'
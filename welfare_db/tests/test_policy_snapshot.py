@@ -0,0 +1,150 @@
+# policy_snapshot.py 테스트: WPSNAP 파일 만들기/열기/필터, 데이터 세대 번호로 최신인지 판단
+import sqlite3
+
+import pytest
+
+from welfare_db.migrations import migrate
+from welfare_db.policy_snapshot import (MAGIC, PolicySnapshot, bump_generation, data_generation,
+                                        snapshot_generation, write_snapshot)
+from welfare_db.policy_store import insert_data_to_db
+
+POLICIES = [
+    {'title': '청년 월세 지원', 'url': 'https://example.com/1', 'region': '서울', 'age_range': [19, 39],
+     'application_period': '2025.05.01~2025.05.21', 'conditions': '무주택 청년', 'benefits': '월 20만원'},
+    {'title': '청년 취업 면접 정장 대여', 'url': 'https://example.com/2', 'region': '서울', 'age_range': [18, 34],
+     'application_period': '상시', 'conditions': '구직 중인 청년', 'benefits': '정장 무료 대여'},
+    {'title': '신혼부부 전세 대출 이자', 'url': 'https://example.com/3', 'region': '인천', 'age_range': [20, 49],
+     'application_period': '미정', 'conditions': '혼인 7년 이내', 'benefits': '대출 이자 지원'},
+    {'title': '창업 교육 과정', 'url': 'https://example.com/4', 'region': '경기도', 'age_range': [],
+     'application_period': '', 'conditions': '', 'benefits': '창업 강좌와 상담'},
+    {'title': '청년 마음 건강 상담', 'url': 'https://example.com/5', 'region': '경기', 'age_range': [19, 24],
+     'application_period': '연중', 'conditions': '경기 거주 청년', 'benefits': '심리 상담 8회'},
+]
+
+DB_SELECT = '''
+    SELECT id, title, url, region, age_min, age_max, application_period, apply_start, apply_end,
+           apply_status, conditions, benefits
+    FROM welfare_policies ORDER BY region, title
+'''
+
+
+@pytest.fixture
+def db(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'policies.db'))
+    migrate(conn, verbose=False)
+    insert_data_to_db(conn, POLICIES)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def snapshot(db, tmp_path):
+    path = str(tmp_path / 'policies.snapshot')
+    write_snapshot(db, path)
+    snapshot = PolicySnapshot(path)
+    yield snapshot
+    snapshot.close()
+
+
+def test_snapshot_matches_db_rows(db, snapshot):
+    rows = db.execute(DB_SELECT).fetchall()
+    assert snapshot.rows == len(rows) == len(POLICIES)
+
+    keys = ('id', 'title', 'url', 'region', 'age_min', 'age_max', 'application_period', 'apply_start',
+            'apply_end', 'apply_status', 'conditions', 'benefits')
+    for number, row in enumerate(rows):
+        policy = snapshot.policy(number)
+        assert tuple(policy[key] for key in keys) == row
+        categories = db.execute('SELECT category FROM policy_categories WHERE policy_id = ? ORDER BY category',
+                                (row[0],)).fetchall()
+        assert policy['categories'] == [category for category, in categories]
+
+
+def test_snapshot_header_records_data_generation(db, snapshot):
+    assert snapshot.generation == data_generation(db) == snapshot_generation(snapshot.path)
+    with open(snapshot.path, 'rb') as f:
+        assert f.read(len(MAGIC)) == MAGIC
+
+
+def titles(snapshot, rows):
+    return [snapshot.policy(row)['title'] for row in rows]
+
+
+def test_filter_by_region_age_category_and_keyword(snapshot):
+    assert titles(snapshot, snapshot.filter(region='seoul')) == ['청년 월세 지원', '청년 취업 면접 정장 대여']
+    assert snapshot.filter(region='busan') == []
+    # 나이를 모르는 정책은 나이 필터에서 빠짐
+    assert titles(snapshot, snapshot.filter(age=40)) == ['신혼부부 전세 대출 이자']
+    assert set(titles(snapshot, snapshot.filter(age=35, age_to=39))) == {'청년 월세 지원', '신혼부부 전세 대출 이자'}
+    assert titles(snapshot, snapshot.filter(category='startup')) == ['창업 교육 과정']
+    assert snapshot.filter(category='없는카테고리') == []
+    assert titles(snapshot, snapshot.filter(keyword='상담')) == ['창업 교육 과정', '청년 마음 건강 상담']
+    assert titles(snapshot, snapshot.filter(region='gyeonggi', age=20, keyword='상담')) == ['청년 마음 건강 상담']
+
+
+def test_keyword_does_not_match_across_fields(snapshot):
+    # '월 20만원'(혜택) 앞은 '무주택 청년'(조건) - 필드를 이어 붙인 곳에 걸친 글자는 일치로 보지 않음
+    assert snapshot.filter(keyword='청년월') == []
+    assert snapshot.filter(keyword='지원무주택') == []
+
+
+def test_narrow_keeps_row_order(snapshot):
+    rows = snapshot.filter()
+    narrowed = snapshot.narrow(rows, age=21, category='health')
+    assert titles(snapshot, narrowed) == ['청년 마음 건강 상담']
+    assert snapshot.narrow(rows, keyword='청년') == sorted(snapshot.narrow(rows, keyword='청년'))
+
+
+def test_snapshot_is_stale_after_import_and_rereads_new_data(db, snapshot, tmp_path):
+    old_generation = snapshot.generation
+    insert_data_to_db(db, [{'title': '청년 교통비 지원', 'url': 'https://example.com/6', 'region': '서울',
+                            'age_range': [19, 39], 'application_period': '상시',
+                            'conditions': '', 'benefits': '교통 바우처'}])
+    assert data_generation(db) == old_generation + 1
+    assert snapshot_generation(snapshot.path) != data_generation(db)
+
+    write_snapshot(db, snapshot.path)
+    assert snapshot_generation(snapshot.path) == data_generation(db)
+    # 이미 열어 둔 스냅샷은 교체 전 파일을 계속 읽음
+    assert snapshot.rows == len(POLICIES)
+    fresh = PolicySnapshot(snapshot.path)
+    try:
+        assert fresh.generation == old_generation + 1
+        assert '청년 교통비 지원' in titles(fresh, fresh.filter(region='seoul', category='living'))
+    finally:
+        fresh.close()
+
+
+def test_writes_without_bump_keep_snapshot_fresh(db, snapshot):
+    # 검증 도구/체크포인트처럼 정책을 바꾸지 않는 쓰기는 세대 번호를 올리지 않음
+    db.execute("CREATE TABLE IF NOT EXISTS scratch (value TEXT)")
+    db.execute("INSERT INTO scratch VALUES ('x')")
+    db.commit()
+    assert snapshot_generation(snapshot.path) == data_generation(db)
+
+    bump_generation(db)
+    db.rollback()
+    assert snapshot_generation(snapshot.path) == data_generation(db)
+
+
+def test_many_regions_fit_in_region_column(db, tmp_path):
+    db.executemany('INSERT INTO welfare_policies (title, url, region) VALUES (?, ?, ?)',
+                   [(f'정책 {number}', f'https://example.com/r/{number}', f'region{number:03d}')
+                    for number in range(300)])
+    db.commit()
+    path = str(tmp_path / 'regions.snapshot')
+    write_snapshot(db, path)
+    snapshot = PolicySnapshot(path)
+    try:
+        assert titles(snapshot, snapshot.filter(region='region299')) == ['정책 299']
+    finally:
+        snapshot.close()
+
+
+def test_missing_or_foreign_file_has_no_generation(tmp_path):
+    path = tmp_path / 'other.snapshot'
+    assert snapshot_generation(str(path)) is None
+    path.write_bytes(b'not a snapshot file at all, just bytes')
+    assert snapshot_generation(str(path)) is None
+    with pytest.raises(ValueError):
+        PolicySnapshot(str(path))